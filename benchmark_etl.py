@@ -10,6 +10,7 @@ import sys
 from etl_framework.etl_factory_provider import ETLFactoryProvider
 from etl_framework.utils.configuration.dataset_metadata import DatasetMetadata
 from etl_framework.utils.monitoring import PerformanceMonitor
+from etl_framework.utils.parquet_options import LEVEL_COMPRESSIONS
 
 import csv
 from datetime import datetime
@@ -92,6 +93,34 @@ def test_library(library, config_manager):
         traceback.print_exc()
         return False
 
+DATABASE_TABLE = 'input'
+
+def prepare_database_input(base_input, etl_config):
+    """
+    Copies the generated CSV into <base_input>.db (table 'input') for the database source.
+    """
+    import sqlite3
+    db_path = f"{base_input}.db"
+    separator = etl_config.get('extractor_options', {}).get('csv', {}).get('separator', ';')
+    remove_sqlite_database(db_path)
+    connection = sqlite3.connect(db_path)
+    try:
+        for chunk in pd.read_csv(f"{base_input}.csv", sep=separator, chunksize=100_000):
+            chunk.to_sql(DATABASE_TABLE, connection, if_exists='append', index=False)
+    finally:
+        connection.close()
+    return db_path
+
+def remove_sqlite_database(db_path):
+    for path in (db_path, db_path + '-wal', db_path + '-shm'):
+        if os.path.exists(path):
+            os.remove(path)
+
+def _rows_per_second(loading):
+    # Only loaders that count their rows (database loaders) report this
+    rows, seconds = loading.get('rows'), loading.get('duration_seconds', 0)
+    return rows / seconds if rows and seconds else ''
+
 def save_experiment_result(results_file, run_data, monitor):
     """
     Appends a single experiment run to the CSV results file.
@@ -102,8 +131,11 @@ def save_experiment_result(results_file, run_data, monitor):
     metrics = monitor.get_metrics()['operations']
     
     # Calculate totals
-    total_duration = sum(m['duration_seconds'] for m in metrics.values())
-    peak_memory = max(m['peak_memory_bytes'] for m in metrics.values()) if metrics else 0
+    # Pipelined runs overlap their stages, so their wall time is the total
+    total_duration = sum(m.get('duration_seconds', 0) for m in metrics.values())
+    if 'pipeline' in metrics:
+        total_duration = metrics.get('setup', {}).get('duration_seconds', 0) + metrics['pipeline']['wall_seconds']
+    peak_memory = max(m.get('peak_memory_bytes', 0) for m in metrics.values()) if metrics else 0
     print(run_data.get('rows', 10000))
     row = {
         'timestamp': datetime.now().isoformat(),
@@ -118,7 +150,14 @@ def save_experiment_result(results_file, run_data, monitor):
         'setup_sec': metrics.get('setup', {}).get('duration_seconds', 0),
         'extract_sec': metrics.get('extraction', {}).get('duration_seconds', 0),
         'transform_sec': metrics.get('transform_general', {}).get('duration_seconds', 0) + metrics.get('transform_attributes', {}).get('duration_seconds', 0),
-        'load_sec': metrics.get('loading', {}).get('duration_seconds', 0)
+        'load_sec': metrics.get('loading', {}).get('duration_seconds', 0),
+        'compact_sec': metrics.get('compact', {}).get('duration_seconds', 0),
+        'handoff_sec': metrics.get('handoff_extract', {}).get('duration_seconds', 0) + metrics.get('handoff_load', {}).get('duration_seconds', 0),
+        'compact_bytes_saved': metrics.get('compact', {}).get('bytes_before', 0) - metrics.get('compact', {}).get('bytes_after', 0),
+        'pipeline_bottleneck': metrics.get('pipeline', {}).get('bottleneck', ''),
+        'load_rows_per_sec': _rows_per_second(metrics.get('loading', {})),
+        'cache_hits': metrics.get('cache', {}).get('hits', 0),
+        'cache_misses': metrics.get('cache', {}).get('misses', 0)
     }
     
     with open(results_file, 'a', newline='') as f:
@@ -127,6 +166,98 @@ def save_experiment_result(results_file, run_data, monitor):
             writer.writeheader()
         writer.writerow(row)
 
+def _sweep_combinations(sweep):
+    # codec x level x row group size; a level only applies to the codecs that take one
+    combinations = []
+    for codec in sweep.get('codecs', ['snappy', 'zstd', 'lz4', 'none']):
+        levels = sweep.get('compression_levels', [None]) if codec in LEVEL_COMPRESSIONS else [None]
+        for level in levels:
+            for row_group_size in sweep.get('row_group_sizes', [None]):
+                combinations.append({'compression': codec, 'compression_level': level, 'row_group_size': row_group_size})
+    return combinations
+
+def _parquet_layout(path):
+    # Bytes on disk and row groups of a Parquet file or directory of part files (Dask)
+    import pyarrow.parquet as pq
+    if os.path.isdir(path):
+        files = [os.path.join(root, name) for root, _, names in os.walk(path) for name in names if name.endswith('.parquet')]
+    else:
+        files = [path]
+    return sum(os.path.getsize(f) for f in files), sum(pq.ParquetFile(f).metadata.num_row_groups for f in files)
+
+def _timed_read(factory, path):
+    # Read back with the same engine; lazy frames (DuckDB, Polars lazy, Dask) are executed
+    from etl_framework.utils.frames import is_lazy, to_arrow_table
+    started = time.perf_counter()
+    data = factory.get_extractor('parquet', file_path=path).extract()
+    if is_lazy(data):
+        to_arrow_table(data)
+    return time.perf_counter() - started
+
+def run_parquet_sweep(config_manager, etl_config, experiment_dir):
+    """
+    Parquet write tuning sweep: every library writes the Parquet destination once per
+    codec / compression level / row group size combination, then reads the file back.
+    Write time, file size, row groups and read time go to parquet_sweep_results.csv.
+    """
+    sweep = etl_config['parquet_sweep']
+    source = sweep.get('source', 'csv')
+    results_file = os.path.join(experiment_dir, "parquet_sweep_results.csv")
+    print(f"🚀 Starting PARQUET SWEEP")
+
+    for lib in etl_config['libraries']:
+        for options in _sweep_combinations(sweep):
+            label = "_".join(str(value) for value in options.values() if value is not None)
+            output_path = os.path.join(etl_config['output_base_dir'], f"sweep_{lib}_{label}.parquet")
+            print(f"\n--- Parquet sweep: {lib} | {options} ---")
+            try:
+                metadata = config_manager.get_metadata_config()
+                engine_opts = etl_config.get('engine_options', {}).get(lib, {})
+                factory = ETLFactoryProvider.get_factory(lib, metadata, **engine_opts)
+                processor_monitor = PerformanceMonitor()
+                processor = ETLProcessor(factory, lib, monitor=processor_monitor)
+
+                ext_params = {'file_path': f"{etl_config['base_input_path']}.{source}"}
+                ext_params.update(etl_config.get('extractor_options', {}).get(source, {}))
+                # The swept settings replace those of loader_options.parquet (None = library default)
+                load_params = dict(etl_config.get('loader_options', {}).get('parquet', {}))
+                load_params.update(options, output_path=output_path)
+                processor.process(
+                    source_type=source,
+                    extractor_params=ext_params,
+                    destination_type="file",
+                    loader_params=load_params,
+                    transformations=etl_config['transformations'],
+                    **etl_config.get('execution_options', {})
+                )
+                file_size, row_groups = _parquet_layout(output_path)
+                row = {
+                    'timestamp': datetime.now().isoformat(),
+                    'library': lib,
+                    'source_type': source,
+                    'file_rows': etl_config.get('rows_limit', 1000),
+                    'compression': options['compression'],
+                    'compression_level': options['compression_level'] if options['compression_level'] is not None else '',
+                    'row_group_size': options['row_group_size'] if options['row_group_size'] is not None else '',
+                    'write_sec': processor_monitor.get_metrics()['operations'].get('loading', {}).get('duration_seconds', 0),
+                    'file_size_bytes': file_size,
+                    'row_groups': row_groups,
+                    'read_sec': _timed_read(factory, output_path)
+                }
+                print(f"  ✅ {file_size} bytes, write {row['write_sec']:.3f}s, read {row['read_sec']:.3f}s")
+
+                file_exists = os.path.isfile(results_file)
+                with open(results_file, 'a', newline='') as f:
+                    writer = csv.DictWriter(f, fieldnames=row.keys())
+                    if not file_exists:
+                        writer.writeheader()
+                    writer.writerow(row)
+
+            except Exception as e:
+                print(f"  ❌ FAILED: {e}")
+                import traceback
+                traceback.print_exc()
+
 def setup_experiment_workspace(base_dir, config_path):
     """
     Creates a unique folder for the experiment run, backs up config, and prepares manifest.
@@ -182,6 +313,11 @@ def main():
         print(num_rows)
         generate_complex_dataset(base_input, num_rows=num_rows)
         used_datasets.append({'type': 'main_input_base', 'path': base_input, 'rows': num_rows})
+
+        if 'database' in etl_config.get('sources', []):
+            # Database source: the generated CSV copied into a SQLite table
+            db_input = prepare_database_input(etl_config['base_input_path'], etl_config)
+            used_datasets.append({'type': 'database_input', 'path': db_input, 'rows': num_rows})
         
     elif 'extractor_params' in etl_config:
          input_file = etl_config['extractor_params']['file_path']
@@ -198,7 +334,10 @@ def main():
         }, f, indent=4)
 
     # Detect if we are using the simple config or the matrix config
-    if 'libraries' in etl_config and 'sources' in etl_config:
+    if etl_config.get('parquet_sweep', {}).get('enabled'):
+        # PARQUET SWEEP MODE (replaces the matrix run)
+        run_parquet_sweep(config_manager, etl_config, experiment_dir)
+    elif 'libraries' in etl_config and 'sources' in etl_config:
         # MATRIX MODE
         libraries = etl_config['libraries']
         sources = etl_config['sources']
@@ -214,30 +353,45 @@ def main():
                 for dst in destinations:
                     # Construct paths
                     input_file = f"{base_input}.{src}"
-                    output_file_name = f"output_{lib}_from_{src}_to_{dst}.{dst}"
+                    output_file_name = f"output_{lib}_from_{src}_to_{dst}.{'db' if dst == 'database' else dst}"
                     output_full_path = os.path.join(output_base, output_file_name)
                     
                     print(f"\n--- Testing: {lib} | In: {src} -> Out: {dst} ---")
                     
                     try:
                         metadata = config_manager.get_metadata_config()
-                        factory = ETLFactoryProvider.get_factory(lib, metadata)
+                        engine_opts = etl_config.get('engine_options', {}).get(lib, {})
+                        factory = ETLFactoryProvider.get_factory(lib, metadata, **engine_opts)
                         processor_monitor = PerformanceMonitor()
                         processor = ETLProcessor(factory, lib, monitor=processor_monitor)
                         
                         # Specific params
                         ext_opts = etl_config.get('extractor_options', {}).get(src, {})
-                        ext_params = {'file_path': input_file}
+                        if src == 'database':
+                            ext_params = {'db_type': 'sqlite', 'db_path': f"{base_input}.db",
+                                          'query': f"SELECT * FROM {DATABASE_TABLE}"}
+                        else:
+                            ext_params = {'file_path': input_file}
                         ext_params.update(ext_opts)
-                        load_params = {'output_path': output_full_path}
+                        if dst == 'database':
+                            # A fresh SQLite file per run, so every run creates and fills its table
+                            remove_sqlite_database(output_full_path)
+                            load_params = {'db_type': 'sqlite', 'db_path': output_full_path, 'table_name': 'output'}
+                            load_params.update(etl_config.get('loader_options', {}).get('database', {}))
+                        else:
+                            load_params = {'output_path': output_full_path}
+                            load_params.update(etl_config.get('loader_options', {}).get(dst, {}))
                         transformations = etl_config['transformations']
+                        # streaming / batch_size / pipelined / workers / queue_size
+                        execution_opts = etl_config.get('execution_options', {})
                         
                         processor.process(
                             source_type=src,
                             extractor_params=ext_params,
-                            destination_type="file",
+                            destination_type='database' if dst == 'database' else "file",
                             loader_params=load_params,
-                            transformations=transformations
+                            transformations=transformations,
+                            **execution_opts
                         )
                         print(f"  ✅ Success")
                         
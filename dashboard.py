@@ -114,13 +114,13 @@ with tab_run:
             
             selected_sources = st.multiselect(
                 "Input Formats (Source)",
-                options=['csv', 'parquet', 'json'],
+                options=['csv', 'parquet', 'json', 'ndjson', 'arrow'],
                 default=etl_config.get('sources', ['csv'])
             )
             
             selected_destinations = st.multiselect(
                 "Output Formats (Destination)",
-                options=['csv', 'parquet', 'json'],
+                options=['csv', 'parquet', 'json', 'ndjson', 'arrow'],
                 default=etl_config.get('destinations', ['csv'])
             )
             
@@ -7,15 +7,74 @@ class Extractor(ABC):
     def extract(self):
         pass
 
+    def extract_batches(self, batch_size):
+        # Streaming mode: engines override this to yield bounded row batches.
+        # The default keeps formats without a chunked reader working (single batch).
+        yield self.extract()
+
 
 class Transformer(ABC):
+    # Streaming flags: aggregate-dependent transformers need a first pass over
+    # every batch (partial_fit) before they can transform; non streamable ones
+    # need the whole dataset at once.
+    requires_fit = False
+    streamable = True
+    # transform_batch carries state from one batch to the next (e.g. window tails),
+    # so a pipelined run must feed this transformer the batches in order. halo_rows is
+    # how many preceding rows that state needs (sharded runs hand them to each shard).
+    ordered_batches = False
+    halo_rows = 0
+
+    # Plan compilation: column-expression transformers declare what they read and
+    # write, so the compiler can fuse independent rules into one projection.
+    # input_columns = None means the transformer is opaque (never fused).
+    input_columns = None
+    output_columns = ()
+
     @abstractmethod
     def transform(self, data):
         pass
 
+    def begin_stream(self):
+        # Reset carry-over state (e.g. window tails) before a pass over the batches
+        pass
+
+    def partial_fit(self, data):
+        # Accumulate whole-dataset statistics from one batch
+        pass
+
+    def merge_fit(self, other):
+        # Sharded mode: combine the statistics another process fitted on its shard
+        raise NotImplementedError(f"{type(self).__name__} cannot merge statistics fitted on separate shards")
+
+    def transform_batch(self, data):
+        return self.transform(data)
+
+    def expressions(self, data):
+        # {output column: engine-native expression} for the columns this transformer writes
+        return {}
+
 
 class Loader(ABC):
+    # Loaders that count what they write set this; it is reported as loading.rows
+    rows_loaded = None
+
     @abstractmethod
     def load(self, data):
         pass
 
+    # Streaming mode: start_stream / append / finish_stream, or abort_stream when the
+    # run fails. The default suits loaders that already append (databases); file loaders
+    # override it so batches end up in a single output.
+    def start_stream(self):
+        pass
+
+    def append(self, data):
+        self.load(data)
+
+    def finish_stream(self):
+        pass
+
+    def abort_stream(self):
+        # Transactional loaders roll back here; the others just close their output
+        self.finish_stream()
@@ -6,6 +6,7 @@ import time
 import psutil
 
 from etl_framework.etl_factory_provider import ETLFactoryProvider
+from etl_framework.transformation_plan import TransformationPlanCompiler
 
 
 class ETLExperiment:
@@ -53,23 +54,27 @@ class ETLExperiment:
         #         transformer = transformer_factory.get_strategy(rule, 'spanish')
         #         data = transformer.transform(data)
 
-        # Apply transformations
+        # Apply transformations (independent attribute rules are fused into single stages)
+        compiler = TransformationPlanCompiler(transformer_factory)
         if 'general' in transformations:
+            general_transformers = []
             for general_transform in transformations['general']:
                 print('\n, general_transform')
                 print(general_transform)
-                transformer =transformer_factory.get_strategy(general_transform, 'spanish')
+                general_transformers.append(transformer_factory.get_strategy(general_transform, 'spanish'))
+            for transformer in compiler.compile(general_transformers):
                 data = transformer.transform(data)
                 time.sleep(1)  # Allow system resources to stabilize
         print('-'*60)
         if 'attributes' in transformations:
+            attribute_transformers = []
             for attribute, rules in transformations['attributes'].items():
                 for rule in rules:
                     print(f'\n, {attribute}: -{rule} ,')
-
-                    transformer = transformer_factory.get_strategy(rule, 'spanish')
-                    data = transformer.transform(data)
-                    time.sleep(1)  # Allow system resources to stabilize
+                    attribute_transformers.append(transformer_factory.get_strategy(rule, 'spanish'))
+            for transformer in compiler.compile(attribute_transformers):
+                data = transformer.transform(data)
+                time.sleep(1)  # Allow system resources to stabilize
 
 
         end_time = time.time()
@@ -11,17 +11,22 @@ from etl_framework.library_dask.dask_etl_factory import DaskETLFactory
 
 class ETLFactoryProvider:
     @staticmethod
-    def get_factory(library_type, metadata):
+    def get_factory(library_type, metadata, **factory_options):
+        # factory_options are engine settings (e.g. DuckDB threads/memory_limit/temp_directory)
         if library_type == "pandas":
             return PandasETLFactory(metadata)
+        elif library_type == "pandas_arrow":
+            return PandasETLFactory(metadata, arrow=True)
         elif library_type == "vaex":
             if not _VAEX_AVAILABLE:
                 raise ImportError("Vaex library is not installed.")
             return VaexETLFactory(metadata)
         elif library_type == "polars":
             return PolarsETLFactory(metadata)
+        elif library_type == "polars_lazy":
+            return PolarsETLFactory(metadata, lazy=True)
         elif library_type == "duckdb":
-            return DuckDBETLFactory(metadata)
+            return DuckDBETLFactory(metadata, **factory_options)
         elif library_type == "dask":
             return DaskETLFactory(metadata)
         else:
@@ -1,5 +1,15 @@
+import contextlib
 import time
+from etl_framework.etl_factory_provider import ETLFactoryProvider
+from etl_framework.pipeline import PipelinedExecutor
+from etl_framework.transformation_plan import TransformationPlanCompiler
+from etl_framework.utils.compaction import compaction_options, record_compaction
+from etl_framework.utils.extract_cache import CACHEABLE_SOURCES, CachedExtractor, ExtractionCache, cache_options
+from etl_framework.utils.handoff import HANDOFF_STAGES, ArrowHandoff
 from etl_framework.utils.monitoring import PerformanceMonitor
+from etl_framework.utils.projection import required_columns
+from etl_framework.utils.schema import metadata_types
+from etl_framework.utils.watermark import WatermarkStore, WatermarkTracker, incremental_options, incremental_params
 
 class ETLProcessor:
     def __init__(self, etl_factory, library_type, monitor=None):
@@ -7,42 +17,307 @@ class ETLProcessor:
         self.library_type = library_type
         self.monitor = monitor if monitor else PerformanceMonitor()
 
-    def process(self, source_type, extractor_params, destination_type, loader_params, transformations):
+    def process(self, source_type, extractor_params, destination_type, loader_params, transformations,
+                streaming=False, batch_size=100_000, fuse=True, project_columns=True, compact=None,
+                pipelined=False, workers=2, queue_size=4, sharded=False, processes=None, shard_output='merge',
+                shards=None, incremental=None, cache=None, stage_engines=None):
+        # Engine options (pandas_arrow copy-on-write on pandas 2.x) hold for this run only
+        engine_options = getattr(self.etl_factory, 'engine_options', contextlib.nullcontext)
+        with engine_options():
+            return self._process(source_type, extractor_params, destination_type, loader_params, transformations,
+                                 streaming=streaming, batch_size=batch_size, fuse=fuse, project_columns=project_columns,
+                                 compact=compact, pipelined=pipelined, workers=workers, queue_size=queue_size,
+                                 sharded=sharded, processes=processes, shard_output=shard_output, shards=shards,
+                                 incremental=incremental, cache=cache, stage_engines=stage_engines)
+
+    def _process(self, source_type, extractor_params, destination_type, loader_params, transformations,
+                 streaming, batch_size, fuse, project_columns, compact, pipelined, workers, queue_size, sharded,
+                 processes, shard_output, shards, incremental, cache, stage_engines):
         print(f"Processing with {self.library_type}")
         print(source_type, extractor_params, destination_type, loader_params, transformations)
 
+        incremental = incremental_options(incremental)
+        if incremental and sharded:
+            raise ValueError("Incremental runs are not supported in sharded mode")
+        stage_factories = self._stage_factories(stage_engines)
+        if stage_factories and sharded:
+            raise ValueError("Per-stage engines are not supported in sharded mode")
+        extract_factory = stage_factories.get('extract', self.etl_factory)
+        load_factory = stage_factories.get('load', self.etl_factory)
+
         with self.monitor.measure_time("setup"):
-            extractor = self.etl_factory.get_extractor(source_type, **extractor_params)
-            loader = self.etl_factory.get_loader(destination_type, **loader_params)
             transformer_factory = self.etl_factory.get_transformer_factory()
+            phases = self._build_phases(transformer_factory, transformations)
+            if project_columns and 'columns' not in extractor_params:
+                # Projection pushdown: read only metadata attributes + columns used by the rules
+                all_transformers = [t for transformers in phases.values() for t in transformers]
+                extractor_params = dict(extractor_params, columns=required_columns(self.etl_factory.metadata, all_transformers))
+            tracker = None
+            if incremental:
+                store = WatermarkStore(incremental['state_path'])
+                extractor_params, previous = self._incremental_params(source_type, extractor_params, incremental, store)
+            extractor = extract_factory.get_extractor(source_type, **extractor_params)
+            extractor = self._get_cached(extractor, extract_factory, source_type, extractor_params, cache, sharded)
+            if incremental:
+                # Filters what the source could not and keeps the new maximum of the watermark column
+                extractor = tracker = WatermarkTracker(extractor, incremental['column'], previous)
+            loader = load_factory.get_loader(destination_type, **loader_params)
+            # Engine changes between stages go through Arrow (None when the stage runs on this engine)
+            handoffs = (self._get_handoff(extract_factory, self.etl_factory, "handoff_extract"),
+                        self._get_handoff(self.etl_factory, load_factory, "handoff_load"))
+            # Pipelined runs are streamed runs whose stages overlap in threads
+            streaming = streaming or pipelined
+            compactor = self._get_compactor(compact, streaming or sharded)
+
+        if sharded:
+            return self._process_sharded(source_type, extractor_params, destination_type, loader_params, loader,
+                                         transformer_factory, phases, fuse, processes, shard_output, shards)
+
+        if streaming:
+            executor = PipelinedExecutor(self.monitor, workers, queue_size) if pipelined else None
+            report = self._process_streaming(extractor, loader, transformer_factory, phases, batch_size, fuse, executor,
+                                             handoffs)
+            if tracker is None:
+                return report
+            self._save_watermark(store, incremental, tracker)
+            return self.monitor.get_report()
 
         with self.monitor.measure_time("extraction"):
             data = extractor.extract()
 
+        if handoffs[0] is not None:
+            with self.monitor.measure_time(handoffs[0].phase):
+                data = handoffs[0].transform(data)
+
+        if compactor is not None:
+            with self.monitor.measure_time("compact"):
+                data, columns = compactor.compact(data)
+            record_compaction(self.monitor, "compact", columns)
+
         attributes = self.etl_factory.metadata.get_attributes()
 
-        # Apply transformations
-        if 'general' in transformations:
-            with self.monitor.measure_time("transform_general"):
-                for general_transform in transformations['general']:
-                    print(f'\nApplying general transform: {general_transform}')
-                    transformer = transformer_factory.get_strategy(general_transform, 'spanish')
+        # Apply transformations: each phase is compiled into fused stages first
+        compiler = TransformationPlanCompiler(transformer_factory) if fuse else None
+        for phase, transformers in phases.items():
+            stages = compiler.compile(transformers) if compiler else transformers
+            with self.monitor.measure_time(phase):
+                for transformer in stages:
                     data = transformer.transform(data)
-        
-        if 'attributes' in transformations:
-            with self.monitor.measure_time("transform_attributes"):
-                for attribute, rules in transformations['attributes'].items():
-                    for rule in rules:
-                        print(f'\nAttribute {attribute}: Applying rule {rule}')
-                        transformer = transformer_factory.get_strategy(rule, 'spanish')
-                        # Note: In a real attribute transformation, we might need to target specific columns
-                        # This implementation assumes the transformer handles the whole dataframe/dataset
-                        # or knows how to target the attribute if passed differently.
-                        # For now, we keep the existing logic.
-                        data = transformer.transform(data)
+
+        if handoffs[1] is not None:
+            with self.monitor.measure_time(handoffs[1].phase):
+                data = handoffs[1].transform(data)
 
         with self.monitor.measure_time("loading"):
             loader.load(data)
-            
+        self._record_rows(loader)
+        if tracker is not None:
+            self._save_watermark(store, incremental, tracker)
+
+        return self.monitor.get_report()
+
+    def _incremental_params(self, source_type, extractor_params, incremental, store):
+        column = incremental['column']
+        previous = store.get(incremental['job'], column)
+        self.monitor.record_metric("incremental", "full_run", previous is None)
+        self.monitor.record_metric("incremental", "previous_watermark", None if previous is None else str(previous))
+        if extractor_params.get('columns') is not None and column not in extractor_params['columns']:
+            # The watermark column is read even when no rule uses it
+            extractor_params = dict(extractor_params, columns=list(extractor_params['columns']) + [column])
+        if previous is not None:
+            # Pushed into the source: SQL/Mongo query predicate, Parquet row-group skipping
+            extractor_params = incremental_params(source_type, extractor_params, column, previous)
+        return extractor_params, previous
+
+    def _save_watermark(self, store, incremental, tracker):
+        # Saved only once the load went through, so a failed run is retried from the same watermark
+        if tracker.maximum is None:
+            print(f"No rows newer than the watermark of '{incremental['job']}'")
+            return
+        with self.monitor.measure_time("incremental"):
+            store.set(incremental['job'], incremental['column'], tracker.maximum)
+        self.monitor.record_metric("incremental", "new_watermark", str(tracker.maximum))
+
+    def _record_rows(self, loader):
+        # Row count (and so rows/second) for loaders that report what they wrote
+        rows = getattr(loader, 'rows_loaded', None)
+        if rows is not None:
+            self.monitor.record_metric("loading", "rows", rows)
+        # Loaders writing in batches also keep (rows, seconds) per batch
+        rates = [batch_rows / seconds for batch_rows, seconds in getattr(loader, 'batch_stats', None) or [] if seconds]
+        if rates:
+            self.monitor.record_metric("loading", "batches", len(rates))
+            self.monitor.record_metric("loading", "batch_rows_per_sec.min", min(rates))
+            self.monitor.record_metric("loading", "batch_rows_per_sec.mean", sum(rates) / len(rates))
+            self.monitor.record_metric("loading", "batch_rows_per_sec.max", max(rates))
+
+    def _stage_factories(self, stage_engines):
+        """
+        stage_engines={'extract': 'duckdb', 'load': 'pandas'}: library names (or factories) for the
+        stages that should not run on this processor's engine, which always does the transforms.
+        """
+        factories = {}
+        for stage, engine in (stage_engines or {}).items():
+            if stage not in HANDOFF_STAGES:
+                raise ValueError(f"Unknown stage '{stage}' (expected one of {', '.join(HANDOFF_STAGES)})")
+            if engine is None or engine == self.library_type or engine is self.etl_factory:
+                continue
+            if isinstance(engine, str):
+                engine = ETLFactoryProvider.get_factory(engine, self.etl_factory.metadata)
+            factories[stage] = engine
+        return factories
+
+    def _get_handoff(self, source_factory, target_factory, phase):
+        if source_factory is target_factory:
+            return None
+        if not hasattr(target_factory, 'from_arrow'):
+            raise ValueError(f"{type(target_factory).__name__} cannot take frames from another engine")
+        return ArrowHandoff(target_factory, phase, self.monitor)
+
+    def _get_cached(self, extractor, extract_factory, source_type, extractor_params, cache, sharded):
+        options = cache_options(cache)
+        if options is None or source_type not in CACHEABLE_SOURCES:
+            return extractor
+        if sharded:
+            # Shards read byte ranges / row groups of the source in their own processes
+            print("Extraction cache is skipped in sharded mode")
+            return extractor
+        if not hasattr(extract_factory, 'from_arrow'):
+            print(f"{type(extract_factory).__name__} cannot read Arrow tables, skipping the extraction cache")
+            return extractor
+        extraction_cache = ExtractionCache(**options)
+        key = extraction_cache.key(source_type, extractor_params, metadata_types(extract_factory.metadata))
+        return CachedExtractor(extractor, extraction_cache, key, extract_factory.from_arrow, self.monitor)
+
+    def _get_compactor(self, compact, streaming):
+        # compact=None falls back to the dataset metadata (`compact:` in the YAML contract)
+        if compact is None:
+            get_compact = getattr(self.etl_factory.metadata, 'get_compact', None)
+            compact = get_compact() if get_compact else False
+        options = compaction_options(compact)
+        if options is None:
+            return None
+        if streaming:
+            # Per-batch categories/widths would differ between batches and break the sink schema
+            print("Memory-compact pass is skipped in streaming and sharded modes (batches are already bounded)")
+            return None
+        if not hasattr(self.etl_factory, 'get_compactor'):
+            # Polars/DuckDB already hold columnar Arrow-style buffers
+            print(f"{self.library_type} has no memory-compact pass, skipping it")
+            return None
+        return self.etl_factory.get_compactor(**options)
+
+    def _build_phases(self, transformer_factory, transformations):
+        # General transforms first, then attribute rules (one monitor span per phase)
+        phases = {}
+        if 'general' in transformations:
+            phases["transform_general"] = []
+            for general_transform in transformations['general']:
+                print(f'\nApplying general transform: {general_transform}')
+                phases["transform_general"].append(transformer_factory.get_strategy(general_transform, 'spanish'))
+
+        if 'attributes' in transformations:
+            phases["transform_attributes"] = []
+            for attribute, rules in transformations['attributes'].items():
+                for rule in rules:
+                    print(f'\nAttribute {attribute}: Applying rule {rule}')
+                    # Note: In a real attribute transformation, we might need to target specific columns
+                    # This implementation assumes the transformer handles the whole dataframe/dataset
+                    # or knows how to target the attribute if passed differently.
+                    phases["transform_attributes"].append(transformer_factory.get_strategy(rule, 'spanish'))
+        return phases
+
+    def _build_chain(self, transformer_factory, phases, fuse=True):
+        compiler = TransformationPlanCompiler(transformer_factory, streaming=True) if fuse else None
+        chain = []
+        for phase, transformers in phases.items():
+            stages = compiler.compile(transformers) if compiler else transformers
+            chain.extend((phase, transformer) for transformer in stages)
+        return chain
+
+    @staticmethod
+    def _begin_stream(chain):
+        for _, transformer in chain:
+            if hasattr(transformer, 'begin_stream'):
+                transformer.begin_stream()
+
+    @staticmethod
+    def _transform_batch(transformer, batch):
+        # Transformers outside the Transformer hierarchy (e.g. translation) only know transform()
+        if hasattr(transformer, 'transform_batch'):
+            return transformer.transform_batch(batch)
+        return transformer.transform(batch)
+
+    def _process_sharded(self, source_type, extractor_params, destination_type, loader_params, loader,
+                         transformer_factory, phases, fuse, processes, shard_output, shards):
+        if not hasattr(self.etl_factory, 'get_sharded_executor'):
+            raise ValueError(f"{self.library_type} has no sharded execution mode")
+        # Shards are batches processed side by side, so the streaming rules apply
+        chain = self._build_chain(transformer_factory, phases, fuse)
+        for _, transformer in chain:
+            if not getattr(transformer, 'streamable', True):
+                raise ValueError(f"{type(transformer).__name__} needs the whole dataset and cannot run in sharded mode")
+
+        executor = self.etl_factory.get_sharded_executor(processes, shard_output, shards)
+        with self.monitor.measure_time("sharded"):
+            executor.run(source_type, extractor_params, destination_type, loader_params, loader, chain, self.monitor)
+        self._record_rows(loader)
         return self.monitor.get_report()
 
+    def _process_streaming(self, extractor, loader, transformer_factory, phases, batch_size, fuse, executor=None,
+                           handoffs=(None, None)):
+        chain = self._build_chain(transformer_factory, phases, fuse)
+        # Handoffs to/from other engines are the first/last steps, so each batch crosses engines once
+        before, after = handoffs
+        if before is not None:
+            chain.insert(0, (before.phase, before))
+        if after is not None:
+            chain.append((after.phase, after))
+        for _, transformer in chain:
+            if not getattr(transformer, 'streamable', True):
+                raise ValueError(f"{type(transformer).__name__} needs the whole dataset and cannot run in streaming mode")
+
+        # First passes: every aggregate-dependent transformer sees all the batches
+        # (already transformed by the steps before it) so the output matches whole-file mode.
+        for position, (_, transformer) in enumerate(chain):
+            if not getattr(transformer, 'requires_fit', False):
+                continue
+            with self.monitor.measure_time("fit_pass", accumulate=True):
+                self._begin_stream(chain[:position])
+                for batch in extractor.extract_batches(batch_size):
+                    for _, previous in chain[:position]:
+                        batch = self._transform_batch(previous, batch)
+                    transformer.partial_fit(batch)
+
+        self._begin_stream(chain)
+
+        batches = extractor.extract_batches(batch_size)
+        with self.monitor.measure_time("loading", accumulate=True):
+            loader.start_stream()
+        try:
+            if executor is not None:
+                executor.run(batches, chain, loader, self._transform_batch)
+            else:
+                while True:
+                    with self.monitor.measure_time("extraction", accumulate=True):
+                        batch = next(batches, None)
+                    if batch is None:
+                        break
+
+                    for phase, transformer in chain:
+                        with self.monitor.measure_time(phase, accumulate=True):
+                            batch = self._transform_batch(transformer, batch)
+
+                    with self.monitor.measure_time("loading", accumulate=True):
+                        loader.append(batch)
+                    self.monitor.add_metric("extraction", "batches", 1)
+        except BaseException:
+            # Nothing of a failed run is committed
+            with self.monitor.measure_time("loading", accumulate=True):
+                loader.abort_stream()
+            raise
+        with self.monitor.measure_time("loading", accumulate=True):
+            loader.finish_stream()
+        self._record_rows(loader)
+
+        return self.monitor.get_report()
@@ -0,0 +1,61 @@
+import dask
+import pandas as pd
+
+from etl_framework.utils.compaction import smallest_integer_dtype
+
+
+def _is_text(dtype):
+    return dtype == object or isinstance(dtype, pd.StringDtype)
+
+class DaskMemoryCompactor:
+    # Same pass as PandasMemoryCompactor. Column statistics are gathered in one compute
+    # so the decisions cost a single scan; categories are made known up front.
+    def __init__(self, category_threshold=0.5, downcast=True, arrow_strings=True, categories=(), min_int_width=32):
+        self.category_threshold = category_threshold
+        self.downcast = downcast
+        self.min_int_width = min_int_width
+        self.arrow_strings = arrow_strings
+        self.categories = set(categories or ())
+
+    def compact(self, data):
+        stats = {}
+        for column, dtype in data.dtypes.items():
+            series = data[column]
+            if _is_text(dtype):
+                stats[column] = (series.count(), series.nunique_approx())
+            elif self.downcast and pd.api.types.is_integer_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+                stats[column] = (series.min(), series.max())
+            elif self.downcast and dtype == 'float64':
+                stats[column] = (((series.astype('float32').astype('float64') == series) | series.isna()).all(),)
+        before, stats = dask.compute(data.memory_usage(deep=True, index=False), stats)
+
+        targets = {}
+        categorical = []
+        for column, values in stats.items():
+            dtype = data.dtypes[column]
+            if _is_text(dtype):
+                count, distinct = values
+                if column in self.categories or (count and distinct / count <= self.category_threshold):
+                    categorical.append(column)
+                elif self.arrow_strings and getattr(dtype, 'storage', None) != 'pyarrow':
+                    targets[column] = 'string[pyarrow]'
+            elif len(values) == 2:
+                low, high = values
+                if not pd.isna(low):
+                    target = smallest_integer_dtype(low, high, nullable=isinstance(dtype, pd.api.extensions.ExtensionDtype),
+                                                    min_width=self.min_int_width)
+                    if target != dtype:
+                        targets[column] = target
+            elif values[0]:
+                targets[column] = 'float32'
+
+        if categorical:
+            # Known categories keep the frame usable downstream without another compute per column
+            uniques = dask.compute(*(data[column].dropna().unique() for column in categorical))
+            for column, values in zip(categorical, uniques):
+                targets[column] = pd.CategoricalDtype(sorted(values))
+        if targets:
+            data = data.astype(targets)
+
+        after = data.memory_usage(deep=True, index=False).compute()
+        return data, {column: (int(before[column]), int(after[column])) for column in data.columns}
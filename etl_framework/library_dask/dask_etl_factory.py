@@ -1,6 +1,17 @@
-from etl_framework.library_dask.extract_functions import DaskCSVExtractor, DaskJSONExtractor, DaskParquetExtractor
+from etl_framework.library_dask.extract_functions import (DaskCSVExtractor, DaskJSONExtractor, DaskParquetExtractor,
+                                                         DaskSQLTableExtractor, DaskArrowExtractor, DaskNDJSONExtractor)
 from etl_framework.library_dask.dask_transformation_strategy import DaskTransformationStrategyFactory
-from etl_framework.library_dask.load_functions import DaskFileLoader
+from etl_framework.library_dask.load_functions import DaskFileLoader, DaskDatabaseLoader
+from etl_framework.library_dask.compact_functions import DaskMemoryCompactor
+from etl_framework.utils.database.database_extractor_factory import DatabaseExtractorFactory
+from etl_framework.utils.database.database_loader_factory import DatabaseLoaderFactory
+from etl_framework.utils.database.extract_functions import ConvertedExtractor
+from etl_framework.utils.arrow_ipc import ARROW_SOURCES
+from etl_framework.utils.ndjson import DEFAULT_BLOCKSIZE, NDJSON_SOURCES
+from etl_framework.utils.parquet_options import parquet_options
+from etl_framework.utils.schema import metadata_types, primary_key
+import dask.dataframe as dd
+import os
 
 class DaskETLFactory:
     def __init__(self, metadata):
@@ -8,19 +19,55 @@ class DaskETLFactory:
 
     def get_extractor(self, source_type, **kwargs):
         if source_type == "csv":
-            return DaskCSVExtractor(kwargs['file_path'], kwargs.get('separator', ';'))
+            return DaskCSVExtractor(kwargs['file_path'], kwargs.get('separator', ';'), columns=kwargs.get('columns'),
+                                    types=kwargs.get('types', metadata_types(self.metadata)))
         elif source_type == "json":
-            return DaskJSONExtractor(kwargs['file_path'])
+            return DaskJSONExtractor(kwargs['file_path'], columns=kwargs.get('columns'),
+                                     types=kwargs.get('types', metadata_types(self.metadata)))
+        elif source_type in NDJSON_SOURCES:
+            return DaskNDJSONExtractor(kwargs['file_path'], columns=kwargs.get('columns'),
+                                       types=kwargs.get('types', metadata_types(self.metadata)),
+                                       blocksize=kwargs.get('blocksize', DEFAULT_BLOCKSIZE))
         elif source_type == "parquet":
-            return DaskParquetExtractor(kwargs['file_path'])
+            return DaskParquetExtractor(kwargs['file_path'], columns=kwargs.get('columns'),
+                                        watermark=kwargs.get('watermark'), filters=kwargs.get('filters'))
+        elif source_type in ARROW_SOURCES:
+            return DaskArrowExtractor(kwargs['file_path'], columns=kwargs.get('columns'),
+                                      rows_per_partition=kwargs.get('rows_per_partition', 1_000_000))
+        elif source_type == "database":
+            if kwargs.get('table_name') and kwargs.get('index_col'):
+                uri = kwargs.get('uri') or f"sqlite:///{kwargs['db_path']}"
+                return DaskSQLTableExtractor(uri, kwargs['table_name'], kwargs['index_col'],
+                                             npartitions=kwargs.get('npartitions'), columns=kwargs.get('columns'))
+            # A plain query is read by the pooled pandas extractor and split into npartitions.
+            # A streamed batch stays one partition: the transform_batch carry (moving average
+            # window, ...) would otherwise be applied to every partition of the batch.
+            extractor = DatabaseExtractorFactory().get_extractor(**dict({'types': metadata_types(self.metadata)}, **kwargs))
+            npartitions = kwargs.get('npartitions', 1)
+            return ConvertedExtractor(extractor, lambda data: dd.from_pandas(data, npartitions=npartitions),
+                                      convert_batch=lambda data: dd.from_pandas(data, npartitions=1))
         else:
             raise ValueError("Unknown source type")
 
     def get_transformer_factory(self):
         return DaskTransformationStrategyFactory()
 
+    def from_arrow(self, table, batch=False):
+        # A streamed batch is one partition, like the partitions DaskPartitionsMixin hands out
+        return dd.from_pandas(table.to_pandas(), npartitions=1 if batch else os.cpu_count() or 1)
+
+    def get_compactor(self, **options):
+        return DaskMemoryCompactor(**options)
+
     def get_loader(self, destination_type, **kwargs):
         if destination_type == "file":
-            return DaskFileLoader(kwargs['output_path'])
+            return DaskFileLoader(kwargs['output_path'], compression=kwargs.get('compression'),
+                                  parquet_options=parquet_options(kwargs), partition_by=kwargs.get('partition_by'),
+                                  max_file_bytes=kwargs.get('max_file_bytes'), mode=kwargs.get('mode', 'overwrite'),
+                                  key=kwargs.get('key', primary_key(self.metadata)))
+        elif destination_type == "database":
+            loader = DatabaseLoaderFactory().get_loader(**dict({'types': metadata_types(self.metadata),
+                                                                'key': primary_key(self.metadata)}, **kwargs))
+            return DaskDatabaseLoader(loader)
         else:
             raise ValueError("Unknown destination type")
@@ -26,3 +26,6 @@ class DaskTransformationStrategyFactory:
              return DaskDaysSinceTransformer()
         else:
             raise ValueError(f"Unknown transform type '{transform_type}' for Dask")
+
+    def fuse(self, transformers):
+        return DaskFusedTransformer(transformers)
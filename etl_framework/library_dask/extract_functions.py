@@ -1,24 +1,117 @@
 from etl_framework.abstract_etl_methods import Extractor
+from etl_framework.utils.arrow_ipc import ipc_batch_groups, read_ipc_batches
+from etl_framework.utils.ndjson import DEFAULT_BLOCKSIZE
+from etl_framework.utils.partitioning import check_filters, dataset, typed_filters
+from etl_framework.utils.projection import csv_header, parquet_columns, present_columns
+from etl_framework.utils.schema import pandas_read_options, restrict
 import dask.dataframe as dd
 
-class DaskCSVExtractor(Extractor):
-    def __init__(self, file_path, separator=';'):
+class DaskPartitionsMixin:
+    def extract_batches(self, batch_size):
+        # Dask already splits the input into partitions (blocksize / row groups);
+        # streaming mode hands them over one at a time, batch_size is not used.
+        data = self.extract()
+        for index in range(data.npartitions):
+            yield data.get_partition(index)
+
+class DaskCSVExtractor(DaskPartitionsMixin, Extractor):
+    def __init__(self, file_path, separator=';', columns=None, types=None):
         self.file_path = file_path
         self.separator = separator
+        self.columns = columns
+        self.types = types
 
     def extract(self):
-        return dd.read_csv(self.file_path, sep=self.separator, encoding='utf8', sample=5000000, assume_missing=True)
+        header = csv_header(self.file_path, self.separator)
+        usecols = None if self.columns is None else present_columns(header, self.columns)
+        # Declared types skip the per-partition inference (and its int/float mismatches)
+        dtype, parse_dates = pandas_read_options(restrict(self.types or {}, usecols or header))
+        return dd.read_csv(self.file_path, sep=self.separator, encoding='utf8', sample=5000000, assume_missing=True,
+                           usecols=usecols, dtype=dtype or None, parse_dates=parse_dates or None)
 
-class DaskJSONExtractor(Extractor):
-    def __init__(self, file_path):
+class DaskJSONExtractor(DaskPartitionsMixin, Extractor):
+    def __init__(self, file_path, columns=None, types=None):
         self.file_path = file_path
+        self.columns = columns
+        self.types = types
 
     def extract(self):
-        return dd.read_json(self.file_path, orient='records', lines=False) # lines=False for standard json array
+        typed = {}
+        if self.types:
+            dtype, parse_dates = pandas_read_options(self.types)
+            typed = {'dtype': dtype, 'convert_dates': parse_dates}
+        data = dd.read_json(self.file_path, orient='records', lines=False, **typed) # lines=False for standard json array
+        if self.columns is not None:
+            data = data[present_columns(data.columns, self.columns)]
+        return data
 
-class DaskParquetExtractor(Extractor):
-    def __init__(self, file_path):
+class DaskNDJSONExtractor(DaskPartitionsMixin, Extractor):
+    # JSON Lines: one partition per `blocksize` bytes (line-aligned), parsed in parallel by the workers
+    def __init__(self, file_path, columns=None, types=None, blocksize=DEFAULT_BLOCKSIZE):
         self.file_path = file_path
+        self.columns = columns
+        self.types = types
+        self.blocksize = blocksize
+
+    def extract(self):
+        typed = {}
+        if self.types:
+            dtype, parse_dates = pandas_read_options(self.types)
+            typed = {'dtype': dtype, 'convert_dates': parse_dates}
+        data = dd.read_json(self.file_path, orient='records', lines=True, blocksize=self.blocksize, **typed)
+        if self.columns is not None:
+            data = data[present_columns(data.columns, self.columns)]
+        return data
+
+def _ipc_partition(indexes, file_path, columns=None):
+    # `columns` is set by Dask's projection pushdown (from_map passes the selected columns)
+    return read_ipc_batches(file_path, indexes, columns).to_pandas()
+
+class DaskArrowExtractor(DaskPartitionsMixin, Extractor):
+    # Arrow IPC / Feather: one partition per group of record batches, each read from a memory map
+    def __init__(self, file_path, columns=None, rows_per_partition=1_000_000):
+        self.file_path = file_path
+        self.columns = columns
+        self.rows_per_partition = rows_per_partition
+
+    def extract(self):
+        groups = ipc_batch_groups(self.file_path, self.rows_per_partition)
+        # meta from the schema alone (no record batch is read for it)
+        data = dd.from_map(_ipc_partition, groups, args=(self.file_path,), meta=_ipc_partition([], self.file_path),
+                           label='read-ipc')
+        if self.columns is not None:
+            data = data[present_columns(data.columns, self.columns)]
+        return data
+
+class DaskParquetExtractor(DaskPartitionsMixin, Extractor):
+    def __init__(self, file_path, columns=None, watermark=None, filters=None):
+        self.file_path = file_path
+        self.columns = columns
+        self.watermark = watermark
+        # [(column, operator, value)]: hive partitions and row groups that cannot match are skipped
+        self.filters = check_filters(filters)
+
+    def extract(self):
+        columns = None if self.columns is None else parquet_columns(self.file_path, self.columns)
+        filters = [] if self.filters is None else typed_filters(self.filters, dataset(self.file_path).schema)
+        # Incremental runs: filters skips the row groups whose statistics are all <= watermark
+        if self.watermark is not None:
+            filters.append((self.watermark[0], '>', self.watermark[1]))
+        return dd.read_parquet(self.file_path, columns=columns, filters=filters or None)
+
+class DaskSQLTableExtractor(DaskPartitionsMixin, Extractor):
+    # read_sql_table splits the table on index_col into npartitions range queries,
+    # each read by its own task (needs SQLAlchemy and a database URI)
+    def __init__(self, uri, table_name, index_col, npartitions=None, columns=None):
+        self.uri = uri
+        self.table_name = table_name
+        self.index_col = index_col
+        self.npartitions = npartitions
+        self.columns = columns
 
     def extract(self):
-        return dd.read_parquet(self.file_path)
+        columns = None if self.columns is None else [c for c in self.columns if c != self.index_col]
+        data = dd.read_sql_table(self.table_name, self.uri, index_col=self.index_col, columns=columns,
+                                 npartitions=self.npartitions)
+        # The partition column comes back as the index; the transforms expect it as a column
+        return data.reset_index()
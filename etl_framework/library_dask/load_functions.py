@@ -1,17 +1,137 @@
 from etl_framework.abstract_etl_methods import Loader
+from etl_framework.utils.arrow_ipc import IPCFileWriter, check_compression, is_arrow_path
+from etl_framework.utils.merge import check_merge_mode, merge_file
+from etl_framework.utils.ndjson import is_ndjson_path
+from etl_framework.utils.parquet_options import arrow_writer_options
+from etl_framework.utils.partitioning import PartitionedParquetWriter
 import dask.dataframe as dd
 import os
 
 class DaskFileLoader(Loader):
-    def __init__(self, output_path):
+    def __init__(self, output_path, compression=None, parquet_options=None, partition_by=None, max_file_bytes=None,
+                 mode='overwrite', key=None):
         self.output_path = output_path
+        # mode='merge': upsert on `key` into a Parquet file or directory of parts (see utils/merge.py)
+        self.key = check_merge_mode(mode, key, output_path, partition_by)
+        self.mode = mode
+        # Arrow IPC / Feather outputs: None, 'lz4' or 'zstd' (Parquet codecs come in parquet_options)
+        self.compression = check_compression(compression) if is_arrow_path(output_path) else None
+        # Parquet write settings (see utils/parquet_options.py)
+        self.parquet_options = parquet_options or {}
+        # partition_by: output_path becomes a hive-partitioned Parquet dataset (see utils/partitioning.py)
+        self.partition_by = partition_by
+        self.max_file_bytes = max_file_bytes
+        self._batch_index = 0
+        self._writer = None
+        self._handle = None
 
     def load(self, data):
         # Dask typically writes to multiple files (partitioned), but can write to single if specified.
         # Single file output in dask: data.to_csv(..., single_file=True)
-        if self.output_path.endswith('.parquet'):
-            data.to_parquet(self.output_path)
+        if self.mode == 'merge':
+            return merge_file(self.output_path, data, self.key)
+        if self.partition_by or is_arrow_path(self.output_path) or is_ndjson_path(self.output_path):
+            # No Dask IPC writer (and to_parquet(partition_on=) has no row group / file size
+            # control; to_json(lines=True) writes a directory of parts): partitions are computed
+            # one at a time into the shared writers / the single JSON Lines file
+            self.start_stream()
+            try:
+                for partition in data.to_delayed():
+                    self.append(partition.compute())
+            finally:
+                self.finish_stream()
+        elif self.output_path.endswith('.parquet'):
+            data.to_parquet(self.output_path, **self._parquet_kwargs())
         elif self.output_path.endswith('.json'):
             data.to_json(self.output_path)
         else:
             data.to_csv(self.output_path, sep=';', single_file=True, index=False)
+
+    def _parquet_kwargs(self):
+        # to_parquet hands these on to pyarrow's write_table for every part file
+        kwargs = arrow_writer_options(self.parquet_options)
+        if 'row_group_size' in self.parquet_options:
+            kwargs['row_group_size'] = self.parquet_options['row_group_size']
+        return kwargs
+
+    # Streaming mode: one partition per batch, written as it arrives
+    def start_stream(self):
+        self._batch_index = 0
+        if self.mode == 'merge':
+            return
+        if self.partition_by:
+            self._writer = PartitionedParquetWriter(self.output_path, self.partition_by, self.parquet_options,
+                                                    self.max_file_bytes)
+        elif is_arrow_path(self.output_path):
+            self._writer = IPCFileWriter(self.output_path, self.compression)
+        elif is_ndjson_path(self.output_path):
+            self._handle = open(self.output_path, 'w', encoding='utf8')
+
+    def append(self, data):
+        first = self._batch_index == 0
+        if self.mode == 'merge':
+            # Every batch is a staged merge of its own
+            merge_file(self.output_path, data, self.key)
+        elif self.partition_by or is_arrow_path(self.output_path):
+            import pyarrow as pa
+            partition = data.compute() if hasattr(data, 'npartitions') else data
+            self._writer.write(pa.Table.from_pandas(partition, preserve_index=False))
+        elif is_ndjson_path(self.output_path):
+            partition = data.compute() if hasattr(data, 'npartitions') else data
+            lines = partition.to_json(orient='records', lines=True, date_format='iso')
+            if lines:
+                self._handle.write(lines if lines.endswith('\n') else lines + '\n')
+        elif self.output_path.endswith('.parquet'):
+            data.to_parquet(self.output_path, append=not first, ignore_divisions=True, write_index=False,
+                            **self._parquet_kwargs())
+        elif self.output_path.endswith('.json'):
+            data.to_json(self.output_path, name_function=lambda i, batch=self._batch_index: f"{batch}.part")
+        else:
+            data.compute().to_csv(self.output_path, sep=';', index=False,
+                                  mode='w' if first else 'a', header=first)
+        self._batch_index += 1
+
+    def finish_stream(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+class DaskDatabaseLoader(Loader):
+    # Whole-frame loads go to the database partition by partition, never computing
+    # the whole frame at once; streamed batches are already single partitions
+    def __init__(self, loader):
+        self.loader = loader
+
+    @property
+    def rows_loaded(self):
+        return self.loader.rows_loaded
+
+    @property
+    def batch_stats(self):
+        return getattr(self.loader, 'batch_stats', None)
+
+    def load(self, data):
+        self.start_stream()
+        try:
+            for partition in data.to_delayed():
+                self.append(partition.compute())
+        except BaseException:
+            self.abort_stream()
+            raise
+        self.finish_stream()
+
+    def start_stream(self):
+        self.loader.start_stream()
+
+    def append(self, data):
+        self.loader.append(data.compute() if hasattr(data, 'npartitions') else data)
+
+    def finish_stream(self):
+        self.loader.finish_stream()
+
+    def abort_stream(self):
+        self.loader.abort_stream()
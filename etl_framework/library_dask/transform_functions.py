@@ -1,6 +1,30 @@
 from etl_framework.abstract_etl_methods import Transformer
 import dask.dataframe as dd
 
+
+class DaskExpressionTransformer(Transformer):
+    # Column rules expressed as assign-style callables (DataFrame -> column)
+    def transform(self, data):
+        for column, expr in self.expressions(data).items():
+            data[column] = expr(data)
+        return data
+
+class DaskFusedTransformer(DaskExpressionTransformer):
+    # Several independent column rules compiled into one DataFrame.assign
+    def __init__(self, transformers):
+        self.transformers = transformers
+
+    def expressions(self, data):
+        items = {}
+        for transformer in self.transformers:
+            items.update(transformer.expressions(data))
+        return items
+
+    def transform(self, data):
+        items = self.expressions(data)
+        if items:
+            return data.assign(**items)
+        return data
 class DaskSimpleTransformer(Transformer):
     def transform(self, data):
         data.columns = [col.lower() for col in data.columns]
@@ -18,58 +42,134 @@ class DaskComplexTransformer(Transformer):
         return data
 
 class DaskRemoveDuplicatesTransformer(Transformer):
+    streamable = False
+
     def transform(self, data):
         return data.drop_duplicates()
 
 class DaskHandleMissingValuesTransformer(Transformer):
+    streamable = False
+
     def transform(self, data):
         return data.fillna(method='ffill').fillna(method='bfill')
 
-class DaskGenerateNewAttributesTransformer(Transformer):
-    def transform(self, data):
+class DaskGenerateNewAttributesTransformer(DaskExpressionTransformer):
+    input_columns = ('price',)
+    output_columns = ('new_attribute',)
+
+    def expressions(self, data):
         if 'price' in data.columns:
-            data['new_attribute'] = data['price'] * 2
-        return data
+            return {'new_attribute': lambda df: df['price'] * 2}
+        return {}
 
-class DaskCalculateAgeTransformer(Transformer):
-    def transform(self, data):
+class DaskCalculateAgeTransformer(DaskExpressionTransformer):
+    input_columns = ('age',)
+    output_columns = ('year_of_birth',)
+
+    def expressions(self, data):
         if 'age' in data.columns:
-            data['year_of_birth'] = 2024 - data['age'].astype(int)
-        return data
+            return {'year_of_birth': lambda df: 2024 - df['age'].astype(int)}
+        return {}
 
-class DaskApplyDiscountTransformer(Transformer):
-    def transform(self, data):
+class DaskApplyDiscountTransformer(DaskExpressionTransformer):
+    input_columns = ('price',)
+    output_columns = ('discounted_price',)
+
+    def expressions(self, data):
         if 'price' in data.columns:
-            data['discounted_price'] = data['price'] * 0.9
-        return data
+            return {'discounted_price': lambda df: df['price'] * 0.9}
+        return {}
 
-class DaskCapitalizeFirstLetterTransformer(Transformer):
-    def transform(self, data):
+class DaskCapitalizeFirstLetterTransformer(DaskExpressionTransformer):
+    input_columns = ('name',)
+    output_columns = ('name',)
+
+    def expressions(self, data):
         if 'name' in data.columns:
-             data['name'] = data['name'].str.capitalize()
-        return data
+             return {'name': lambda df: df['name'].str.capitalize()}
+        return {}
 
-class DaskMovingAverageTransformer(Transformer):
-    def transform(self, data):
+class DaskMovingAverageTransformer(DaskExpressionTransformer):
+    input_columns = ('price',)
+    output_columns = ('moving_average',)
+    window = 10
+    ordered_batches = True
+
+    def __init__(self):
+        self.tail = None
+
+    def expressions(self, data):
         # Rolling in dask is tricky, works best with time index or known partitions.
         # Assuming simple rolling if supported (usually needs map_overlap or similar if cross partition)
         # But Dask has rolling() on Series now.
         if 'price' in data.columns:
-             data['moving_average'] = data['price'].rolling(window=10).mean()
-        return data
+             return {'moving_average': lambda df: df['price'].rolling(window=self.window).mean()}
+        return {}
 
-class DaskImputeMeanTransformer(Transformer):
-    def transform(self, data):
+    def begin_stream(self):
+        self.tail = None
+
+    def transform_batch(self, data):
+        # Streaming hands over one partition at a time: prepend the previous partition's tail
+        import pandas as pd
+        if 'price' not in data.columns:
+            return data
+        carry = self.tail
+        window = self.window
+
+        def rolling_with_carry(partition):
+            prices = partition['price'].reset_index(drop=True)
+            if carry is not None:
+                prices = pd.concat([carry, prices], ignore_index=True)
+            partition = partition.copy()
+            partition['moving_average'] = prices.rolling(window=window).mean().iloc[len(prices) - len(partition):].to_numpy()
+            return partition
+
+        meta = data._meta.assign(moving_average=pd.Series(dtype='float64'))
+        result = data.map_partitions(rolling_with_carry, meta=meta)
+        last_prices = data['price'].tail(window - 1, compute=True).reset_index(drop=True)
+        self.tail = last_prices if carry is None else pd.concat([carry, last_prices], ignore_index=True).tail(window - 1)
+        return result
+
+class DaskImputeMeanTransformer(DaskExpressionTransformer):
+    requires_fit = True
+    input_columns = ('salary',)
+    output_columns = ('salary',)
+
+    def __init__(self):
+        self.total = 0.0
+        self.count = 0
+
+    def expressions(self, data):
+        if 'salary' in data.columns:
+            return {'salary': lambda df: df['salary'].fillna(df['salary'].mean())}
+        return {}
+
+    def partial_fit(self, data):
         if 'salary' in data.columns:
-            mean_val = data['salary'].mean()
-            data['salary'] = data['salary'].fillna(mean_val)
+            import dask
+            total, count = dask.compute(data['salary'].sum(), data['salary'].count())
+            self.total += total
+            self.count += int(count)
+
+    def transform_batch(self, data):
+        if 'salary' in data.columns and self.count:
+            data['salary'] = data['salary'].fillna(self.total / self.count)
         return data
 
-class DaskDaysSinceTransformer(Transformer):
-    def transform(self, data):
+class DaskDaysSinceTransformer(DaskExpressionTransformer):
+    input_columns = ('last_login',)
+    output_columns = ('last_login', 'days_since_login')
+
+    def expressions(self, data):
         if 'last_login' in data.columns:
             import pandas as pd
-            # Dask to_datetime
-            data['last_login'] = dd.to_datetime(data['last_login'], errors='coerce')
-            data['days_since_login'] = (pd.Timestamp.now() - data['last_login']).dt.days
-        return data
+            now = pd.Timestamp.now()
+            # Dask to_datetime, skipped when the extractor already read the column typed
+            if pd.api.types.is_datetime64_any_dtype(data['last_login'].dtype):
+                return {'days_since_login': lambda df: (now - df['last_login']).dt.days}
+            return {
+                'last_login': lambda df: dd.to_datetime(df['last_login'], errors='coerce'),
+                'days_since_login': lambda df: (now - dd.to_datetime(df['last_login'], errors='coerce')).dt.days,
+            }
+        return {}
@@ -1,26 +1,104 @@
-from etl_framework.library_duckdb.extract_functions import DuckDBCSVExtractor, DuckDBJSONExtractor, DuckDBParquetExtractor
+import duckdb
+
+from etl_framework.library_duckdb.extract_functions import (DuckDBCSVExtractor, DuckDBJSONExtractor, DuckDBParquetExtractor,
+                                                            DuckDBSQLiteExtractor, DuckDBArrowExtractor, DuckDBNDJSONExtractor)
 from etl_framework.library_duckdb.duckdb_transformation_strategy import DuckDBTransformationStrategyFactory
 from etl_framework.library_duckdb.load_functions import DuckDBFileLoader
+from etl_framework.utils.database.database_extractor_factory import DatabaseExtractorFactory
+from etl_framework.utils.database.database_loader_factory import DatabaseLoaderFactory
+from etl_framework.utils.database.extract_functions import ConvertedExtractor
+from etl_framework.utils.arrow_ipc import ARROW_SOURCES
+from etl_framework.utils.ndjson import NDJSON_SOURCES
+from etl_framework.utils.parquet_options import parquet_options
+from etl_framework.utils.frames import to_arrow_table
+from etl_framework.utils.schema import metadata_types, primary_key
 
 class DuckDBETLFactory:
-    def __init__(self, metadata):
+    def __init__(self, metadata, database=':memory:', threads=None, memory_limit=None, temp_directory=None):
         self.metadata = metadata
+        # One connection for the whole pipeline. memory_limit + temp_directory let DuckDB
+        # spill larger-than-RAM operators to disk; database can be an on-disk file.
+        self.database = database
+        self.threads = threads
+        self.memory_limit = memory_limit
+        self.temp_directory = temp_directory
+        self._connection = None
+        self._sqlite_loaded = None
+
+    def get_connection(self):
+        if self._connection is None:
+            self._connection = duckdb.connect(database=self.database)
+            if self.threads:
+                self._connection.execute(f"SET threads = {int(self.threads)}")
+            # Setting values are SQL string literals: single quotes are doubled
+            if self.memory_limit:
+                memory_limit = str(self.memory_limit).replace("'", "''")
+                self._connection.execute(f"SET memory_limit = '{memory_limit}'")
+            if self.temp_directory:
+                temp_directory = str(self.temp_directory).replace("'", "''")
+                self._connection.execute(f"SET temp_directory = '{temp_directory}'")
+        return self._connection
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+            self._sqlite_loaded = None
 
     def get_extractor(self, source_type, **kwargs):
+        con = self.get_connection()
         if source_type == "csv":
-            return DuckDBCSVExtractor(kwargs['file_path'], kwargs.get('separator', ';'))
+            return DuckDBCSVExtractor(kwargs['file_path'], kwargs.get('separator', ';'), con=con, columns=kwargs.get('columns'),
+                                      types=kwargs.get('types', metadata_types(self.metadata)))
         elif source_type == "json":
-            return DuckDBJSONExtractor(kwargs['file_path'])
+            return DuckDBJSONExtractor(kwargs['file_path'], con=con, columns=kwargs.get('columns'),
+                                       types=kwargs.get('types', metadata_types(self.metadata)))
+        elif source_type in NDJSON_SOURCES:
+            return DuckDBNDJSONExtractor(kwargs['file_path'], con=con, columns=kwargs.get('columns'),
+                                         types=kwargs.get('types', metadata_types(self.metadata)))
         elif source_type == "parquet":
-            return DuckDBParquetExtractor(kwargs['file_path'])
+            return DuckDBParquetExtractor(kwargs['file_path'], con=con, columns=kwargs.get('columns'),
+                                          filters=kwargs.get('filters'))
+        elif source_type in ARROW_SOURCES:
+            return DuckDBArrowExtractor(kwargs['file_path'], con=con, columns=kwargs.get('columns'))
+        elif source_type == "database":
+            if kwargs['db_type'] == 'sqlite' and not kwargs.get('partition_column') and self._sqlite_extension(con):
+                return DuckDBSQLiteExtractor(kwargs['db_path'], kwargs['query'], con=con, columns=kwargs.get('columns'),
+                                             types=kwargs.get('types', metadata_types(self.metadata)))
+            # Other databases: pooled pandas extractor, results registered as Arrow on a cursor
+            extractor = DatabaseExtractorFactory().get_extractor(**dict({'types': metadata_types(self.metadata)}, **kwargs))
+            return ConvertedExtractor(extractor, lambda data: con.cursor().from_arrow(to_arrow_table(data)))
         else:
             raise ValueError("Unknown source type")
 
+    def _sqlite_extension(self, con):
+        # INSTALL downloads the extension once; without it (offline) SQLite is read through the pool
+        if self._sqlite_loaded is None:
+            try:
+                con.execute("INSTALL sqlite")
+                con.execute("LOAD sqlite")
+                self._sqlite_loaded = True
+            except duckdb.Error as e:
+                print(f"DuckDB sqlite extension unavailable, reading SQLite through pandas: {e}")
+                self._sqlite_loaded = False
+        return self._sqlite_loaded
+
     def get_transformer_factory(self):
         return DuckDBTransformationStrategyFactory()
 
+    def from_arrow(self, table, batch=False):
+        # The relation scans the Arrow table in place
+        return self.get_connection().cursor().from_arrow(table)
+
     def get_loader(self, destination_type, **kwargs):
         if destination_type == "file":
-            return DuckDBFileLoader(kwargs['output_path'])
+            return DuckDBFileLoader(kwargs['output_path'], compression=kwargs.get('compression'),
+                                    parquet_options=parquet_options(kwargs), partition_by=kwargs.get('partition_by'),
+                                    max_file_bytes=kwargs.get('max_file_bytes'), mode=kwargs.get('mode', 'overwrite'),
+                                    key=kwargs.get('key', primary_key(self.metadata)))
+        elif destination_type == "database":
+            # Relations are fetched as Arrow by the database loaders
+            return DatabaseLoaderFactory().get_loader(**dict({'types': metadata_types(self.metadata),
+                                                              'key': primary_key(self.metadata)}, **kwargs))
         else:
             raise ValueError("Unknown destination type")
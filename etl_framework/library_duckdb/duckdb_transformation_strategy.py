@@ -26,3 +26,6 @@ class DuckDBTransformationStrategyFactory:
              return DuckDBDaysSinceTransformer()
         else:
             raise ValueError(f"Unknown transform type '{transform_type}' for DuckDB")
+
+    def fuse(self, transformers):
+        return DuckDBFusedTransformer(transformers)
@@ -1,26 +1,162 @@
 from etl_framework.abstract_etl_methods import Extractor
 import duckdb
+import pyarrow as pa
+
+from etl_framework.utils.arrow_ipc import ipc_batches, read_ipc_table
+from etl_framework.utils.partitioning import check_filters, parquet_source, sql_filter
+from etl_framework.utils.projection import csv_header
+from etl_framework.utils.schema import duckdb_types, restrict
+
+
+def _project(relation, columns):
+    # DuckDB pushes the projection down into the CSV/Parquet/JSON scan
+    if columns is None:
+        return relation
+    wanted = set(columns)
+    return relation.select(", ".join(f'"{c}"' for c in relation.columns if c in wanted))
+
+def _cast(relation, types):
+    # read_json(columns=...) would drop every unlisted key, so JSON is typed with CASTs
+    # in the projection instead; columns already of the target type are left alone.
+    target = duckdb_types(restrict(types, relation.columns)) if types else {}
+    current = dict(zip(relation.columns, (str(t) for t in relation.types)))
+    if all(current[c] == t for c, t in target.items()):
+        return relation
+    items = []
+    for column in relation.columns:
+        if column not in target or current[column] == target[column]:
+            items.append(f'"{column}"')
+        elif target[column] == 'TIMESTAMP' and current[column] in ('BIGINT', 'INTEGER'):
+            # JSON has no date type; integers are epoch milliseconds (the pandas to_json default)
+            items.append(f'epoch_ms("{column}") AS "{column}"')
+        else:
+            items.append(f'TRY_CAST("{column}" AS {target[column]}) AS "{column}"')
+    return relation.select(", ".join(items))
+
+def _relation_batches(con, relation, batch_size):
+    # fetch_record_batch keeps a query open on `con`; each batch is registered on its own
+    # cursor so transforming/loading it (possibly on another thread in pipelined mode)
+    # neither cancels the pending scan nor the queries of the other batches.
+    reader = relation.fetch_record_batch(batch_size)
+    for record_batch in reader:
+        yield con.cursor().from_arrow(pa.Table.from_batches([record_batch]))
 
 class DuckDBCSVExtractor(Extractor):
-    def __init__(self, file_path, separator=';'):
+    def __init__(self, file_path, separator=';', con=None, columns=None, types=None):
         self.file_path = file_path
         self.separator = separator
-        self.con = duckdb.connect(database=':memory:')
+        self.columns = columns
+        self.types = types
+        # The factory shares one connection across extractors; standalone use gets its own
+        self.con = con if con is not None else duckdb.connect(database=':memory:')
 
     def extract(self):
         # DuckDB relational API
         # read_csv_auto typically works well
-        return self.con.read_csv(self.file_path, sep=self.separator)
+        # Metadata types replace sniffing for the columns the header declares
+        dtype = duckdb_types(restrict(self.types, csv_header(self.file_path, self.separator))) if self.types else None
+        if dtype:
+            return _project(self.con.read_csv(self.file_path, sep=self.separator, dtype=dtype), self.columns)
+        return _project(self.con.read_csv(self.file_path, sep=self.separator), self.columns)
+
+    def extract_batches(self, batch_size):
+        return _relation_batches(self.con, self.extract(), batch_size)
 
 class DuckDBJSONExtractor(Extractor):
-    def __init__(self, file_path):
+    def __init__(self, file_path, con=None, columns=None, types=None):
         self.file_path = file_path
-        self.con = duckdb.connect(database=':memory:')
+        self.columns = columns
+        self.types = types
+        self.con = con if con is not None else duckdb.connect(database=':memory:')
+
+    def extract(self):
+        return _cast(_project(self.con.read_json(self.file_path), self.columns), self.types)
+
+class DuckDBNDJSONExtractor(Extractor):
+    # JSON Lines: DuckDB's reader splits the file across its threads and streams it into the query
+    def __init__(self, file_path, con=None, columns=None, types=None):
+        self.file_path = file_path
+        self.columns = columns
+        self.types = types
+        self.con = con if con is not None else duckdb.connect(database=':memory:')
+
+    def extract(self):
+        relation = self.con.read_json(self.file_path, format='newline_delimited')
+        return _cast(_project(relation, self.columns), self.types)
+
+    def extract_batches(self, batch_size):
+        return _relation_batches(self.con, self.extract(), batch_size)
 
 class DuckDBParquetExtractor(Extractor):
-    def __init__(self, file_path):
+    def __init__(self, file_path, con=None, columns=None, filters=None):
         self.file_path = file_path
-        self.con = duckdb.connect(database=':memory:')
+        self.columns = columns
+        # [(column, operator, value)]: hive partitions and row groups that cannot match are never read
+        self.filters = check_filters(filters)
+        self.con = con if con is not None else duckdb.connect(database=':memory:')
 
     def extract(self):
-        return self.con.read_parquet(self.file_path)
+        relation = self.con.read_parquet(parquet_source(self.file_path), hive_partitioning=True)
+        if self.filters:
+            # Filtered before the projection, so the filter columns need not be selected
+            relation = relation.filter(sql_filter(self.filters))
+        return _project(relation, self.columns)
+
+    def extract_batches(self, batch_size):
+        return _relation_batches(self.con, self.extract(), batch_size)
+
+class DuckDBArrowExtractor(Extractor):
+    # Arrow IPC / Feather: the relation scans the memory-mapped table in place (no extension needed)
+    def __init__(self, file_path, con=None, columns=None):
+        self.file_path = file_path
+        self.columns = columns
+        self.con = con if con is not None else duckdb.connect(database=':memory:')
+
+    def extract(self):
+        return self.con.from_arrow(read_ipc_table(self.file_path, self.columns))
+
+    def extract_batches(self, batch_size):
+        # The file's record batches are already separate tables; each gets its own cursor
+        for table in ipc_batches(self.file_path, batch_size, self.columns):
+            yield self.con.cursor().from_arrow(table)
+
+class DuckDBSQLiteExtractor(Extractor):
+    """
+    ATTACHes the SQLite file to the pipeline connection (sqlite extension) and runs the
+    query inside DuckDB, so the scan, the transforms and the COPY sink are one query.
+    Unqualified table names in the query resolve against the attached database
+    (after the connection's own tables).
+    """
+    def __init__(self, db_path, query, con=None, columns=None, types=None):
+        self.db_path = db_path
+        self.query = query
+        self.columns = columns
+        self.types = types
+        self.con = con if con is not None else duckdb.connect(database=':memory:')
+
+    def _attach(self):
+        alias = f"sqlite_{abs(hash(self.db_path))}"
+        attached = {row[0] for row in self.con.execute("SELECT database_name FROM duckdb_databases()").fetchall()}
+        if alias not in attached:
+            path = self.db_path.replace("'", "''")
+            self.con.execute(f"ATTACH '{path}' AS {alias} (TYPE sqlite, READ_ONLY)")
+        self._search_attached(alias)
+        return alias
+
+    def _search_attached(self, alias):
+        # DuckDB binds a lazy relation again each time it runs (projection, COPY, batches), so a
+        # USE around con.sql() is not enough: the attached database stays on the connection's
+        # search_path after the default one, where unqualified names are created and looked up first
+        search_path = self.con.execute("SELECT current_setting('search_path')").fetchone()[0]
+        entries = [entry for entry in search_path.split(',') if entry]
+        if not entries:
+            entries = [self.con.execute("SELECT current_database()").fetchone()[0]]
+        if alias not in entries:
+            self.con.execute(f"SET search_path = '{','.join(entries + [alias])}'")
+
+    def extract(self):
+        self._attach()
+        return _cast(_project(self.con.sql(self.query), self.columns), self.types)
+
+    def extract_batches(self, batch_size):
+        return _relation_batches(self.con, self.extract(), batch_size)
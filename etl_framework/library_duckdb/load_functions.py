@@ -1,30 +1,139 @@
 from etl_framework.abstract_etl_methods import Loader
+from etl_framework.utils.arrow_ipc import IPCFileWriter, check_compression, is_arrow_path
+from etl_framework.utils.merge import check_merge_mode, merge_file
+from etl_framework.utils.ndjson import duckdb_ndjson_lines, is_ndjson_path
+from etl_framework.utils.parquet_options import ParquetFileWriter, duckdb_parquet_options
+from etl_framework.utils.partitioning import (PartitionedParquetWriter, duckdb_partition_select, partition_keys,
+                                              reset_dataset)
 import duckdb
+import json
+import pyarrow as pa
+
+# Rows per record batch when a relation is streamed into a pyarrow writer
+_BATCH_ROWS = 122_880
 
 class DuckDBFileLoader(Loader):
-    def __init__(self, output_path):
+    def __init__(self, output_path, compression=None, parquet_options=None, partition_by=None, max_file_bytes=None,
+                 mode='overwrite', key=None):
         self.output_path = output_path
+        # mode='merge': upsert on `key` into a Parquet file or directory of parts (see utils/merge.py)
+        self.key = check_merge_mode(mode, key, output_path, partition_by)
+        self.mode = mode
+        # Arrow IPC / Feather outputs: None, 'lz4' or 'zstd' (Parquet codecs come in parquet_options)
+        self.compression = check_compression(compression) if is_arrow_path(output_path) else None
+        # Parquet write settings (see utils/parquet_options.py)
+        self.parquet_options = parquet_options or {}
+        # partition_by: output_path becomes a hive-partitioned Parquet dataset (see utils/partitioning.py)
+        self.partition_by = partition_by
+        self.max_file_bytes = max_file_bytes
+        self._writer = None
+        self._schema = None
+        self._handle = None
+        self._first_batch = True
 
     def load(self, relation):
-        # relation is a DuckDBPyRelation
+        # relation is a DuckDBPyRelation. COPY runs on the relation's own connection, so
+        # scan -> transforms -> write execute as one streaming DuckDB query (no materialization).
+        if self.mode == 'merge':
+            return merge_file(self.output_path, relation, self.key)
+        parquet_copy_options = duckdb_parquet_options(self.parquet_options)
+        if self.partition_by and (self.max_file_bytes or parquet_copy_options is None):
+            # COPY cannot combine PARTITION_BY with FILE_SIZE_BYTES (nor skip statistics):
+            # the result goes through the shared writer
+            return self._write_batches(relation, self._partitioned_writer())
+        if self.partition_by:
+            # Native partitioned COPY: still one streaming query, written by DuckDB's threads
+            keys = partition_keys(self.partition_by)
+            partition_columns = ", ".join(f'"{key}"' for _, _, key in keys)
+            reset_dataset(self.output_path)
+            relation.query("etl_load_source",
+                           f"COPY (SELECT {duckdb_partition_select(keys)} FROM etl_load_source) "
+                           f"TO '{self._quoted_path()}' ({parquet_copy_options}, PARTITION_BY ({partition_columns}), "
+                           f"OVERWRITE_OR_IGNORE true)")
+            return
+        if is_arrow_path(self.output_path):
+            # COPY has no Arrow IPC format: the query result is streamed out as record batches
+            return self._write_batches(relation, IPCFileWriter(self.output_path, self.compression))
+        if self.output_path.endswith('.parquet') and parquet_copy_options is None:
+            # COPY always writes statistics; with write_statistics=False pyarrow writes the file
+            return self._write_batches(relation, ParquetFileWriter(self.output_path, self.parquet_options))
+        relation.query("etl_load_source", f"COPY etl_load_source TO '{self._quoted_path()}' ({self._copy_options()})")
+
+    def _write_batches(self, relation, writer):
+        try:
+            for record_batch in relation.fetch_record_batch(_BATCH_ROWS):
+                writer.write(pa.Table.from_batches([record_batch]))
+        finally:
+            writer.close()
+
+    def _quoted_path(self):
+        return self.output_path.replace("'", "''")
+
+    def _copy_options(self):
         if self.output_path.endswith('.parquet'):
-            relation.write_parquet(self.output_path)
+            return duckdb_parquet_options(self.parquet_options)
+        elif is_ndjson_path(self.output_path):
+            # FORMAT JSON writes one object per line unless ARRAY is set
+            return "FORMAT JSON"
         elif self.output_path.endswith('.json'):
-            # DuckDB Python API might lack write_json directly on relation, use SQL
-            relation.to_table("temp_load_table") # register as temp table to assume connection context? 
-            # Or execute sql directly on relation alias.
-            # safe approach:
-            relation.sql_query().to_csv(self.output_path, sep=',', quotechar='"', header=True) 
-            # WAIT, COPY (FORMAT JSON) is better.
-            # python api doesn't expose it easily on relation object without registering.
-            # workaround: utilize write_csv for now or skip JSON explicitly if unsupported.
-            # actually relation.write_csv exists.
-            # Let's try direct SQL via connection if we had access, but relation encapsulates connection usually.
-            conn = duckdb.connect(database=':memory:') 
-            # This is tricky because relation belongs to another connection.
-            # Let's assume relation.write_csv is enough for now or drop JSON for DuckDB until we register view.
-            # Better approach:
-            relation.create("temp_json_export")
-            duckdb.sql(f"COPY temp_json_export TO '{self.output_path}' (FORMAT JSON, ARRAY true)")
+            return "FORMAT JSON, ARRAY true"
         else:
-            relation.write_csv(self.output_path, sep=';')
+            return "FORMAT CSV, DELIMITER ';', HEADER true"
+
+    def _partitioned_writer(self):
+        return PartitionedParquetWriter(self.output_path, self.partition_by, self.parquet_options, self.max_file_bytes)
+
+    # Streaming mode: each batch relation is fetched as Arrow and appended to one file
+    def start_stream(self):
+        self._first_batch = True
+        if self.mode == 'merge':
+            return
+        if self.partition_by:
+            self._writer = self._partitioned_writer()
+        elif self.output_path.endswith('.parquet'):
+            self._writer = ParquetFileWriter(self.output_path, self.parquet_options)
+        elif is_ndjson_path(self.output_path):
+            self._handle = open(self.output_path, 'w', encoding='utf8')
+        elif self.output_path.endswith('.json'):
+            self._handle = open(self.output_path, 'w', encoding='utf8')
+            self._handle.write('[')
+
+    def append(self, relation):
+        import pyarrow.csv as pa_csv
+        if self.mode == 'merge':
+            # Every batch is a staged merge of its own
+            return merge_file(self.output_path, relation, self.key)
+        if is_ndjson_path(self.output_path):
+            # The batch's lines are rendered by DuckDB itself, as COPY would write them
+            self._handle.write(duckdb_ndjson_lines(relation))
+            return
+        table = relation.fetch_arrow_table()
+        if self.partition_by or self.output_path.endswith('.parquet'):
+            self._writer.write(table)
+        elif is_arrow_path(self.output_path):
+            if self._writer is None:
+                self._writer = IPCFileWriter(self.output_path, self.compression)
+            self._writer.write(table)
+        elif self.output_path.endswith('.json'):
+            records = json.dumps(table.to_pylist(), default=str)[1:-1]
+            if records:
+                if not self._first_batch:
+                    self._handle.write(',')
+                self._handle.write(records)
+                self._first_batch = False
+        else:
+            if self._writer is None:
+                self._schema = table.schema
+                self._writer = pa_csv.CSVWriter(self.output_path, table.schema,
+                                                write_options=pa_csv.WriteOptions(delimiter=';'))
+            self._writer.write_table(table.cast(self._schema))
+
+    def finish_stream(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._handle is not None:
+            if self.output_path.endswith('.json'):
+                self._handle.write(']')
+            self._handle.close()
+            self._handle = None
@@ -1,6 +1,32 @@
 from etl_framework.abstract_etl_methods import Transformer
 import duckdb
 
+
+def _select_with(relation, items):
+    # Single projection: replaced columns keep their position, new ones are appended
+    selection_parts = [f'{items[c]} as "{c}"' if c in items else f'"{c}"' for c in relation.columns]
+    selection_parts += [f'{expr} as "{c}"' for c, expr in items.items() if c not in relation.columns]
+    return relation.select(", ".join(selection_parts))
+
+class DuckDBExpressionTransformer(Transformer):
+    # Column rules expressed as SQL snippets; applied with a single SELECT
+    def transform(self, relation):
+        items = self.expressions(relation)
+        if items:
+            return _select_with(relation, items)
+        return relation
+
+class DuckDBFusedTransformer(DuckDBExpressionTransformer):
+    # Several independent column rules compiled into one SELECT over the relation
+    def __init__(self, transformers):
+        self.transformers = transformers
+
+    def expressions(self, relation):
+        items = {}
+        for transformer in self.transformers:
+            items.update(transformer.expressions(relation))
+        return items
+
 class DuckDBSimpleTransformer(Transformer):
     def transform(self, relation):
         # Rename columns to lower case
@@ -24,6 +50,8 @@ class DuckDBComplexTransformer(Transformer):
         return relation
 
 class DuckDBRemoveDuplicatesTransformer(Transformer):
+    streamable = False
+
     def transform(self, relation):
         return relation.distinct()
 
@@ -38,56 +66,122 @@ class DuckDBHandleMissingValuesTransformer(Transformer):
         # We'll try to execute a SQL query on the relation view.
         return relation
 
-class DuckDBGenerateNewAttributesTransformer(Transformer):
-    def transform(self, relation):
+class DuckDBGenerateNewAttributesTransformer(DuckDBExpressionTransformer):
+    input_columns = ('price',)
+    output_columns = ('new_attribute',)
+
+    def expressions(self, relation):
         if 'price' in relation.columns:
-            return relation.select('*, (price * 2) as new_attribute')
-        return relation
+            return {'new_attribute': '(price * 2)'}
+        return {}
 
-class DuckDBCalculateAgeTransformer(Transformer):
-    def transform(self, relation):
+class DuckDBCalculateAgeTransformer(DuckDBExpressionTransformer):
+    input_columns = ('age',)
+    output_columns = ('year_of_birth',)
+
+    def expressions(self, relation):
         if 'age' in relation.columns:
-            return relation.select('*, (2024 - cast(age as integer)) as year_of_birth')
-        return relation
+            return {'year_of_birth': '(2024 - cast(age as integer))'}
+        return {}
 
-class DuckDBApplyDiscountTransformer(Transformer):
-    def transform(self, relation):
+class DuckDBApplyDiscountTransformer(DuckDBExpressionTransformer):
+    input_columns = ('price',)
+    output_columns = ('discounted_price',)
+
+    def expressions(self, relation):
         if 'price' in relation.columns:
-            return relation.select('*, (price * 0.9) as discounted_price')
-        return relation
+            return {'discounted_price': '(price * 0.9)'}
+        return {}
 
-class DuckDBCapitalizeFirstLetterTransformer(Transformer):
-    def transform(self, relation):
+class DuckDBCapitalizeFirstLetterTransformer(DuckDBExpressionTransformer):
+    input_columns = ('name',)
+    output_columns = ('name',)
+
+    def expressions(self, relation):
         if 'name' in relation.columns:
-            # Explicitly select all other columns and the transformed name
-            remaining_cols = [c for c in relation.columns if c != 'name']
-            # safely quote columns
-            selection_parts = [f'"{c}"' for c in remaining_cols]
-            selection_parts.append("(upper(substr(name, 1, 1)) || lower(substr(name, 2))) as name")
-            selection_str = ", ".join(selection_parts)
-            return relation.select(selection_str)
-        return relation
+            return {'name': "(upper(substr(name, 1, 1)) || lower(substr(name, 2)))"}
+        return {}
 
-class DuckDBMovingAverageTransformer(Transformer):
-    def transform(self, relation):
+class DuckDBMovingAverageTransformer(DuckDBExpressionTransformer):
+    input_columns = ('price',)
+    output_columns = ('moving_average',)
+    window = 10
+    ordered_batches = True
+
+    def __init__(self):
+        self.tail = []
+
+    def expressions(self, relation):
         if 'price' in relation.columns:
             # Window function
-            return relation.select('*, avg(price) OVER (ROWS BETWEEN 9 PRECEDING AND CURRENT ROW) as moving_average')
-        return relation
+            return {'moving_average': 'avg(price) OVER (ROWS BETWEEN 9 PRECEDING AND CURRENT ROW)'}
+        return {}
 
-class DuckDBImputeMeanTransformer(Transformer):
-    def transform(self, relation):
+    def begin_stream(self):
+        self.tail = []
+
+    def transform_batch(self, relation):
+        if 'price' not in relation.columns:
+            return relation
+        # The previous batch's last prices are unioned in front of this batch (negative row numbers)
+        # so the window sees the same 10 rows it would see in whole-file mode.
+        carry = " UNION ALL ".join(
+            f"SELECT CAST({'NULL' if price is None else price} AS DOUBLE) AS price, {position - len(self.tail)} AS __rn"
+            for position, price in enumerate(self.tail)
+        )
+        prices = "SELECT CAST(price AS DOUBLE) AS price, __rn FROM numbered"
+        if carry:
+            prices = f"{carry} UNION ALL {prices}"
+        ctes = f"""
+            WITH numbered AS (SELECT *, row_number() OVER () AS __rn FROM batch),
+                 prices AS ({prices})
+        """
+
+        last_prices = relation.query("batch", f"{ctes} SELECT price FROM prices ORDER BY __rn DESC LIMIT {self.window - 1}").fetchall()
+        self.tail = [row[0] for row in reversed(last_prices)]
+
+        return relation.query("batch", f"""
+            {ctes},
+                 averaged AS (
+                     SELECT __rn, avg(price) OVER (ORDER BY __rn ROWS BETWEEN {self.window - 1} PRECEDING AND CURRENT ROW) AS moving_average
+                     FROM prices
+                 )
+            SELECT numbered.* EXCLUDE (__rn), averaged.moving_average
+            FROM numbered JOIN averaged USING (__rn)
+            ORDER BY __rn
+        """)
+
+class DuckDBImputeMeanTransformer(DuckDBExpressionTransformer):
+    requires_fit = True
+    input_columns = ('salary',)
+    output_columns = ('salary',)
+
+    def __init__(self):
+        self.total = 0.0
+        self.count = 0
+
+    def expressions(self, relation):
+        if 'salary' in relation.columns:
+            return {'salary': "COALESCE(salary, AVG(salary) OVER ())"}
+        return {}
+
+    def partial_fit(self, relation):
         if 'salary' in relation.columns:
-            remaining_cols = [c for c in relation.columns if c != 'salary']
-            selection_parts = [f'"{c}"' for c in remaining_cols]
-            selection_parts.append("COALESCE(salary, AVG(salary) OVER ()) as salary")
-            selection_str = ", ".join(selection_parts)
-            return relation.select(selection_str)
+            total, count = relation.aggregate("sum(salary), count(salary)").fetchone()
+            self.total += total or 0.0
+            self.count += count
+
+    def transform_batch(self, relation):
+        if 'salary' in relation.columns and self.count:
+            return _select_with(relation, {'salary': f"COALESCE(salary, {self.total / self.count})"})
         return relation
 
-class DuckDBDaysSinceTransformer(Transformer):
-    def transform(self, relation):
+class DuckDBDaysSinceTransformer(DuckDBExpressionTransformer):
+    input_columns = ('last_login',)
+    output_columns = ('days_since_login',)
+
+    def expressions(self, relation):
         if 'last_login' in relation.columns:
              # date_diff('day', last_login, current_date())
-             return relation.select("*, date_diff('day', CAST(last_login AS TIMESTAMP), current_timestamp) as days_since_login")
-        return relation
+             return {'days_since_login': "date_diff('day', CAST(last_login AS TIMESTAMP), current_timestamp)"}
+        return {}
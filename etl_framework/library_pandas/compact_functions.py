@@ -0,0 +1,63 @@
+import pandas as pd
+import pyarrow as pa
+
+from etl_framework.utils.compaction import smallest_integer_dtype
+
+
+def _is_text(series):
+    if isinstance(series.dtype, pd.StringDtype):
+        return True
+    if isinstance(series.dtype, pd.ArrowDtype):
+        return pa.types.is_string(series.dtype.pyarrow_dtype) or pa.types.is_large_string(series.dtype.pyarrow_dtype)
+    return series.dtype == object and pd.api.types.infer_dtype(series, skipna=True) == 'string'
+
+class PandasMemoryCompactor:
+    # Memory-compact pass: low-cardinality strings -> category, narrow numerics,
+    # Arrow-backed strings for the rest. Returns the frame and {column: (bytes_before, bytes_after)}.
+    def __init__(self, category_threshold=0.5, downcast=True, arrow_strings=True, categories=(), min_int_width=32):
+        self.category_threshold = category_threshold
+        self.downcast = downcast
+        self.min_int_width = min_int_width
+        self.arrow_strings = arrow_strings
+        self.categories = set(categories or ())
+
+    def compact(self, data):
+        before = data.memory_usage(deep=True, index=False)
+        converted = {}
+        for column in data.columns:
+            target = self._target_dtype(column, data[column])
+            if target is not None:
+                converted[column] = data[column].astype(target)
+        if converted:
+            data = data.assign(**converted)
+        after = data.memory_usage(deep=True, index=False)
+        return data, {column: (int(before[column]), int(after[column])) for column in data.columns}
+
+    def _target_dtype(self, column, series):
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return None
+        if _is_text(series):
+            count = series.count()
+            if column in self.categories or (count and series.nunique() / count <= self.category_threshold):
+                return 'category'
+            if self.arrow_strings and not isinstance(series.dtype, pd.ArrowDtype) \
+                    and getattr(series.dtype, 'storage', None) != 'pyarrow':
+                return 'string[pyarrow]'
+            return None
+        if not self.downcast or pd.api.types.is_bool_dtype(series.dtype):
+            return None
+        if pd.api.types.is_integer_dtype(series.dtype):
+            if series.count() == 0:
+                return None
+            target = smallest_integer_dtype(series.min(), series.max(),
+                                            nullable=isinstance(series.dtype, pd.api.extensions.ExtensionDtype),
+                                            min_width=self.min_int_width)
+            if isinstance(series.dtype, pd.ArrowDtype):
+                target = f"{target.lower()}[pyarrow]"
+            return None if target == series.dtype else target
+        if series.dtype == 'float64' or series.dtype == 'double[pyarrow]':
+            # float32 only when every value survives the round trip unchanged
+            narrow = series.astype('float32')
+            if ((narrow.astype('float64') == series) | series.isna()).all():
+                return 'float[pyarrow]' if isinstance(series.dtype, pd.ArrowDtype) else 'float32'
+        return None
@@ -1,34 +1,85 @@
-from etl_framework.library_pandas.extract_functions import PandasCSVExtractor, PandasJSONExtractor, PandasHDF5Extractor, PandasParquetExtractor
+from etl_framework.library_pandas.extract_functions import (PandasCSVExtractor, PandasJSONExtractor, PandasHDF5Extractor,
+                                                            PandasParquetExtractor, PandasArrowExtractor,
+                                                            PandasNDJSONExtractor)
 from etl_framework.library_pandas.pandas_transformation_strategy import PandasTransformationStrategyFactory
 from etl_framework.library_pandas.load_functions import PandasFileLoader
+from etl_framework.library_pandas.compact_functions import PandasMemoryCompactor
+from etl_framework.library_pandas.sharded_execution import PandasShardedExecutor
 from etl_framework.utils.database.database_extractor_factory import DatabaseExtractorFactory
 from etl_framework.utils.database.database_loader_factory import DatabaseLoaderFactory
+from etl_framework.utils.arrow_ipc import ARROW_SOURCES
+from etl_framework.utils.ndjson import NDJSON_SOURCES
+from etl_framework.utils.parquet_options import parquet_options
+from etl_framework.utils.schema import metadata_types, primary_key
+import contextlib
+import pandas as pd
+
+
+def copy_on_write():
+    # pandas 3 always copies on write; 2.x needs the option so chained transforms share buffers
+    if int(pd.__version__.split('.')[0]) < 3:
+        return pd.option_context('mode.copy_on_write', True)
+    return contextlib.nullcontext()
 
 class PandasETLFactory:
-    def __init__(self, metadata):
+    def __init__(self, metadata, arrow=False):
       self.metadata = metadata
+      # arrow=True ('pandas_arrow'): pyarrow CSV engine, dtype_backend='pyarrow' and copy-on-write
+      self.arrow = arrow
+
+    def engine_options(self):
+        # Library options for the length of one processor run only, so they do not leak
+        # into the runs of other engines in the same process (benchmark matrix)
+        return copy_on_write() if self.arrow else contextlib.nullcontext()
 
     def get_extractor(self, source_type, **kwargs):
         if source_type == "csv":
-            return PandasCSVExtractor(kwargs['file_path'], kwargs['separator'])
+            return PandasCSVExtractor(kwargs['file_path'], kwargs['separator'], columns=kwargs.get('columns'),
+                                      types=kwargs.get('types', metadata_types(self.metadata)), arrow=self.arrow,
+                                      byte_range=kwargs.get('byte_range'))
         elif source_type == "json":
-            return PandasJSONExtractor(kwargs['file_path'])
+            return PandasJSONExtractor(kwargs['file_path'], columns=kwargs.get('columns'),
+                                       types=kwargs.get('types', metadata_types(self.metadata)), arrow=self.arrow)
+        elif source_type in NDJSON_SOURCES:
+            return PandasNDJSONExtractor(kwargs['file_path'], columns=kwargs.get('columns'),
+                                         types=kwargs.get('types', metadata_types(self.metadata)), arrow=self.arrow,
+                                         byte_range=kwargs.get('byte_range'))
         elif source_type == "hdf5":
-            return PandasHDF5Extractor(kwargs['file_path'])
+            return PandasHDF5Extractor(kwargs['file_path'], columns=kwargs.get('columns'), arrow=self.arrow)
         elif source_type == "parquet":
-            return PandasParquetExtractor(kwargs['file_path'])
+            return PandasParquetExtractor(kwargs['file_path'], columns=kwargs.get('columns'), arrow=self.arrow,
+                                          row_groups=kwargs.get('row_groups'), watermark=kwargs.get('watermark'),
+                                          filters=kwargs.get('filters'))
+        elif source_type in ARROW_SOURCES:
+            return PandasArrowExtractor(kwargs['file_path'], columns=kwargs.get('columns'), arrow=self.arrow)
         elif source_type == "database":
-            return DatabaseExtractorFactory().get_extractor( **kwargs)
+            return DatabaseExtractorFactory().get_extractor(**dict({'types': metadata_types(self.metadata)}, **kwargs))
         else:
             raise ValueError("Unknown source type")
 
     def get_transformer_factory(self):
           return PandasTransformationStrategyFactory()
 
+    def from_arrow(self, table, batch=False):
+        # Arrow-backed columns keep the table's buffers; NumPy dtypes need a conversion copy
+        return table.to_pandas(types_mapper=pd.ArrowDtype) if self.arrow else table.to_pandas()
+
+    def get_compactor(self, **options):
+        return PandasMemoryCompactor(**options)
+
+    def get_sharded_executor(self, processes=None, shard_output='merge', shards=None):
+        return PandasShardedExecutor(self, processes, shard_output, shards)
+
     def get_loader(self, destination_type, **kwargs):
         if destination_type == "file":
-            return PandasFileLoader(kwargs['output_path'])
+            return PandasFileLoader(kwargs['output_path'], mode=kwargs.get('mode', 'overwrite'),
+                                    key=kwargs.get('key', primary_key(self.metadata)),
+                                    compression=kwargs.get('compression'),
+                                    parquet_options=parquet_options(kwargs), partition_by=kwargs.get('partition_by'),
+                                    max_file_bytes=kwargs.get('max_file_bytes'))
         elif destination_type == "database":
-            return DatabaseLoaderFactory().get_loader(**kwargs)
+            # Typed DDL: the metadata types unless loader_params bring their own
+            return DatabaseLoaderFactory().get_loader(**dict({'types': metadata_types(self.metadata),
+                                                              'key': primary_key(self.metadata)}, **kwargs))
         else:
             raise ValueError("Unknown destination type")
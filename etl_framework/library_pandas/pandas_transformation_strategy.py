@@ -29,4 +29,7 @@ class PandasTransformationStrategyFactory:
         elif transform_type == "translate_attributes":
             return TranslateAttributesTransformer(idiom)
         else:
-            raise ValueError(f"Unknown transform type '{transform_type}'")
\ No newline at end of file
+            raise ValueError(f"Unknown transform type '{transform_type}'")
+
+    def fuse(self, transformers):
+        return PandasFusedTransformer(transformers)
@@ -0,0 +1,193 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import psutil
+
+from etl_framework.utils.ndjson import NDJSON_SOURCES
+
+
+def plan_line_shards(file_path, shards, header=True):
+    """
+    Splits a CSV body (or a JSON Lines file, header=False) into about `shards` byte ranges,
+    each starting at a line start. Records must not contain quoted newlines (true for the
+    benchmark datasets).
+    """
+    size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as f:
+        if header:
+            f.readline()
+        body_start = f.tell()
+        step = max((size - body_start) // shards, 1)
+        bounds = [body_start]
+        while bounds[-1] + step < size:
+            f.seek(bounds[-1] + step)
+            f.readline()
+            if f.tell() >= size:
+                break
+            bounds.append(f.tell())
+    bounds.append(size)
+    return [{'byte_range': (start, end)} for start, end in zip(bounds, bounds[1:]) if end > start]
+
+
+def plan_parquet_shards(file_path, shards):
+    # Row groups are the unit of a Parquet shard; a single-group file gives one shard
+    import pyarrow.parquet as pq
+    groups = list(range(pq.ParquetFile(file_path).num_row_groups))
+    shards = max(min(shards, len(groups)), 1)
+    size = -(-len(groups) // shards)
+    return [{'row_groups': groups[i:i + size]} for i in range(0, len(groups), size)]
+
+
+def _begin(transformer):
+    if hasattr(transformer, 'begin_stream'):
+        transformer.begin_stream()
+
+
+def _apply(transformer, data):
+    if hasattr(transformer, 'transform_batch'):
+        return transformer.transform_batch(data)
+    return transformer.transform(data)
+
+
+def _shard_prefix(factory, source_type, extractor_params, chain, halos):
+    # Extract one shard and run `chain` over it. Order-dependent transformers are first
+    # primed with the rows that precede the shard (the halo), so their window is exact.
+    timings = {}
+    started = time.perf_counter()
+    data = factory.get_extractor(source_type, **extractor_params).extract()
+    timings['extraction'] = time.perf_counter() - started
+    for position, (phase, transformer) in enumerate(chain):
+        started = time.perf_counter()
+        _begin(transformer)
+        if halos.get(position) is not None:
+            _apply(transformer, halos[position].copy())
+        data = _apply(transformer, data)
+        timings[phase] = timings.get(phase, 0) + time.perf_counter() - started
+    return data, timings
+
+
+def _fit_shard(factory, source_type, extractor_params, chain, halos, transformer):
+    data, _ = _shard_prefix(factory, source_type, extractor_params, chain, halos)
+    transformer.partial_fit(data)
+    return transformer
+
+
+def _tail_shard(factory, source_type, extractor_params, chain, halos, rows):
+    data, _ = _shard_prefix(factory, source_type, extractor_params, chain, halos)
+    return data.tail(rows)
+
+
+def _run_shard(factory, source_type, extractor_params, chain, halos, part_loader_params):
+    data, timings = _shard_prefix(factory, source_type, extractor_params, chain, halos)
+    if part_loader_params is not None:
+        started = time.perf_counter()
+        factory.get_loader('file', **part_loader_params).load(data)
+        timings['loading'] = time.perf_counter() - started
+        data = None
+    return data, timings, psutil.Process(os.getpid()).memory_info().rss
+
+
+class PandasShardedExecutor:
+    """
+    Runs extract + transform of a CSV / JSON Lines (byte ranges) or Parquet (row groups)
+    file in a ProcessPoolExecutor, one task per shard.
+
+    Whole-dataset state is computed before the main pass: requires_fit transformers
+    (impute_mean) are partially fitted per shard and merged with merge_fit, and
+    ordered transformers (moving_average) receive the last `halo_rows` rows before
+    their shard. shard_output='merge' streams the shards in order into the loader,
+    'parts' makes every worker write its own part file into the output directory.
+    """
+    def __init__(self, factory, processes=None, shard_output='merge', shards=None):
+        if shard_output not in ('merge', 'parts'):
+            raise ValueError("shard_output must be 'merge' or 'parts'")
+        self.factory = factory
+        self.processes = processes or os.cpu_count()
+        self.shard_output = shard_output
+        # One shard per process unless asked otherwise (more shards balance uneven rows)
+        self.shards = shards or self.processes
+
+    def plan(self, source_type, extractor_params):
+        if source_type == "csv":
+            return plan_line_shards(extractor_params['file_path'], self.shards)
+        elif source_type in NDJSON_SOURCES:
+            return plan_line_shards(extractor_params['file_path'], self.shards, header=False)
+        elif source_type == "parquet":
+            if os.path.isdir(extractor_params['file_path']) or extractor_params.get('filters'):
+                raise ValueError("Sharded mode splits single Parquet files; read partitioned datasets "
+                                 "or filtered sources in whole or streaming mode")
+            return plan_parquet_shards(extractor_params['file_path'], self.shards)
+        else:
+            raise ValueError(f"Sharded mode supports csv, ndjson and parquet sources, not '{source_type}'")
+
+    def run(self, source_type, extractor_params, destination_type, loader_params, loader, chain, monitor):
+        if self.shard_output == 'parts' and destination_type != 'file':
+            raise ValueError("shard_output='parts' needs a file destination")
+        shard_params = [dict(extractor_params, **shard) for shard in self.plan(source_type, extractor_params)]
+        monitor.record_metric("sharded", "shards", len(shard_params))
+        monitor.record_metric("sharded", "processes", self.processes)
+
+        chain = list(chain)
+        halos = [{} for _ in shard_params]
+        with ProcessPoolExecutor(max_workers=self.processes) as pool:
+            # Stateful positions are resolved in chain order: each pass runs the prefix
+            # (already fitted / primed) on every shard in parallel.
+            for position, (phase, transformer) in enumerate(chain):
+                prefix = chain[:position]
+                if getattr(transformer, 'requires_fit', False):
+                    started = time.perf_counter()
+                    fitted = list(pool.map(_fit_shard, *self._args(source_type, shard_params, prefix, halos),
+                                           [transformer] * len(shard_params)))
+                    # Kept inside the "sharded" span, which already holds the wall time
+                    monitor.add_metric("sharded", "fit_pass_seconds", time.perf_counter() - started)
+                    merged = fitted[0]
+                    for other in fitted[1:]:
+                        merged.merge_fit(other)
+                    chain[position] = (phase, merged)
+                elif getattr(transformer, 'ordered_batches', False):
+                    rows = getattr(transformer, 'halo_rows', 0)
+                    if not rows:
+                        raise ValueError(f"{type(transformer).__name__} depends on batch order and declares no halo_rows")
+                    started = time.perf_counter()
+                    tails = list(pool.map(_tail_shard, *self._args(source_type, shard_params, prefix, halos),
+                                          [rows] * len(shard_params)))
+                    monitor.add_metric("sharded", "halo_pass_seconds", time.perf_counter() - started)
+                    # The halo of shard i is the last `rows` rows of everything before it
+                    previous = None
+                    for index, tail in enumerate(tails):
+                        halos[index][position] = previous
+                        previous = tail if previous is None else pd.concat([previous, tail]).tail(rows)
+
+            part_params = [None] * len(shard_params)
+            if self.shard_output == 'parts':
+                output_dir = loader_params['output_path']
+                extension = os.path.splitext(output_dir)[1] or '.csv'
+                os.makedirs(output_dir, exist_ok=True)
+                part_params = [dict(loader_params, output_path=os.path.join(output_dir, f"part-{index:05d}{extension}"))
+                               for index in range(len(shard_params))]
+            else:
+                loader.start_stream()
+
+            results = pool.map(_run_shard, *self._args(source_type, shard_params, chain, halos), part_params)
+            try:
+                for data, timings, peak_memory in results:
+                    # Worker stage times add up to CPU seconds across processes, not wall time
+                    for stage, seconds in timings.items():
+                        monitor.add_metric("sharded", f"{stage}.cpu_seconds", seconds)
+                    monitor.max_metric("sharded", "worker_peak_memory_bytes", peak_memory)
+                    if data is not None:
+                        started = time.perf_counter()
+                        loader.append(data)
+                        monitor.add_metric("sharded", "loading.cpu_seconds", time.perf_counter() - started)
+            except BaseException:
+                if self.shard_output == 'merge':
+                    loader.abort_stream()
+                raise
+            if self.shard_output == 'merge':
+                loader.finish_stream()
+
+    def _args(self, source_type, shard_params, chain, halos):
+        count = len(shard_params)
+        return [self.factory] * count, [source_type] * count, shard_params, [chain] * count, halos
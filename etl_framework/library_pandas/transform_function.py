@@ -1,9 +1,41 @@
 from etl_framework.abstract_etl_methods import Transformer
 
 import pandas as pd
+import pyarrow as pa
 # import vaex
 
 
+def _keep_backend(result, source):
+    # rolling()/astype(int) hand back NumPy columns; Arrow-backed inputs ('pandas_arrow') stay Arrow-backed
+    if isinstance(source.dtype, pd.ArrowDtype) and not isinstance(result.dtype, pd.ArrowDtype):
+        return result.astype(pd.ArrowDtype(pa.from_numpy_dtype(result.dtype)))
+    return result
+
+
+class PandasExpressionTransformer(Transformer):
+    # Column rules expressed as assign-style callables (DataFrame -> column)
+    def transform(self, data):
+        for column, expr in self.expressions(data).items():
+            data[column] = expr(data)
+        return data
+
+class PandasFusedTransformer(PandasExpressionTransformer):
+    # Several independent column rules compiled into one DataFrame.assign
+    def __init__(self, transformers):
+        self.transformers = transformers
+
+    def expressions(self, data):
+        items = {}
+        for transformer in self.transformers:
+            items.update(transformer.expressions(data))
+        return items
+
+    def transform(self, data):
+        items = self.expressions(data)
+        if items:
+            return data.assign(**items)
+        return data
+
 class PandasSimpleTransformer(Transformer):
     def transform(self, data):
         data.columns = [col.lower() for col in data.columns]
@@ -15,60 +47,124 @@ class PandasComplexTransformer(Transformer):
         return data
 
 class PandasRemoveDuplicatesTransformer(Transformer):
+    streamable = False
+
     def transform(self, data):
         return data.drop_duplicates()
 
 class PandasHandleMissingValuesTransformer(Transformer):
+    # bfill needs rows from later batches
+    streamable = False
+
     def transform(self, data):
         return data.fillna(method='ffill').fillna(method='bfill')
 
-class PandasGenerateNewAttributesTransformer(Transformer):
-    def transform(self, data):
-        data['new_attribute'] = data['price'] * 2  # Ejemplo simple
-        return data
+class PandasGenerateNewAttributesTransformer(PandasExpressionTransformer):
+    input_columns = ('price',)
+    output_columns = ('new_attribute',)
 
+    def expressions(self, data):
+        return {'new_attribute': lambda df: df['price'] * 2}  # Ejemplo simple
 
-class PandasCalculateAgeTransformer(Transformer):
-    def transform(self, data):
-        data['year_of_birth'] = ''
-        data['year_of_birth'] = 2024 - data['age'].astype(int)
 
-        return data
+class PandasCalculateAgeTransformer(PandasExpressionTransformer):
+    input_columns = ('age',)
+    output_columns = ('year_of_birth',)
 
-class PandasApplyDiscountTransformer(Transformer):
-    def transform(self, data):
-        data['discounted_price'] = data['price'] * 0.9
-        return data
+    def expressions(self, data):
+        return {'year_of_birth': lambda df: _keep_backend(2024 - df['age'].astype(int), df['age'])}
 
-class PandasCapitalizeFirstLetterTransformer(Transformer):
-    def transform(self, data):
-        data['name'] = data['name'].str.capitalize()
-        return data
+class PandasApplyDiscountTransformer(PandasExpressionTransformer):
+    input_columns = ('price',)
+    output_columns = ('discounted_price',)
+
+    def expressions(self, data):
+        return {'discounted_price': lambda df: df['price'] * 0.9}
+
+class PandasCapitalizeFirstLetterTransformer(PandasExpressionTransformer):
+    input_columns = ('name',)
+    output_columns = ('name',)
+
+    def expressions(self, data):
+        return {'name': lambda df: df['name'].str.capitalize()}
 
 
 # Definimos la operación demandante
 # Definimos la operación demandante
-class PandasMovingAverageTransformer(Transformer):
-    def transform(self, data):
-        data['moving_average'] = ''
+class PandasMovingAverageTransformer(PandasExpressionTransformer):
+    input_columns = ('price',)
+    output_columns = ('moving_average',)
+    window = 10
+    ordered_batches = True
+    halo_rows = window - 1
+
+    def __init__(self):
+        self.tail = None
+
+    def expressions(self, data):
         if 'price' in data.columns:
-            data['moving_average'] = data['price'].rolling(window=10).mean()
+            return {'moving_average': lambda df: _keep_backend(df['price'].rolling(window=self.window).mean(), df['price'])}
+        return {'moving_average': lambda df: ''}
+
+    def begin_stream(self):
+        self.tail = None
+
+    def transform_batch(self, data):
+        # Carry the last window-1 prices over so windows spanning two batches match whole-file mode
+        if 'price' not in data.columns:
+            return self.transform(data)
+        prices = data['price'].reset_index(drop=True)
+        if self.tail is not None:
+            prices = pd.concat([self.tail, prices], ignore_index=True)
+        averages = prices.rolling(window=self.window).mean()
+        averages = pd.Series(averages.iloc[len(prices) - len(data):].to_numpy(), index=data.index)
+        data['moving_average'] = _keep_backend(averages, data['price'])
+        self.tail = prices.iloc[-(self.window - 1):]
         return data
 
-class PandasImputeMeanTransformer(Transformer):
-    def transform(self, data):
+class PandasImputeMeanTransformer(PandasExpressionTransformer):
+    requires_fit = True
+    input_columns = ('salary',)
+    output_columns = ('salary',)
+
+    def __init__(self):
+        self.total = 0.0
+        self.count = 0
+
+    def expressions(self, data):
         if 'salary' in data.columns:
-            mean_val = data['salary'].mean()
-            data['salary'] = data['salary'].fillna(mean_val)
+            return {'salary': lambda df: df['salary'].fillna(df['salary'].mean())}
+        return {}
+
+    def partial_fit(self, data):
+        if 'salary' in data.columns:
+            self.total += data['salary'].sum()
+            self.count += int(data['salary'].count())
+
+    def merge_fit(self, other):
+        self.total += other.total
+        self.count += other.count
+
+    def transform_batch(self, data):
+        if 'salary' in data.columns and self.count:
+            data['salary'] = data['salary'].fillna(self.total / self.count)
         return data
 
-class PandasDaysSinceTransformer(Transformer):
-    def transform(self, data):
+class PandasDaysSinceTransformer(PandasExpressionTransformer):
+    input_columns = ('last_login',)
+    output_columns = ('last_login', 'days_since_login')
+
+    def expressions(self, data):
         if 'last_login' in data.columns:
             now = pd.Timestamp.now()
             # Ensure datetime
-            if not pd.api.types.is_datetime64_any_dtype(data['last_login']):
-                data['last_login'] = pd.to_datetime(data['last_login'], errors='coerce')
-            
-            data['days_since_login'] = (now - data['last_login']).dt.days
-        return data
+            if pd.api.types.is_datetime64_any_dtype(data['last_login']):
+                last_login = lambda df: df['last_login']
+            else:
+                last_login = lambda df: pd.to_datetime(df['last_login'], errors='coerce')
+
+            return {
+                'last_login': last_login,
+                'days_since_login': lambda df: (now - last_login(df)).dt.days,
+            }
+        return {}
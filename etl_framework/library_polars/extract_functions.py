@@ -1,28 +1,222 @@
 from etl_framework.abstract_etl_methods import Extractor
+from etl_framework.utils.partitioning import check_filters, polars_filter
+from etl_framework.utils.projection import csv_header, ipc_columns, parquet_columns, present_columns
+from etl_framework.utils.schema import polars_schema, restrict
 import polars as pl
 
+
+def _project(frame, columns):
+    # Works for DataFrame and LazyFrame; on a LazyFrame the select is pushed into the scan
+    if columns is None:
+        return frame
+    return frame.select(present_columns(frame.collect_schema().names(), columns))
+
+def _schema_overrides(file_path, separator, types):
+    # Metadata types replace CSV inference; only columns in the header are passed
+    if not types:
+        return None
+    return polars_schema(restrict(types, csv_header(file_path, separator))) or None
+
+def _cast(frame, types):
+    # Self-describing sources (JSON) are cast after the parse, where the type differs
+    if not types:
+        return frame
+    schema = frame.collect_schema()
+    target = polars_schema(restrict(types, schema.names()))
+    casts = []
+    for column, dtype in target.items():
+        current = schema[column]
+        if current == dtype or (dtype == pl.Datetime and current.is_temporal()):
+            continue
+        if dtype == pl.Datetime and current == pl.String:
+            casts.append(pl.col(column).str.to_datetime())
+        elif dtype == pl.Datetime:
+            # JSON has no date type; integers are epoch milliseconds (the pandas to_json default)
+            casts.append(pl.col(column).cast(pl.Datetime('ms')))
+        else:
+            casts.append(pl.col(column).cast(dtype))
+    return frame.with_columns(casts) if casts else frame
+
 class PolarsCSVExtractor(Extractor):
-    def __init__(self, file_path, separator=';'):
+    def __init__(self, file_path, separator=';', columns=None, types=None):
         self.file_path = file_path
         self.separator = separator
+        self.columns = columns
+        self.types = types
 
     def extract(self):
         # Polars handles encoding and bad lines differently, but we'll stick to defaults and essential config
-        return pl.read_csv(self.file_path, separator=self.separator, ignore_errors=True)
+        columns = None if self.columns is None else present_columns(csv_header(self.file_path, self.separator), self.columns)
+        return pl.read_csv(self.file_path, separator=self.separator, ignore_errors=True, columns=columns,
+                           schema_overrides=_schema_overrides(self.file_path, self.separator, self.types))
+
+    def extract_batches(self, batch_size):
+        # Batched reader: the streaming engine hands back bounded DataFrames
+        lazy = pl.scan_csv(self.file_path, separator=self.separator, ignore_errors=True,
+                           schema_overrides=_schema_overrides(self.file_path, self.separator, self.types))
+        for batch in _project(lazy, self.columns).collect_batches(chunk_size=batch_size):
+            yield batch
 
 class PolarsJSONExtractor(Extractor):
-    def __init__(self, file_path):
+    def __init__(self, file_path, columns=None, types=None):
         self.file_path = file_path
+        self.columns = columns
+        self.types = types
 
     def extract(self):
-        return pl.read_json(self.file_path)
+        return _cast(_project(pl.read_json(self.file_path), self.columns), self.types)
+
+class PolarsNDJSONExtractor(Extractor):
+    def __init__(self, file_path, columns=None, types=None):
+        self.file_path = file_path
+        self.columns = columns
+        self.types = types
+
+    def _scan(self):
+        # JSON Lines is scanned: the projection reaches the reader and the lines are parsed in parallel
+        return _cast(_project(pl.scan_ndjson(self.file_path), self.columns), self.types)
+
+    def extract(self):
+        return self._scan().collect()
+
+    def extract_batches(self, batch_size):
+        for batch in self._scan().collect_batches(chunk_size=batch_size):
+            yield batch
+
+def _newer(frame, watermark):
+    # Incremental runs: on a scan the predicate is pushed down (row groups are skipped by statistics)
+    if watermark is None:
+        return frame
+    column, value = watermark
+    return frame.filter(pl.col(column) > value)
 
 class PolarsParquetExtractor(Extractor):
-    def __init__(self, file_path):
+    def __init__(self, file_path, columns=None, watermark=None, filters=None):
         self.file_path = file_path
+        self.columns = columns
+        self.watermark = watermark
+        # [(column, operator, value)]: pushed into the scan, which prunes hive partitions and row groups
+        self.filters = check_filters(filters)
+
+    def _scan(self):
+        # A directory is read as a hive-partitioned dataset (partition columns come from the names)
+        return polars_filter(_newer(pl.scan_parquet(self.file_path), self.watermark), self.filters)
 
     def extract(self):
-        return pl.read_parquet(self.file_path)
+        if self.watermark is not None or self.filters is not None:
+            return _project(self._scan(), self.columns).collect()
+        columns = None if self.columns is None else parquet_columns(self.file_path, self.columns)
+        return pl.read_parquet(self.file_path, columns=columns)
+
+    def extract_batches(self, batch_size):
+        for batch in _project(self._scan(), self.columns).collect_batches(chunk_size=batch_size):
+            yield batch
+
+# Lazy mode: scan_* sources return a LazyFrame, so the query optimizer can push
+# projections/predicates into the scan and sink_* can run on the streaming engine.
+class PolarsLazyCSVExtractor(Extractor):
+    def __init__(self, file_path, separator=';', columns=None, types=None):
+        self.file_path = file_path
+        self.separator = separator
+        self.columns = columns
+        self.types = types
+
+    def extract(self):
+        return _project(pl.scan_csv(self.file_path, separator=self.separator, ignore_errors=True,
+                                    schema_overrides=_schema_overrides(self.file_path, self.separator, self.types)),
+                        self.columns)
+
+    def extract_batches(self, batch_size):
+        for batch in self.extract().collect_batches(chunk_size=batch_size):
+            yield batch
+
+class PolarsLazyParquetExtractor(Extractor):
+    def __init__(self, file_path, columns=None, watermark=None, filters=None):
+        self.file_path = file_path
+        self.columns = columns
+        self.watermark = watermark
+        self.filters = check_filters(filters)
+
+    def extract(self):
+        return _project(polars_filter(_newer(pl.scan_parquet(self.file_path), self.watermark), self.filters),
+                        self.columns)
+
+    def extract_batches(self, batch_size):
+        for batch in self.extract().collect_batches(chunk_size=batch_size):
+            yield batch
+
+class PolarsArrowExtractor(Extractor):
+    # Arrow IPC / Feather: read_ipc memory-maps uncompressed files (the columns point into the map)
+    def __init__(self, file_path, columns=None):
+        self.file_path = file_path
+        self.columns = columns
+
+    def extract(self):
+        columns = None if self.columns is None else ipc_columns(self.file_path, self.columns)
+        return pl.read_ipc(self.file_path, columns=columns)
+
+    def extract_batches(self, batch_size):
+        for batch in _project(pl.scan_ipc(self.file_path), self.columns).collect_batches(chunk_size=batch_size):
+            yield batch
+
+class PolarsLazyArrowExtractor(Extractor):
+    def __init__(self, file_path, columns=None):
+        self.file_path = file_path
+        self.columns = columns
+
+    def extract(self):
+        return _project(pl.scan_ipc(self.file_path), self.columns)
+
+    def extract_batches(self, batch_size):
+        for batch in self.extract().collect_batches(chunk_size=batch_size):
+            yield batch
+
+class PolarsLazyNDJSONExtractor(Extractor):
+    def __init__(self, file_path, columns=None, types=None):
+        self.file_path = file_path
+        self.columns = columns
+        self.types = types
+
+    def extract(self):
+        return _cast(_project(pl.scan_ndjson(self.file_path), self.columns), self.types)
+
+    def extract_batches(self, batch_size):
+        for batch in self.extract().collect_batches(chunk_size=batch_size):
+            yield batch
+
+class PolarsLazyJSONExtractor(Extractor):
+    # A JSON array cannot be scanned; it is parsed once and continues lazily
+    def __init__(self, file_path, columns=None, types=None):
+        self.file_path = file_path
+        self.columns = columns
+        self.types = types
+
+    def extract(self):
+        return _cast(_project(pl.read_json(self.file_path).lazy(), self.columns), self.types)
+
+    def extract_batches(self, batch_size):
+        for batch in self.extract().collect_batches(chunk_size=batch_size):
+            yield batch
+
+class PolarsDatabaseExtractor(Extractor):
+    # pl.read_database on a pooled DB-API connection: rows go straight into Arrow-backed
+    # frames, without a pandas DataFrame in between
+    def __init__(self, pool, query, columns=None, types=None):
+        self.pool = pool
+        self.query = query
+        self.columns = columns
+        self.types = types
+
+    def extract(self):
+        with self.pool.connection() as connection:
+            frame = pl.read_database(self.query, connection, infer_schema_length=None)
+        return _cast(_project(frame, self.columns), self.types)
+
+    def extract_batches(self, batch_size):
+        with self.pool.connection() as connection:
+            for batch in pl.read_database(self.query, connection, iter_batches=True, batch_size=batch_size,
+                                          infer_schema_length=None):
+                yield _cast(_project(batch, self.columns), self.types)
 
 # HDF5 is not natively supported well in Polars without conversion.
 # We will focus on Parquet as the binary standard.
@@ -1,17 +1,130 @@
 from etl_framework.abstract_etl_methods import Loader
+from etl_framework.utils.arrow_ipc import IPCFileWriter, check_compression, is_arrow_path
+from etl_framework.utils.merge import check_merge_mode, merge_file
+from etl_framework.utils.ndjson import is_ndjson_path
+from etl_framework.utils.parquet_options import ParquetFileWriter, polars_parquet_options, write_parquet_table
+from etl_framework.utils.partitioning import PartitionedParquetWriter, write_partitioned
 import polars as pl
 import os
 
 class PolarsFileLoader(Loader):
-    def __init__(self, output_path):
+    def __init__(self, output_path, compression=None, parquet_options=None, partition_by=None, max_file_bytes=None,
+                 mode='overwrite', key=None):
         self.output_path = output_path
+        # mode='merge': upsert on `key` into a Parquet file or directory of parts (see utils/merge.py)
+        self.key = check_merge_mode(mode, key, output_path, partition_by)
+        self.mode = mode
+        # Arrow IPC / Feather outputs: None, 'lz4' or 'zstd' (Parquet codecs come in parquet_options)
+        self.compression = check_compression(compression) if is_arrow_path(output_path) else None
+        # Parquet write settings (see utils/parquet_options.py)
+        self.parquet_options = parquet_options or {}
+        # partition_by: output_path becomes a hive-partitioned Parquet dataset (see utils/partitioning.py)
+        self.partition_by = partition_by
+        self.max_file_bytes = max_file_bytes
+        self._writer = None
+        self._handle = None
+        self._first_batch = True
 
     def load(self, data):
+        if self.mode == 'merge':
+            return merge_file(self.output_path, data, self.key)
+        if self.partition_by:
+            # A LazyFrame is executed batch by batch into the partition writer
+            tables = (batch.to_arrow() for batch in data.collect_batches()) if isinstance(data, pl.LazyFrame) \
+                else [data.to_arrow()]
+            write_partitioned(self.output_path, tables, self.partition_by, self.parquet_options, self.max_file_bytes)
+            return
+        if isinstance(data, pl.LazyFrame):
+            return self._sink(data)
+
         # Determine extension
         if self.output_path.endswith('.parquet'):
-            data.write_parquet(self.output_path)
+            native = polars_parquet_options(self.parquet_options)
+            if native is None:
+                # Dictionary encoding settings are only available through pyarrow
+                write_parquet_table(self.output_path, data.to_arrow(), self.parquet_options)
+            else:
+                data.write_parquet(self.output_path, **native)
+        elif is_arrow_path(self.output_path):
+            data.write_ipc(self.output_path, compression=self._ipc_compression())
+        elif is_ndjson_path(self.output_path):
+            data.write_ndjson(self.output_path)
         elif self.output_path.endswith('.json'):
             data.write_json(self.output_path)
         else:
             # Default to csv
             data.write_csv(self.output_path, separator=';')
+
+    def _sink(self, data):
+        # LazyFrame: sink_* executes the whole plan on the streaming engine in constant memory
+        if self.output_path.endswith('.parquet'):
+            native = polars_parquet_options(self.parquet_options)
+            if native is None:
+                # Dictionary encoding settings: the plan's batches go through the pyarrow writer
+                writer = ParquetFileWriter(self.output_path, self.parquet_options)
+                try:
+                    for batch in data.collect_batches():
+                        writer.write(batch.to_arrow())
+                finally:
+                    writer.close()
+            else:
+                data.sink_parquet(self.output_path, **native)
+        elif is_arrow_path(self.output_path):
+            data.sink_ipc(self.output_path, compression=self._ipc_compression())
+        elif is_ndjson_path(self.output_path):
+            data.sink_ndjson(self.output_path)
+        elif self.output_path.endswith('.json'):
+            # No sink for JSON arrays
+            data.collect().write_json(self.output_path)
+        else:
+            data.sink_csv(self.output_path, separator=';')
+
+    def _ipc_compression(self):
+        return self.compression or 'uncompressed'
+
+    # Streaming mode: every batch is appended to the same output file
+    def start_stream(self):
+        self._first_batch = True
+        if self.mode == 'merge':
+            return
+        if self.partition_by:
+            self._writer = PartitionedParquetWriter(self.output_path, self.partition_by, self.parquet_options,
+                                                    self.max_file_bytes)
+        elif self.output_path.endswith('.parquet'):
+            self._writer = ParquetFileWriter(self.output_path, self.parquet_options)
+        elif is_arrow_path(self.output_path):
+            self._writer = IPCFileWriter(self.output_path, self.compression)
+        else:
+            self._handle = open(self.output_path, 'w', encoding='utf8')
+            if self.output_path.endswith('.json'):
+                self._handle.write('[')
+
+    def append(self, data):
+        if self.mode == 'merge':
+            # Every batch is a staged merge of its own
+            return merge_file(self.output_path, data, self.key)
+        if self._writer is not None:
+            # Partitioned dataset, Parquet or Arrow IPC file
+            self._writer.write(data.to_arrow())
+        elif is_ndjson_path(self.output_path):
+            data.write_ndjson(self._handle)
+        elif self.output_path.endswith('.json'):
+            records = data.write_json()[1:-1]
+            if records:
+                if not self._first_batch:
+                    self._handle.write(',')
+                self._handle.write(records)
+                self._first_batch = False
+        else:
+            data.write_csv(self._handle, separator=';', include_header=self._first_batch)
+            self._first_batch = False
+
+    def finish_stream(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._handle is not None:
+            if self.output_path.endswith('.json'):
+                self._handle.write(']')
+            self._handle.close()
+            self._handle = None
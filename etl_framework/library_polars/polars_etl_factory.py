@@ -1,26 +1,93 @@
-from etl_framework.library_polars.extract_functions import PolarsCSVExtractor, PolarsJSONExtractor, PolarsParquetExtractor
+from etl_framework.library_polars.extract_functions import (PolarsCSVExtractor, PolarsJSONExtractor, PolarsParquetExtractor,
+                                                            PolarsNDJSONExtractor,
+                                                            PolarsLazyCSVExtractor, PolarsLazyJSONExtractor,
+                                                            PolarsLazyNDJSONExtractor, PolarsLazyParquetExtractor,
+                                                            PolarsDatabaseExtractor, PolarsArrowExtractor,
+                                                            PolarsLazyArrowExtractor)
 from etl_framework.library_polars.polars_transformation_strategy import PolarsTransformationStrategyFactory
 from etl_framework.library_polars.load_functions import PolarsFileLoader
+from etl_framework.utils.database.database_extractor_factory import DatabaseExtractorFactory
+from etl_framework.utils.database.database_loader_factory import DatabaseLoaderFactory
+from etl_framework.utils.database.extract_functions import ConvertedExtractor, PartitionedExtractor
+from etl_framework.utils.arrow_ipc import ARROW_SOURCES
+from etl_framework.utils.ndjson import NDJSON_SOURCES
+from etl_framework.utils.parquet_options import parquet_options
+from etl_framework.utils.schema import metadata_types, primary_key
+import polars as pl
 
 class PolarsETLFactory:
-    def __init__(self, metadata):
+    def __init__(self, metadata, lazy=False):
         self.metadata = metadata
+        # lazy=True: scan_* sources, LazyFrame transforms and sink_* loading (larger-than-RAM files)
+        self.lazy = lazy
 
     def get_extractor(self, source_type, **kwargs):
+        if source_type == "database":
+            extractor = self._get_database_extractor(**kwargs)
+            # Lazy mode continues the query result as a LazyFrame; streamed batches stay DataFrames
+            return ConvertedExtractor(extractor, pl.DataFrame.lazy, convert_batches=False) if self.lazy else extractor
+        if self.lazy:
+            return self._get_lazy_extractor(source_type, **kwargs)
         if source_type == "csv":
-            return PolarsCSVExtractor(kwargs['file_path'], kwargs.get('separator', ';'))
+            return PolarsCSVExtractor(kwargs['file_path'], kwargs.get('separator', ';'), columns=kwargs.get('columns'),
+                                      types=kwargs.get('types', metadata_types(self.metadata)))
         elif source_type == "json":
-            return PolarsJSONExtractor(kwargs['file_path'])
+            return PolarsJSONExtractor(kwargs['file_path'], columns=kwargs.get('columns'),
+                                       types=kwargs.get('types', metadata_types(self.metadata)))
+        elif source_type in NDJSON_SOURCES:
+            return PolarsNDJSONExtractor(kwargs['file_path'], columns=kwargs.get('columns'),
+                                         types=kwargs.get('types', metadata_types(self.metadata)))
         elif source_type == "parquet":
-            return PolarsParquetExtractor(kwargs['file_path'])
+            return PolarsParquetExtractor(kwargs['file_path'], columns=kwargs.get('columns'),
+                                          watermark=kwargs.get('watermark'), filters=kwargs.get('filters'))
+        elif source_type in ARROW_SOURCES:
+            return PolarsArrowExtractor(kwargs['file_path'], columns=kwargs.get('columns'))
         else:
             raise ValueError("Unknown source type or not supported in Polars factory")
 
+    def _get_lazy_extractor(self, source_type, **kwargs):
+        if source_type == "csv":
+            return PolarsLazyCSVExtractor(kwargs['file_path'], kwargs.get('separator', ';'), columns=kwargs.get('columns'),
+                                          types=kwargs.get('types', metadata_types(self.metadata)))
+        elif source_type == "json":
+            return PolarsLazyJSONExtractor(kwargs['file_path'], columns=kwargs.get('columns'),
+                                           types=kwargs.get('types', metadata_types(self.metadata)))
+        elif source_type in NDJSON_SOURCES:
+            return PolarsLazyNDJSONExtractor(kwargs['file_path'], columns=kwargs.get('columns'),
+                                             types=kwargs.get('types', metadata_types(self.metadata)))
+        elif source_type == "parquet":
+            return PolarsLazyParquetExtractor(kwargs['file_path'], columns=kwargs.get('columns'),
+                                              watermark=kwargs.get('watermark'), filters=kwargs.get('filters'))
+        elif source_type in ARROW_SOURCES:
+            return PolarsLazyArrowExtractor(kwargs['file_path'], columns=kwargs.get('columns'))
+        else:
+            raise ValueError("Unknown source type or not supported in Polars lazy mode")
+
+    def _get_database_extractor(self, **kwargs):
+        types = kwargs.get('types', metadata_types(self.metadata))
+        extractor = DatabaseExtractorFactory().get_extractor(**kwargs)
+        if hasattr(extractor, 'pool') and not isinstance(extractor, PartitionedExtractor):
+            # SQLite / MySQL / PostgreSQL queries are read natively by read_database
+            return PolarsDatabaseExtractor(extractor.pool, extractor.query, columns=kwargs.get('columns'), types=types)
+        return ConvertedExtractor(extractor, pl.from_pandas)
+
     def get_transformer_factory(self):
         return PolarsTransformationStrategyFactory()
 
+    def from_arrow(self, table, batch=False):
+        # Streamed batches stay DataFrames in lazy mode too
+        frame = pl.from_arrow(table)
+        return frame.lazy() if self.lazy and not batch else frame
+
     def get_loader(self, destination_type, **kwargs):
         if destination_type == "file":
-            return PolarsFileLoader(kwargs['output_path'])
+            return PolarsFileLoader(kwargs['output_path'], compression=kwargs.get('compression'),
+                                    parquet_options=parquet_options(kwargs), partition_by=kwargs.get('partition_by'),
+                                    max_file_bytes=kwargs.get('max_file_bytes'), mode=kwargs.get('mode', 'overwrite'),
+                                    key=kwargs.get('key', primary_key(self.metadata)))
+        elif destination_type == "database":
+            # Database loaders take any engine's frame (through Arrow/pandas)
+            return DatabaseLoaderFactory().get_loader(**dict({'types': metadata_types(self.metadata),
+                                                              'key': primary_key(self.metadata)}, **kwargs))
         else:
             raise ValueError("Unknown destination type")
@@ -33,3 +33,6 @@ class PolarsTransformationStrategyFactory:
             # For simplicity in this "all libraries" sweep, we might just ignore unknown types or return a no-op 
             # but raising error is safer to detect missing features.
             raise ValueError(f"Unknown transform type '{transform_type}' for Polars")
+
+    def fuse(self, transformers):
+        return PolarsFusedTransformer(transformers)
@@ -1,83 +1,165 @@
 from etl_framework.abstract_etl_methods import Transformer
 import polars as pl
 
-class PolarsSimpleTransformer(Transformer):
+
+def _schema(data):
+    # Works for DataFrame and LazyFrame (resolving a LazyFrame schema does not read the data)
+    return data.collect_schema()
+
+def _columns(data):
+    return _schema(data).names()
+
+class PolarsExpressionTransformer(Transformer):
+    # Column rules expressed as Polars expressions; applied with a single with_columns
     def transform(self, data):
-        data.columns = [col.lower() for col in data.columns]
+        exprs = self.expressions(data)
+        if exprs:
+            return data.with_columns([expr.alias(name) for name, expr in exprs.items()])
         return data
 
+class PolarsFusedTransformer(PolarsExpressionTransformer):
+    # Several independent column rules compiled into one with_columns projection
+    def __init__(self, transformers):
+        self.transformers = transformers
+
+    def expressions(self, data):
+        exprs = {}
+        for transformer in self.transformers:
+            exprs.update(transformer.expressions(data))
+        return exprs
+
+class PolarsSimpleTransformer(Transformer):
+    def transform(self, data):
+        return data.rename({col: col.lower() for col in _columns(data)})
+
 class PolarsComplexTransformer(Transformer):
     def transform(self, data):
         # Polars way: use expressions
         # data['NEW_COLUMN'] = data.apply(lambda row: row.sum(), axis=1) in pandas
         # In polars, sum horizontal can be tricky, typically explicitly summing list of columns.
         # Assuming numeric columns.
-        numeric_cols = [col for col, dtype in zip(data.columns, data.dtypes) if dtype in (pl.Int64, pl.Float64, pl.Int32, pl.Float32)]
+        numeric_cols = [col for col, dtype in _schema(data).items() if dtype in (pl.Int64, pl.Float64, pl.Int32, pl.Float32)]
         if numeric_cols:
              return data.with_columns(pl.sum_horizontal(numeric_cols).alias("NEW_COLUMN"))
         return data
 
 class PolarsRemoveDuplicatesTransformer(Transformer):
+    streamable = False
+
     def transform(self, data):
         return data.unique()
 
 class PolarsHandleMissingValuesTransformer(Transformer):
+    # backward fill needs rows from later batches
+    streamable = False
+
     def transform(self, data):
         # fillna(method='ffill').fillna(method='bfill')
         return data.fill_null(strategy="forward").fill_null(strategy="backward")
 
-class PolarsGenerateNewAttributesTransformer(Transformer):
-    def transform(self, data):
-        if 'price' in data.columns:
-            return data.with_columns((pl.col("price") * 2).alias("new_attribute"))
-        return data
+class PolarsGenerateNewAttributesTransformer(PolarsExpressionTransformer):
+    input_columns = ('price',)
+    output_columns = ('new_attribute',)
 
-class PolarsCalculateAgeTransformer(Transformer):
-    def transform(self, data):
-        if 'age' in data.columns:
-            return data.with_columns((2024 - pl.col("age").cast(pl.Int32)).alias("year_of_birth"))
-        return data
+    def expressions(self, data):
+        if 'price' in _columns(data):
+            return {"new_attribute": pl.col("price") * 2}
+        return {}
 
-class PolarsApplyDiscountTransformer(Transformer):
-    def transform(self, data):
-        if 'price' in data.columns:
-            return data.with_columns((pl.col("price") * 0.9).alias("discounted_price"))
-        return data
+class PolarsCalculateAgeTransformer(PolarsExpressionTransformer):
+    input_columns = ('age',)
+    output_columns = ('year_of_birth',)
 
-class PolarsCapitalizeFirstLetterTransformer(Transformer):
-    def transform(self, data):
-        if 'name' in data.columns:
+    def expressions(self, data):
+        if 'age' in _columns(data):
+            return {"year_of_birth": 2024 - pl.col("age").cast(pl.Int32)}
+        return {}
+
+class PolarsApplyDiscountTransformer(PolarsExpressionTransformer):
+    input_columns = ('price',)
+    output_columns = ('discounted_price',)
+
+    def expressions(self, data):
+        if 'price' in _columns(data):
+            return {"discounted_price": pl.col("price") * 0.9}
+        return {}
+
+class PolarsCapitalizeFirstLetterTransformer(PolarsExpressionTransformer):
+    input_columns = ('name',)
+    output_columns = ('name',)
+
+    def expressions(self, data):
+        if 'name' in _columns(data):
             # Polars string operations
-            return data.with_columns(pl.col("name").str.to_titlecase().alias("name"))
-        return data
+            return {"name": pl.col("name").str.to_titlecase()}
+        return {}
 
-class PolarsMovingAverageTransformer(Transformer):
-    def transform(self, data):
+class PolarsMovingAverageTransformer(PolarsExpressionTransformer):
+    input_columns = ('price',)
+    output_columns = ('moving_average',)
+    window = 10
+    ordered_batches = True
+
+    def __init__(self):
+        self.tail = None
+
+    def expressions(self, data):
         # data['moving_average'] = data['price'].rolling(window=10).mean()
-        if 'price' in data.columns:
-             return data.with_columns(pl.col("price").rolling_mean(window_size=10).alias("moving_average"))
-        return data
+        if 'price' in _columns(data):
+            return {"moving_average": pl.col("price").rolling_mean(window_size=self.window)}
+        return {}
 
-class PolarsImputeMeanTransformer(Transformer):
-    def transform(self, data):
-        if 'salary' in data.columns:
-            return data.with_columns(pl.col("salary").fill_null(pl.col("salary").mean()))
+    def begin_stream(self):
+        self.tail = None
+
+    def transform_batch(self, data):
+        # Prepend the previous batch's last window-1 prices, then drop them from the result
+        if 'price' not in _columns(data):
+            return data
+        prices = data['price'] if self.tail is None else pl.concat([self.tail, data['price']])
+        averages = prices.rolling_mean(window_size=self.window).slice(len(prices) - data.height)
+        self.tail = prices.tail(self.window - 1)
+        return data.with_columns(averages.alias("moving_average"))
+
+class PolarsImputeMeanTransformer(PolarsExpressionTransformer):
+    requires_fit = True
+    input_columns = ('salary',)
+    output_columns = ('salary',)
+
+    def __init__(self):
+        self.total = 0.0
+        self.count = 0
+
+    def expressions(self, data):
+        if 'salary' in _columns(data):
+            return {"salary": pl.col("salary").fill_null(pl.col("salary").mean())}
+        return {}
+
+    def partial_fit(self, data):
+        if 'salary' in _columns(data):
+            self.total += data['salary'].sum()
+            self.count += data.height - data['salary'].null_count()
+
+    def transform_batch(self, data):
+        if 'salary' in _columns(data) and self.count:
+            return data.with_columns(pl.col("salary").fill_null(self.total / self.count))
         return data
 
-class PolarsDaysSinceTransformer(Transformer):
-    def transform(self, data):
-        if 'last_login' in data.columns:
+class PolarsDaysSinceTransformer(PolarsExpressionTransformer):
+    input_columns = ('last_login',)
+    output_columns = ('days_since_login',)
+
+    def expressions(self, data):
+        if 'last_login' in _columns(data):
             import datetime
             now = datetime.datetime.now()
             
             # Helper to cast if string
             col_expr = pl.col('last_login')
             # Check if likely string (Utf8 or String)
-            if data.schema['last_login'] in (pl.Utf8, pl.String):
+            if _schema(data)['last_login'] in (pl.Utf8, pl.String):
                  # Try common formats or let polars guess
                  col_expr = col_expr.str.to_datetime(strict=False)
             
-            return data.with_columns(
-                 (pl.lit(now) - col_expr).dt.total_days().alias("days_since_login")
-            )
-        return data
+            return {"days_since_login": (pl.lit(now) - col_expr).dt.total_days()}
+        return {}
@@ -18,6 +18,15 @@ class VaexJSONExtractor(Extractor):
         return vaex.from_json(self.file_path)
 
 
+class VaexNDJSONExtractor(Extractor):
+    def __init__(self, file_path):
+        self.file_path = file_path
+
+    def extract(self):
+        # JSON Lines: from_json hands lines=True on to pandas.read_json
+        return vaex.from_json(self.file_path, lines=True)
+
+
 class VaexHDF5Extractor(Extractor):
     def __init__(self, file_path):
         self.file_path = file_path
@@ -3,6 +3,7 @@ from etl_framework.library_vaex.vaex_transformation_strategy import VaexTransfor
 from etl_framework.library_vaex.load_functions import VaexFileLoader
 from etl_framework.utils.database.database_extractor_factory import DatabaseExtractorFactory
 from etl_framework.utils.database.database_loader_factory import DatabaseLoaderFactory
+from etl_framework.utils.ndjson import NDJSON_SOURCES
 
 
 class VaexETLFactory:
@@ -13,6 +14,8 @@ class VaexETLFactory:
             return VaexCSVExtractor(kwargs['file_path'])
         elif source_type == "json":
             return VaexJSONExtractor(kwargs['file_path'])
+        elif source_type in NDJSON_SOURCES:
+            return VaexNDJSONExtractor(kwargs['file_path'])
         elif source_type == "hdf5":
             return VaexHDF5Extractor(kwargs['file_path'])
         elif source_type == "database":
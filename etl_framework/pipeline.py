@@ -0,0 +1,181 @@
+import queue
+import threading
+import time
+
+# End-of-stream marker passed between stages
+_DONE = object()
+
+
+class PipelinedExecutor:
+    """
+    Overlaps extraction, transformation and loading of streamed batches:
+
+        reader thread -> extract queue -> transform workers -> load queue -> writer thread
+
+    Both queues are bounded, so a slow stage blocks the one before it (backpressure)
+    and only a handful of batches are in memory at once. Busy time per stage goes to
+    the usual monitor spans ("extraction", "transform_*", "loading"); idle time, queue
+    depths and stage utilization go to the "pipeline" span.
+    """
+    def __init__(self, monitor, workers=2, queue_size=4, poll_interval=0.1):
+        self.monitor = monitor
+        self.workers = workers
+        self.queue_size = queue_size
+        self.poll_interval = poll_interval
+
+    def run(self, batches, chain, loader, transform_batch):
+        # A transformer carrying state between consecutive batches (window tails) needs
+        # them in order, so the transform stage is then a single worker.
+        workers = self.workers
+        if any(getattr(transformer, 'ordered_batches', False) for _, transformer in chain):
+            workers = 1
+
+        extract_queue = queue.Queue(maxsize=self.queue_size)
+        load_queue = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        errors = []
+        self._lock = threading.Lock()
+        self._stats = {}
+
+        def reader():
+            try:
+                sequence = 0
+                while not stop.is_set():
+                    with self.monitor.measure_time("extraction", accumulate=True):
+                        batch = next(batches, None)
+                    if batch is None:
+                        break
+                    self.monitor.add_metric("extraction", "batches", 1)
+                    if not self._put(extract_queue, "extract_queue", (sequence, batch), "extraction", stop):
+                        return
+                    sequence += 1
+            except BaseException as error:
+                errors.append(error)
+                stop.set()
+            finally:
+                for _ in range(workers):
+                    self._put(extract_queue, "extract_queue", _DONE, "extraction", stop)
+
+        def transformer_worker():
+            try:
+                while True:
+                    item = self._get(extract_queue, "transform", stop)
+                    if item is None or item is _DONE:
+                        break
+                    sequence, batch = item
+                    started = time.perf_counter()
+                    for phase, transformer in chain:
+                        with self.monitor.measure_time(phase, accumulate=True):
+                            batch = transform_batch(transformer, batch)
+                    self._count("transform.busy_seconds", time.perf_counter() - started)
+                    if not self._put(load_queue, "load_queue", (sequence, batch), "transform", stop):
+                        return
+            except BaseException as error:
+                errors.append(error)
+                stop.set()
+            finally:
+                self._put(load_queue, "load_queue", _DONE, "transform", stop)
+
+        def writer():
+            # Workers may finish out of order; batches are written in extraction order
+            pending = {}
+            next_sequence = 0
+            finished = 0
+            try:
+                while finished < workers:
+                    item = self._get(load_queue, "loading", stop)
+                    if item is None:
+                        return
+                    if item is _DONE:
+                        finished += 1
+                        continue
+                    sequence, batch = item
+                    pending[sequence] = batch
+                    while next_sequence in pending:
+                        started = time.perf_counter()
+                        with self.monitor.measure_time("loading", accumulate=True):
+                            loader.append(pending.pop(next_sequence))
+                        self._count("loading.busy_seconds", time.perf_counter() - started)
+                        next_sequence += 1
+            except BaseException as error:
+                errors.append(error)
+                stop.set()
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=reader, name="etl-reader", daemon=True)]
+        threads += [threading.Thread(target=transformer_worker, name=f"etl-transform-{index}", daemon=True)
+                    for index in range(workers)]
+        threads.append(threading.Thread(target=writer, name="etl-writer", daemon=True))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall_seconds = time.perf_counter() - started
+
+        self._report(wall_seconds, workers)
+        if errors:
+            raise errors[0]
+
+    def _put(self, target, queue_name, item, stage, stop):
+        # Blocks while the queue is full; the wait is the producer's idle (backpressure) time
+        started = time.perf_counter()
+        while not stop.is_set():
+            try:
+                target.put(item, timeout=self.poll_interval)
+            except queue.Full:
+                continue
+            self._count(f"{stage}.idle_seconds", time.perf_counter() - started)
+            if item is not _DONE:
+                self._sample_depth(queue_name, target.qsize())
+            return True
+        return False
+
+    def _get(self, source, stage, stop):
+        # Blocks while the queue is empty; the wait is the consumer's idle (starved) time
+        started = time.perf_counter()
+        while not stop.is_set():
+            try:
+                item = source.get(timeout=self.poll_interval)
+            except queue.Empty:
+                continue
+            self._count(f"{stage}.idle_seconds", time.perf_counter() - started)
+            return item
+        return None
+
+    def _count(self, key, value):
+        with self._lock:
+            self._stats[key] = self._stats.get(key, 0) + value
+
+    def _sample_depth(self, queue_name, depth):
+        with self._lock:
+            self._stats[f"{queue_name}.depth_total"] = self._stats.get(f"{queue_name}.depth_total", 0) + depth
+            self._stats[f"{queue_name}.samples"] = self._stats.get(f"{queue_name}.samples", 0) + 1
+            self._stats[f"{queue_name}.max_depth"] = max(self._stats.get(f"{queue_name}.max_depth", 0), depth)
+
+    def _report(self, wall_seconds, workers):
+        stats = self._stats
+        metrics = self.monitor.get_report()
+        self.monitor.record_metric("pipeline", "wall_seconds", wall_seconds)
+        self.monitor.record_metric("pipeline", "workers", workers)
+        self.monitor.record_metric("pipeline", "queue_size", self.queue_size)
+
+        busy = {
+            "extraction": metrics.get("extraction", {}).get("duration_seconds", 0),
+            "transform": stats.get("transform.busy_seconds", 0),
+            "loading": stats.get("loading.busy_seconds", 0),
+        }
+        threads = {"extraction": 1, "transform": workers, "loading": 1}
+        for stage, seconds in busy.items():
+            self.monitor.record_metric("pipeline", f"{stage}.busy_seconds", seconds)
+            self.monitor.record_metric("pipeline", f"{stage}.idle_seconds", stats.get(f"{stage}.idle_seconds", 0))
+            utilization = seconds / (wall_seconds * threads[stage]) if wall_seconds else 0
+            self.monitor.record_metric("pipeline", f"{stage}.utilization", utilization)
+        # The busiest stage (per thread) is the one limiting throughput
+        self.monitor.record_metric("pipeline", "bottleneck",
+                                   max(busy, key=lambda stage: busy[stage] / threads[stage]))
+
+        for queue_name in ("extract_queue", "load_queue"):
+            samples = stats.get(f"{queue_name}.samples", 0)
+            self.monitor.record_metric("pipeline", f"{queue_name}.max_depth", stats.get(f"{queue_name}.max_depth", 0))
+            self.monitor.record_metric("pipeline", f"{queue_name}.mean_depth",
+                                       stats.get(f"{queue_name}.depth_total", 0) / samples if samples else 0)
@@ -0,0 +1,55 @@
+from etl_framework.abstract_etl_methods import Transformer
+
+
+class TransformationPlanCompiler:
+    """
+    Compiles a chain of transformers into execution stages.
+
+    Consecutive column-expression transformers that do not depend on each other's
+    outputs are fused by the engine's strategy factory (one with_columns / SELECT /
+    assign), so a job with N attribute rules scans the data once instead of N times.
+    Opaque transformers (renames, dedup, fills...) act as barriers between stages.
+    """
+    def __init__(self, transformer_factory, streaming=False):
+        self.transformer_factory = transformer_factory
+        self.streaming = streaming
+
+    def compile(self, transformers):
+        if not hasattr(self.transformer_factory, 'fuse'):
+            return list(transformers)
+
+        stages = []
+        group, group_outputs = [], set()
+        for transformer in transformers:
+            if not self._is_fusable(transformer):
+                stages.extend(self._close(group))
+                stages.append(transformer)
+                group, group_outputs = [], set()
+                continue
+
+            reads = set(transformer.input_columns)
+            writes = set(transformer.output_columns)
+            # Members of a stage are evaluated against the same input, so a rule that reads
+            # (or rewrites) a column produced earlier in the stage starts a new one.
+            if group_outputs & (reads | writes):
+                stages.extend(self._close(group))
+                group, group_outputs = [], set()
+            group.append(transformer)
+            group_outputs |= writes
+
+        stages.extend(self._close(group))
+        return stages
+
+    def _is_fusable(self, transformer):
+        if getattr(transformer, 'input_columns', None) is None:
+            return False
+        if self.streaming:
+            # Fit statistics and carry-over windows live in the transformer itself
+            if transformer.requires_fit or type(transformer).transform_batch is not Transformer.transform_batch:
+                return False
+        return True
+
+    def _close(self, group):
+        if len(group) > 1:
+            return [self.transformer_factory.fuse(group)]
+        return group
@@ -0,0 +1,101 @@
+import os
+
+from etl_framework.utils.projection import ipc_columns, present_columns
+
+# Arrow IPC file format (Feather V2): source types and output extensions
+ARROW_SOURCES = ('arrow', 'feather')
+ARROW_EXTENSIONS = ('.arrow', '.feather', '.ipc')
+COMPRESSIONS = (None, 'lz4', 'zstd')
+
+
+def is_arrow_path(path):
+    return os.path.splitext(path)[1].lower() in ARROW_EXTENSIONS
+
+
+def check_compression(compression):
+    # Arrow IPC only knows LZ4 (frame) and ZSTD buffer compression
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Arrow IPC compression must be one of {COMPRESSIONS}, got {compression!r}")
+    return compression
+
+
+def read_ipc_table(file_path, columns=None):
+    """
+    Arrow IPC / Feather file as a pyarrow Table over a memory map: the buffers of an
+    uncompressed file are the mapped pages themselves (nothing is read up front and
+    several processes share the page cache); compressed buffers are decompressed.
+    """
+    import pyarrow.feather as feather
+    return feather.read_table(file_path, columns=None if columns is None else ipc_columns(file_path, columns), memory_map=True)
+
+
+def ipc_batches(file_path, batch_size, columns=None):
+    # Streaming: the file's record batches (re-cut to batch_size rows), still memory-mapped
+    import pyarrow as pa
+    columns = None if columns is None else ipc_columns(file_path, columns)
+    with pa.memory_map(file_path, 'r') as source:
+        reader = pa.ipc.open_file(source)
+        for index in range(reader.num_record_batches):
+            record_batch = reader.get_batch(index)
+            if columns is not None:
+                record_batch = record_batch.select(columns)
+            for chunk in pa.Table.from_batches([record_batch]).to_batches(max_chunksize=batch_size):
+                yield pa.Table.from_batches([chunk])
+
+
+def ipc_batch_groups(file_path, rows_per_group):
+    # Record batch indexes grouped into ~rows_per_group rows (Dask partitions)
+    import pyarrow as pa
+    groups, current, rows = [], [], 0
+    with pa.memory_map(file_path, 'r') as source:
+        reader = pa.ipc.open_file(source)
+        for index in range(reader.num_record_batches):
+            current.append(index)
+            rows += reader.get_batch(index).num_rows
+            if rows >= rows_per_group:
+                groups.append(current)
+                current, rows = [], 0
+    if current or not groups:
+        groups.append(current)
+    return groups
+
+
+def read_ipc_batches(file_path, indexes, columns=None):
+    import pyarrow as pa
+    with pa.memory_map(file_path, 'r') as source:
+        reader = pa.ipc.open_file(source)
+        table = pa.Table.from_batches([reader.get_batch(index) for index in indexes], schema=reader.schema)
+    return table if columns is None else table.select(present_columns(table.schema.names, columns))
+
+
+class IPCFileWriter:
+    """
+    Appends tables to one Arrow IPC file (streaming mode and partition-by-partition loads),
+    with optional LZ4/ZSTD buffer compression. Later tables are cast to the first schema.
+    """
+    def __init__(self, output_path, compression=None):
+        self.output_path = output_path
+        self.compression = check_compression(compression)
+        self._writer = None
+        self._schema = None
+
+    def write(self, table):
+        import pyarrow as pa
+        if self._writer is None:
+            options = pa.ipc.IpcWriteOptions(compression=self.compression)
+            self._schema = table.schema
+            self._writer = pa.ipc.new_file(self.output_path, table.schema, options=options)
+        self._writer.write_table(table.cast(self._schema))
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def write_ipc_table(output_path, table, compression=None):
+    writer = IPCFileWriter(output_path, compression)
+    try:
+        writer.write(table)
+    finally:
+        writer.close()
@@ -0,0 +1,56 @@
+import numpy as np
+
+# Defaults for the memory-compact pass (ETLProcessor compact=True / metadata `compact: true`)
+DEFAULT_OPTIONS = {
+    # String columns whose distinct/non-null ratio is at or below this become categoricals
+    'category_threshold': 0.5,
+    # Integers to the smallest width that holds min..max, floats to float32 when lossless
+    'downcast': True,
+    # Narrowest integer width (bits) of the downcast: the widths are chosen from the values as read,
+    # so a narrower column would overflow in later arithmetic (price * 2 on int8 wraps around)
+    'min_int_width': 32,
+    # Remaining string columns become Arrow-backed strings
+    'arrow_strings': True,
+    # Columns that are always made categorical, whatever their cardinality
+    'categories': [],
+}
+
+
+def compaction_options(setting):
+    """
+    Normalizes a compact setting: False/None disables the pass, True uses the
+    defaults and a dict overrides some of them.
+    """
+    if not setting:
+        return None
+    options = dict(DEFAULT_OPTIONS)
+    if isinstance(setting, dict):
+        unknown = set(setting) - set(DEFAULT_OPTIONS)
+        if unknown:
+            raise ValueError(f"Unknown compact options: {sorted(unknown)}")
+        options.update(setting)
+    return options
+
+
+def smallest_integer_dtype(low, high, nullable=False, min_width=32):
+    # Signed types only (differences stay signed), never narrower than min_width bits
+    for dtype in (np.int8, np.int16, np.int32, np.int64):
+        if np.iinfo(dtype).bits < min_width:
+            continue
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            name = np.dtype(dtype).name
+            return name.capitalize() if nullable else name
+    return 'Int64' if nullable else 'int64'
+
+
+def record_compaction(monitor, operation_name, columns):
+    # Per-column before/after bytes go into the span of the pass, next to its time/memory
+    before_total = after_total = 0
+    for column, (before, after) in columns.items():
+        monitor.record_metric(operation_name, f"{column}.bytes_before", before)
+        monitor.record_metric(operation_name, f"{column}.bytes_after", after)
+        before_total += before
+        after_total += after
+    monitor.record_metric(operation_name, "bytes_before", before_total)
+    monitor.record_metric(operation_name, "bytes_after", after_total)
@@ -24,7 +24,9 @@ class ConfigManager:
         return DatasetMetadata(
             attributes=metadata_config.get('attributes', []),
             types=metadata_config.get('types', {}),
-            rules=metadata_config.get('rules', {})
+            rules=metadata_config.get('rules', {}),
+            compact=metadata_config.get('compact', False),
+            primary_key=metadata_config.get('primary_key')
         )
     
     def get_library_manifest(self):
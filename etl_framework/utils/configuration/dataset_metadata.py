@@ -1,8 +1,12 @@
 class DatasetMetadata:
-    def __init__(self, attributes, types, rules):
+    def __init__(self, attributes, types, rules, compact=False, primary_key=None):
         self.attributes = attributes
         self.types = types
         self.rules = rules
+        # Memory-compact pass after extraction: False, True or a dict of options
+        self.compact = compact
+        # Column (or list of columns) identifying a row; used by the merge load mode
+        self.primary_key = primary_key
 
     def get_attributes(self):
         return self.attributes
@@ -11,4 +15,10 @@ class DatasetMetadata:
         return self.types
 
     def get_rules(self):
-        return self.rules
\ No newline at end of file
+        return self.rules
+
+    def get_compact(self):
+        return self.compact
+
+    def get_primary_key(self):
+        return self.primary_key
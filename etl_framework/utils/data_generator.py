@@ -55,10 +55,20 @@ def generate_complex_dataset(path, num_rows=1000):
     df.to_parquet(parquet_path, index=False)
     print(f"✅ Complex dataset generated at {parquet_path}")
     
+    # Save as Arrow IPC (uncompressed, so readers can memory-map it)
+    arrow_path = path.replace('.csv', '.arrow')
+    df.to_feather(arrow_path, compression='uncompressed')
+    print(f"✅ Complex dataset generated at {arrow_path}")
+
     # Save as JSON
     json_path = path.replace('.csv', '.json')
     df.to_json(json_path, orient='records', indent=4)
     print(f"✅ Complex dataset generated at {json_path}")
 
+    # Save as JSON Lines (one record per line: chunked / byte-range reads, ISO dates)
+    ndjson_path = path.replace('.csv', '.ndjson')
+    df.to_json(ndjson_path, orient='records', lines=True, date_format='iso')
+    print(f"✅ Complex dataset generated at {ndjson_path}")
+
 if __name__ == "__main__":
     generate_complex_dataset("data_test/complex_input.csv", 5000)
@@ -1,72 +1,237 @@
+import os
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from pymongo import MongoClient
 import mysql.connector
 import psycopg2
 
+
+def _connect(db_type, *args, **kwargs):
+    if db_type == 'sqlite':
+        # Pooled SQLite connections are handed to whichever thread checks them out
+        kwargs.setdefault('check_same_thread', False)
+        return sqlite3.connect(*args, **kwargs)
+    elif db_type == 'mongodb':
+        return MongoClient(*args, **kwargs)
+    elif db_type in ('mysql', 'mariadb'):
+        return mysql.connector.connect(*args, **kwargs)
+    elif db_type == 'postgresql':
+        return psycopg2.connect(*args, **kwargs)
+    else:
+        raise ValueError("Unknown database type")
+
+
+def _is_healthy(db_type, connection):
+    try:
+        if db_type == 'sqlite':
+            # A warm connection to a database file deleted since (rerun jobs) is stale
+            for _, name, path in connection.execute("PRAGMA database_list").fetchall():
+                if name == 'main' and path and not os.path.exists(path):
+                    return False
+        elif db_type == 'mongodb':
+            connection.admin.command('ping')
+        elif db_type in ('mysql', 'mariadb'):
+            connection.ping(reconnect=False)
+        elif db_type == 'postgresql':
+            if connection.closed:
+                return False
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            connection.rollback()
+        return True
+    except Exception:
+        return False
+
+
+def _close(connection):
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of connections sharing one set of connection parameters.
+
+    min_size connections are opened up front and kept; checkout beyond max_size
+    waits up to `timeout` seconds. Connections are health-checked (SELECT 1 / ping)
+    when checked out, and idle ones above min_size are closed after max_idle_seconds.
+    MongoClient is already a thread-safe pool, so a mongodb pool hands out one shared client.
+    """
+    def __init__(self, db_type, args=(), kwargs=None, min_size=0, max_size=4, max_idle_seconds=300, timeout=30):
+        if max_size < 1 or min_size > max_size:
+            raise ValueError("ConnectionPool needs 1 <= max_size and min_size <= max_size")
+        self.db_type = db_type
+        self.args = tuple(args)
+        self.kwargs = dict(kwargs or {})
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_idle_seconds = max_idle_seconds
+        self.timeout = timeout
+        self.shared = db_type == 'mongodb'
+        if self.shared:
+            self.max_size = 1
+        self._condition = threading.Condition()
+        # Idle connections as (connection, released_at), most recently released last
+        self._idle = []
+        self._size = 0
+        self._closed = False
+        for _ in range(min(min_size, self.max_size)):
+            self._idle.append((self._create(), time.monotonic()))
+            self._size += 1
+
+    def _create(self):
+        return _connect(self.db_type, *self.args, **self.kwargs)
+
+    def acquire(self):
+        deadline = time.monotonic() + self.timeout
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed")
+                self._evict_idle()
+                if self._idle:
+                    connection, _ = self._idle[-1] if self.shared else self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    connection = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No {self.db_type} connection available after {self.timeout}s "
+                                       f"(max_size={self.max_size})")
+                self._condition.wait(remaining)
+
+        # Connecting and health checks happen outside the lock
+        if connection is not None and not _is_healthy(self.db_type, connection):
+            self._discard(connection)
+            with self._condition:
+                self._size += 1
+            connection = None
+        if connection is None:
+            try:
+                connection = self._create()
+            except Exception:
+                with self._condition:
+                    self._size -= 1
+                    self._condition.notify()
+                raise
+            if self.shared:
+                with self._condition:
+                    self._idle.append((connection, time.monotonic()))
+                    self._condition.notify_all()
+        return connection
+
+    def release(self, connection, discard=False):
+        if self.shared and not discard:
+            return
+        if discard:
+            self._discard(connection)
+            return
+        with self._condition:
+            if self._closed:
+                _close(connection)
+                self._size -= 1
+                return
+            self._idle.append((connection, time.monotonic()))
+            self._condition.notify()
+
+    @contextmanager
+    def connection(self):
+        connection = self.acquire()
+        try:
+            yield connection
+        except Exception:
+            # Leave no half-done transaction on a connection that goes back to the pool
+            rollback = getattr(connection, 'rollback', None)
+            try:
+                if rollback is not None:
+                    rollback()
+            except Exception:
+                self.release(connection, discard=True)
+                raise
+            self.release(connection)
+            raise
+        self.release(connection)
+
+    def _discard(self, connection):
+        _close(connection)
+        with self._condition:
+            self._idle = [(idle, released) for idle, released in self._idle if idle is not connection]
+            self._size -= 1
+            self._condition.notify()
+
+    def _evict_idle(self):
+        # Called with the lock held; the oldest idle connections are at the front
+        if self.shared:
+            return
+        now = time.monotonic()
+        while self._size > self.min_size and self._idle and now - self._idle[0][1] > self.max_idle_seconds:
+            connection, _ = self._idle.pop(0)
+            _close(connection)
+            self._size -= 1
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._condition.notify_all()
+        for connection, _ in idle:
+            _close(connection)
+
+
 class DatabaseConnection:
-    _instances = {}
-    _details = {}
-
-    def __new__(cls, db_type, *args, **kwargs):
-        if db_type not in cls._instances:
-            if db_type == 'sqlite':
-                cls._instances[db_type] = sqlite3.connect(*args, **kwargs)
-            elif db_type == 'mongodb':
-                cls._instances[db_type] = MongoClient(*args, **kwargs)
-            elif db_type == 'mysql':
-                cls._instances[db_type] = mysql.connector.connect(*args, **kwargs)
-            elif db_type == 'mariadb':
-                cls._instances[db_type] = mysql.connector.connect(*args, **kwargs)
-            elif db_type == 'postgresql':
-                cls._instances[db_type] = psycopg2.connect(*args, **kwargs)
-            else:
-                raise ValueError("Unknown database type")
-            cls._details[db_type] = kwargs
-
-        return cls._instances[db_type]
+    """
+    Registry of connection pools, one per distinct set of connection parameters,
+    so two SQLite files (or two Postgres databases) never share a connection.
+    """
+    _pools = {}
+    _lock = threading.Lock()
 
     @classmethod
-    def get_connection_details(cls, db_type):
-        if db_type in cls._details:
-            return cls._details[db_type]
-        else:
-            raise ValueError("No details found for the specified database type")
+    def get_pool(cls, db_type, *args, min_size=0, max_size=4, max_idle_seconds=300, timeout=30, **kwargs):
+        key = (db_type, repr(args), repr(sorted(kwargs.items())))
+        with cls._lock:
+            pool = cls._pools.get(key)
+            if pool is None:
+                pool = ConnectionPool(db_type, args, kwargs, min_size=min_size, max_size=max_size,
+                                      max_idle_seconds=max_idle_seconds, timeout=timeout)
+                cls._pools[key] = pool
+            return pool
 
     @classmethod
     def close_connection(cls, db_type):
-        if db_type in cls._instances:
-            instance = cls._instances[db_type]
-            if db_type == 'sqlite':
-                instance.close()
-            elif db_type == 'mongodb':
-                instance.close()
-            elif db_type in ['mysql', 'mariadb']:
-                instance.close()
-            elif db_type == 'postgresql':
-                instance.close()
-            del cls._instances[db_type]
-            del cls._details[db_type]
-        else:
-            raise ValueError(f"No connection found for {db_type}")
-
-# ### el patrón singleton pervive mientras dure la sesión o se cierre específicamente la instancia de la conexión
+        with cls._lock:
+            keys = [key for key in cls._pools if key[0] == db_type]
+            if not keys:
+                raise ValueError(f"No connection found for {db_type}")
+            pools = [cls._pools.pop(key) for key in keys]
+        for pool in pools:
+            pool.close()
+
+    @classmethod
+    def close_all(cls):
+        with cls._lock:
+            pools, cls._pools = list(cls._pools.values()), {}
+        for pool in pools:
+            pool.close()
+
+# ### Los pools viven mientras dure la sesión o hasta cerrarlos con close_connection / close_all
 
 # # Ejemplo de uso
 # if __name__ == "__main__":
-#     # Crear una conexión a una base de datos SQLite
-#     sqlite_conn = DatabaseConnection('sqlite', db_path='testing.db')
-#     # Obtener los detalles de la conexión SQLite
-#     sqlite_details = DatabaseConnection.get_connection_details('sqlite')
-#     print("SQLite details:", sqlite_details)
-
-#     # Crear una conexión a una base de datos MongoDB
-#     mongodb_conn = DatabaseConnection('mongodb', host='localhost', port=27017)
-#     # Obtener los detalles de la conexión MongoDB
-#     mongodb_details = DatabaseConnection.get_connection_details('mongodb')
-#     print("MongoDB details:", mongodb_details)
-
-#     # Crear una conexión a una base de datos MySQL
-#     mysql_conn = DatabaseConnection('mysql', user='root', password='password', host='localhost', database='testdb')
-#     # Obtener los detalles de la conexión MySQL
-#     mysql_details = DatabaseConnection.get_connection_details('mysql')
-#     print("MySQL details:", mysql_details)
\ No newline at end of file
+#     # Pool de conexiones a una base de datos SQLite
+#     sqlite_pool = DatabaseConnection.get_pool('sqlite', 'testing.db')
+#     with sqlite_pool.connection() as conn:
+#         print(conn.execute("SELECT 1").fetchone())
+
+#     # Pool de conexiones a una base de datos MySQL (hasta 8 conexiones, 2 siempre abiertas)
+#     mysql_pool = DatabaseConnection.get_pool('mysql', user='root', password='password', host='localhost',
+#                                              database='testdb', min_size=2, max_size=8)
+#     with mysql_pool.connection() as conn:
+#         cursor = conn.cursor()
@@ -6,12 +6,25 @@ class DatabaseExtractorFactory:
         print('factoryExtractorDatabase------------')
         print(kwargs)
         if kwargs["db_type"] == "sqlite":
-            return SQLiteExtractor(kwargs['db_path'], kwargs['query'])
+            extractor = SQLiteExtractor(kwargs['db_path'], kwargs['query'])
         elif  kwargs["db_type"] == "mongodb":
-            return MongoDBExtractor(kwargs['uri'], kwargs['db_name'], kwargs['collection_name'], kwargs['query'])
+            return MongoDBExtractor(kwargs['uri'], kwargs['db_name'], kwargs['collection_name'], kwargs['query'],
+                                    columns=kwargs.get('columns'))
         elif  kwargs["db_type"] == "mysql":
-            return MySQLExtractor(kwargs['host'], kwargs['user'], kwargs['password'], kwargs['database'], kwargs['query'])
+            extractor = MySQLExtractor(kwargs['host'], kwargs['user'], kwargs['password'], kwargs['database'], kwargs['query'])
         elif  kwargs["db_type"] == "postgresql":
-            return PostgreSQLExtractor(kwargs['host'], kwargs['user'], kwargs['password'], kwargs['database'], kwargs['query'])
+            extractor = PostgreSQLExtractor(kwargs['host'], kwargs['user'], kwargs['password'], kwargs['database'], kwargs['query'],
+                                            port=kwargs.get('port', 5432), types=kwargs.get('types'))
         else:
-            raise ValueError("Unknown database type")
\ No newline at end of file
+            raise ValueError("Unknown database type")
+
+        # Projection pushdown: only the requested columns leave the server
+        select = select_list(extractor.pool, extractor.query, kwargs['columns']) if kwargs.get('columns') else None
+        # Key-range partitioning: N range queries fetched concurrently over pooled connections
+        if kwargs.get('partition_column'):
+            return PartitionedExtractor(extractor, kwargs['partition_column'], partitions=kwargs.get('partitions', 4),
+                                        lower_bound=kwargs.get('lower_bound'), upper_bound=kwargs.get('upper_bound'),
+                                        workers=kwargs.get('workers'), select=select)
+        if select is not None:
+            extractor.query = f"SELECT {select} FROM ({extractor.query}) AS projection_query"
+        return extractor
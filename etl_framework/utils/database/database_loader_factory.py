@@ -7,12 +7,22 @@ class DatabaseLoaderFactory:
         db_type = kwargs['db_type']
         print(db_type, kwargs)
         if db_type == 'sqlite':
-            return SQLiteLoader(kwargs['db_path'], kwargs['table_name'])
+            return SQLiteLoader(kwargs['db_path'], kwargs['table_name'], types=kwargs.get('types'),
+                                batch_size=kwargs.get('batch_size', 50_000), pragmas=kwargs.get('pragmas'),
+                                indexes=kwargs.get('indexes'), mode=kwargs.get('mode', 'append'), key=kwargs.get('key'))
         elif db_type == 'mongodb':
-            return MongoDBLoader(kwargs['uri'], kwargs['db_name'], kwargs['collection_name'])
+            return MongoDBLoader(kwargs['uri'], kwargs['db_name'], kwargs['collection_name'],
+                                 chunk_size=kwargs.get('chunk_size', 10_000), writers=kwargs.get('writers', 4),
+                                 mode=kwargs.get('mode', 'append'), key=kwargs.get('key'))
         elif db_type == 'mysql':
-            return MySQLLoader(kwargs['host'], kwargs['user'], kwargs['password'], kwargs['database'], kwargs['table_name'])
+            return MySQLLoader(kwargs['host'], kwargs['user'], kwargs['password'], kwargs['database'], kwargs['table_name'],
+                               types=kwargs.get('types'), port=kwargs.get('port', 3306),
+                               batch_size=kwargs.get('batch_size', 10_000), commit_every=kwargs.get('commit_every'),
+                               method=kwargs.get('method', 'insert'), mode=kwargs.get('mode', 'append'),
+                               key=kwargs.get('key'))
         elif db_type == 'postgresql':
-            return PostgreSQLLoader(kwargs['host'], kwargs['user'], kwargs['password'], kwargs['database'], kwargs['table_name'])
+            return PostgreSQLLoader(kwargs['host'], kwargs['user'], kwargs['password'], kwargs['database'], kwargs['table_name'],
+                                    types=kwargs.get('types'), port=kwargs.get('port', 5432),
+                                    mode=kwargs.get('mode', 'append'), key=kwargs.get('key'))
         else:
             raise ValueError("Unsupported database type")
\ No newline at end of file
@@ -1,48 +1,267 @@
-from etl_framework.utils.database.database_connection import DatabaseConnection
+from etl_framework.utils.database.database_connection import ConnectionPool, DatabaseConnection
 from etl_framework.abstract_etl_methods import Extractor
+from etl_framework.utils.projection import present_columns
+from etl_framework.utils.schema import pandas_read_options
+import io
+import itertools
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+
+
+def select_list(pool, query, columns):
+    """
+    Projection pushdown for SQL sources: the quoted select list of the requested `columns`
+    the query returns (in the query's order), so it can run as SELECT <list> FROM (query)
+    and the server sends only those. A LIMIT 0 run of the query gives its column names;
+    requested columns it does not return are skipped, as on file sources. None when the
+    projection keeps every column (or none of them).
+    """
+    with pool.connection() as connection:
+        cursor = connection.cursor()
+        cursor.execute(f"SELECT * FROM ({query}) AS projection_query LIMIT 0")
+        cursor.fetchall()
+        names = [description[0] for description in cursor.description]
+        cursor.close()
+        connection.rollback()
+    selected = present_columns(names, columns)
+    if not selected or len(selected) == len(names):
+        return None
+    quote = '`' if pool.db_type in ('mysql', 'mariadb') else '"'
+    return ', '.join(f"{quote}{column.replace(quote, quote * 2)}{quote}" for column in selected)
 
 
 class SQLiteExtractor(Extractor):
     def __init__(self, db_path, query):
-        self.connection = DatabaseConnection('sqlite', db_path)
+        self.pool = DatabaseConnection.get_pool('sqlite', db_path)
         self.query = query
 
     def extract(self):
-        print(self.connection, self.query)
-        data = pd.read_sql_query(self.query, self.connection)
+        print(self.pool.args, self.query)
+        with self.pool.connection() as connection:
+            data = pd.read_sql_query(self.query, connection)
         return data
 
 
 class MongoDBExtractor(Extractor):
-    def __init__(self, uri, db_name, collection_name, query):
-        self.client = DatabaseConnection('mongodb', uri)
+    def __init__(self, uri, db_name, collection_name, query, columns=None):
+        # MongoClient is itself a thread-safe pool; the registry shares one per URI
+        self.client = DatabaseConnection.get_pool('mongodb', uri).acquire()
         self.db = self.client[db_name]
         self.collection = self.db[collection_name]
         self.query = query
+        # Projection from the metadata columns: the server only sends those fields
+        self.projection = None
+        if columns:
+            self.projection = {column: 1 for column in columns}
+            if '_id' not in self.projection:
+                self.projection['_id'] = 0
 
     def extract(self):
-        data = pd.DataFrame(list(self.collection.find(self.query)))
+        data = pd.DataFrame(list(self.collection.find(self.query, self.projection)))
         return data
 
+    def extract_batches(self, batch_size):
+        # The cursor fetches batch_size documents per round trip; frames are built per chunk
+        cursor = self.collection.find(self.query, self.projection, batch_size=batch_size)
+        try:
+            while True:
+                documents = list(itertools.islice(cursor, batch_size))
+                if not documents:
+                    break
+                yield pd.DataFrame(documents)
+        finally:
+            cursor.close()
+
 
 class MySQLExtractor(Extractor):
     def __init__(self, host, user, password, database, query):
-        self.connection = DatabaseConnection('mysql', host=host, user=user,
-                                             password=password, database=database)
+        self.pool = DatabaseConnection.get_pool('mysql', host=host, user=user,
+                                                password=password, database=database)
         self.query = query
 
     def extract(self):
-        data = pd.read_sql_query(self.query, self.connection)
+        with self.pool.connection() as connection:
+            data = pd.read_sql_query(self.query, connection)
         return data
 
 
 class PostgreSQLExtractor(Extractor):
-    def __init__(self, host, user, password, database, query):
-        self.connection = DatabaseConnection('postgresql', host=host, user=user,
-                                             password=password, dbname=database)
+    def __init__(self, host, user, password, database, query, port=5432, types=None):
+        self.pool = DatabaseConnection.get_pool('postgresql', host=host, user=user,
+                                                password=password, dbname=database, port=port)
         self.query = query
+        # COPY sends text, so declared metadata types are applied while parsing it
+        self.types = types
 
     def extract(self):
-        data = pd.read_sql_query(self.query, self.connection)
-        return data
+        # COPY (query) TO STDOUT streams the result as CSV at wire speed (no per-row cursor fetches)
+        buffer = io.BytesIO()
+        with self.pool.connection() as connection:
+            cursor = connection.cursor()
+            cursor.copy_expert(f"COPY ({self.query}) TO STDOUT WITH (FORMAT csv, HEADER true)", buffer)
+            cursor.close()
+            connection.commit()
+        buffer.seek(0)
+        dtype, parse_dates = pandas_read_options(self.types or {})
+        return pd.read_csv(buffer, dtype=dtype or None, parse_dates=parse_dates or None)
+
+    def extract_batches(self, batch_size):
+        # Named (server-side) cursor: Postgres keeps the result and hands over batch_size rows at a time
+        connection = self.pool.acquire()
+        cursor = connection.cursor(name=f"etl_extract_{id(self)}")
+        cursor.itersize = batch_size
+        try:
+            cursor.execute(self.query)
+            columns = None
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if columns is None:
+                    columns = [description[0] for description in cursor.description]
+                if not rows:
+                    break
+                yield pd.DataFrame.from_records(rows, columns=columns)
+        finally:
+            cursor.close()
+            connection.commit()
+            self.pool.release(connection)
+
+
+def partition_boundaries(lower, upper, partitions):
+    """
+    partitions - 1 increasing split points between lower and upper. Numbers split
+    linearly (integers stay integers), dates/timestamps through pandas Timestamps;
+    SQLite's ISO text dates come back as text so they compare like the stored values.
+    """
+    if lower is None or upper is None or partitions < 2:
+        return []
+    if isinstance(lower, (int, float)) and not isinstance(lower, bool):
+        step = (upper - lower) / partitions
+        points = [lower + step * index for index in range(1, partitions)]
+        if isinstance(lower, int) and isinstance(upper, int):
+            points = [int(point) for point in points]
+    else:
+        start, end = pd.Timestamp(lower), pd.Timestamp(upper)
+        step = (end - start) / partitions
+        points = [start + step * index for index in range(1, partitions)]
+        points = [str(point) if isinstance(lower, str) else point.to_pydatetime() for point in points]
+    # Narrow ranges (few distinct integers) give repeated points
+    unique = []
+    for point in points:
+        if lower < point <= upper and (not unique or point > unique[-1]):
+            unique.append(point)
+    return unique
+
+
+class PartitionedExtractor(Extractor):
+    """
+    Splits the query of a SQLite/MySQL/PostgreSQL extractor into range predicates on
+    a numeric or date partition column and fetches them concurrently, each over its
+    own pooled connection. Bounds default to MIN/MAX of the column. The first part
+    has no lower bound (and takes the NULLs), the last no upper bound, so every row
+    is read exactly once whatever the bounds.
+    """
+    def __init__(self, extractor, partition_column, partitions=4, lower_bound=None, upper_bound=None, workers=None,
+                 select=None):
+        self.pool = extractor.pool
+        self.query = extractor.query
+        # Select list of the partition queries (select_list); the inner query keeps the partition column
+        self.select = select or '*'
+        self.partition_column = partition_column
+        self.partitions = partitions
+        self.lower_bound = lower_bound
+        self.upper_bound = upper_bound
+        self.workers = workers or partitions
+        self.placeholder = '?' if self.pool.db_type == 'sqlite' else '%s'
+
+    def _partition_pool(self):
+        # One connection per worker without raising the limit of the shared pool, which the
+        # other extractors and loaders of the same database use: a read with more workers
+        # gets a pool of its own with the same parameters, closed when the read ends
+        if self.workers <= self.pool.max_size:
+            return self.pool, False
+        return ConnectionPool(self.pool.db_type, self.pool.args, self.pool.kwargs, max_size=self.workers,
+                              timeout=self.pool.timeout), True
+
+    def bounds(self):
+        lower, upper = self.lower_bound, self.upper_bound
+        if lower is None or upper is None:
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute(f"SELECT MIN({self.partition_column}), MAX({self.partition_column}) "
+                               f"FROM ({self.query}) AS bounds_query")
+                low, high = cursor.fetchone()
+                cursor.close()
+            lower = low if lower is None else lower
+            upper = high if upper is None else upper
+        return lower, upper
+
+    def partition_queries(self):
+        points = partition_boundaries(*self.bounds(), self.partitions)
+        column = self.partition_column
+        queries = []
+        for index in range(len(points) + 1):
+            predicates, params = [], []
+            if index > 0:
+                predicates.append(f"{column} >= {self.placeholder}")
+                params.append(points[index - 1])
+            if index < len(points):
+                predicates.append(f"{column} < {self.placeholder}")
+                params.append(points[index])
+            where = ' AND '.join(predicates)
+            if index == 0:
+                where = f"({where} OR {column} IS NULL)" if where else "1 = 1"
+            queries.append((f"SELECT {self.select} FROM ({self.query}) AS partition_query WHERE {where}",
+                            tuple(params)))
+        return queries
+
+    def _fetch(self, sql, params, connection_pool=None):
+        with (connection_pool or self.pool).connection() as connection:
+            return pd.read_sql_query(sql, connection, params=params)
+
+    def _parts(self):
+        # Parts come back in partition order while the later ones are still being fetched
+        queries = self.partition_queries()
+        print(f"Extracción particionada por {self.partition_column}: {len(queries)} particiones, {self.workers} hilos")
+        connection_pool, dedicated = self._partition_pool()
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="db-partition") as pool:
+                futures = [pool.submit(self._fetch, sql, params, connection_pool) for sql, params in queries]
+                try:
+                    for future in futures:
+                        yield future.result()
+                finally:
+                    for future in futures:
+                        future.cancel()
+        finally:
+            if dedicated:
+                connection_pool.close()
+
+    def extract(self):
+        parts = [part for part in self._parts() if len(part)]
+        if not parts:
+            return self._fetch(f"SELECT {self.select} FROM ({self.query}) AS partition_query WHERE 1 = 0", ())
+        return pd.concat(parts, ignore_index=True)
+
+    def extract_batches(self, batch_size):
+        # Streams the partitions into the pipeline, split into batch_size rows
+        for part in self._parts():
+            for start in range(0, len(part), batch_size):
+                yield part.iloc[start:start + batch_size].reset_index(drop=True)
+
+
+class ConvertedExtractor(Extractor):
+    # Database sources without an engine-native reader: the pandas result (and every
+    # streamed batch unless convert_batches=False) is handed to the engine through `convert`,
+    # or through `convert_batch` for the batches when given
+    def __init__(self, extractor, convert, convert_batches=True, convert_batch=None):
+        self.extractor = extractor
+        self.convert = convert
+        self.convert_batches = convert_batches
+        self.convert_batch = convert_batch or convert
+
+    def extract(self):
+        return self.convert(self.extractor.extract())
+
+    def extract_batches(self, batch_size):
+        for batch in self.extractor.extract_batches(batch_size):
+            yield self.convert_batch(batch) if self.convert_batches else batch
@@ -1,117 +1,530 @@
 from etl_framework.utils.database.database_connection import  DatabaseConnection
 from etl_framework.abstract_etl_methods import Loader
+from etl_framework.utils.frames import to_arrow_table, to_pandas
+from etl_framework.utils.schema import sql_column_types
+import csv
+import decimal
+import io
+import os
 import pandas as pd
-import sqlite3
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+def _quote(name, quote='"'):
+    # MySQL quotes identifiers with backticks
+    return f'{quote}{name}{quote}'
+
+
+def _load_mode(mode, key):
+    # mode='merge' upserts on the key columns (metadata primary_key unless given)
+    if mode not in ('append', 'merge'):
+        raise ValueError("mode must be 'append' or 'merge'")
+    if mode == 'merge' and not key:
+        raise ValueError("merge mode needs a key (metadata primary_key or loader key=)")
+    if not key:
+        return None
+    return [key] if isinstance(key, str) else list(key)
+
+
+def _unique_index(table_name, key):
+    # ON CONFLICT needs a unique index on the key; created once, before the first batch
+    name = f"ux_{table_name}_{'_'.join(key)}"
+    return (f'CREATE UNIQUE INDEX IF NOT EXISTS {_quote(name)} ON {_quote(table_name)} '
+            f'({", ".join(_quote(col) for col in key)})')
+
+
+def _on_conflict(columns, key):
+    # SQLite and PostgreSQL upsert clause: the incoming row overwrites every non-key column
+    updates = [col for col in columns if col not in key]
+    target = ", ".join(_quote(col) for col in key)
+    if not updates:
+        return f'ON CONFLICT ({target}) DO NOTHING'
+    return f'ON CONFLICT ({target}) DO UPDATE SET ' + ', '.join(f'{_quote(col)} = excluded.{_quote(col)}'
+                                                                for col in updates)
+
+
+def _is_decimal_column(series):
+    # Arrow decimal columns, or object columns whose first value is a Decimal
+    if isinstance(series.dtype, pd.ArrowDtype):
+        return 'decimal' in str(series.dtype.pyarrow_dtype)
+    if series.dtype != object:
+        return False
+    values = series.dropna()
+    return len(values) > 0 and isinstance(values.iloc[0], decimal.Decimal)
+
+
+def _plain_numbers(data):
+    """
+    DuckDB HUGEINT/DECIMAL columns reach pandas through Arrow as decimal.Decimal cells,
+    which sqlite3 and pymongo cannot bind. Whole values within 64 bits become Int64,
+    anything else float64, so the created table gets INTEGER/REAL columns too.
+    """
+    for column in [column for column in data.columns if _is_decimal_column(data[column])]:
+        values = data[column].astype(object)
+        present = values.dropna()
+        whole = all(value == value.to_integral_value() and -2 ** 63 <= value < 2 ** 63 for value in present)
+        data = data.assign(**{column: values.astype('Int64' if whole else 'float64')})
+    return data
+
+
+def _record_batches(data, batch_size):
+    # Bulk inserts bind plain Python values: NaN/NaT -> None, timestamps -> ISO text
+    for start in range(0, len(data), batch_size):
+        chunk = data.iloc[start:start + batch_size]
+        for column in chunk.columns:
+            if pd.api.types.is_datetime64_any_dtype(chunk[column]):
+                chunk = chunk.assign(**{column: chunk[column].dt.strftime('%Y-%m-%d %H:%M:%S.%f')})
+        chunk = chunk.astype(object).where(chunk.notna(), None)
+        yield list(chunk.itertuples(index=False, name=None))
+
 
 class SQLiteLoader(Loader):
-    def __init__(self, db_path, table_name):
+    # PRAGMAs for throwaway load jobs: WAL journal and no fsync per transaction
+    LOAD_PRAGMAS = {'journal_mode': 'WAL', 'synchronous': 'OFF'}
+
+    def __init__(self, db_path, table_name, types=None, batch_size=50_000, pragmas=None, indexes=None,
+                 mode='append', key=None):
+        self.key = _load_mode(mode, key)
+        self.mode = mode
         self.db_path = db_path
         self.table_name = table_name
+        # Metadata types for the CREATE TABLE; undeclared columns follow the frame's dtypes
+        self.types = types
+        self.batch_size = batch_size
+        # True -> LOAD_PRAGMAS, or a {pragma: value} dict
+        self.pragmas = self.LOAD_PRAGMAS if pragmas is True else (pragmas or {})
+        # Columns (or column lists) indexed once the data is in, not during the inserts
+        self.indexes = indexes or []
+        # isolation_level=None: the loader opens and commits its single transaction itself.
+        # Pooled connections may be used from the pipelined writer thread, always serially.
+        self.pool = DatabaseConnection.get_pool('sqlite', db_path, isolation_level=None)
         self.connection = None
         self.cursor = None
+        self.rows_loaded = 0
+        self._table_ready = False
 
     def connect(self):
-        self.connection = sqlite3.connect(self.db_path)
+        self.connection = self.pool.acquire()
         self.cursor = self.connection.cursor()
+        for pragma, value in self.pragmas.items():
+            self.cursor.execute(f"PRAGMA {pragma}={value}")
 
     def close(self):
         if self.cursor:
             self.cursor.close()
         if self.connection:
-            self.connection.close()
+            self.pool.release(self.connection)
+        self.cursor = None
+        self.connection = None
 
     def create_table(self, data):
         # Create table if it doesn't exist
-        columns = ', '.join([f'{col} TEXT' for col in data.columns])
-        self.cursor.execute(f"CREATE TABLE IF NOT EXISTS {self.table_name} ({columns})")
-        self.connection.commit()
+        column_types = sql_column_types(data, self.types, 'sqlite')
+        columns = ', '.join([f'{_quote(col)} {sql_type}' for col, sql_type in column_types.items()])
+        self.cursor.execute(f'CREATE TABLE IF NOT EXISTS {_quote(self.table_name)} ({columns})')
+        if self.mode == 'merge':
+            self.cursor.execute(_unique_index(self.table_name, self.key))
+
+    def create_indexes(self):
+        for index in self.indexes:
+            columns = [index] if isinstance(index, str) else list(index)
+            name = f"idx_{self.table_name}_{'_'.join(columns)}"
+            self.cursor.execute(f'CREATE INDEX IF NOT EXISTS {_quote(name)} ON {_quote(self.table_name)} '
+                                f'({", ".join(_quote(col) for col in columns)})')
 
     def insert_data(self, data, exclude_columns=None):
-            try:
-                # Obtener las columnas del DataFrame
-                columns = list(data.columns)
+        # Determinar las columnas a insertar (excluyendo las especificadas)
+        exclude_columns = exclude_columns or []
+        insert_columns = [col for col in data.columns if col not in exclude_columns]
+        query = (f'INSERT INTO {_quote(self.table_name)} ({", ".join(_quote(col) for col in insert_columns)}) '
+                 f'VALUES ({", ".join(["?"] * len(insert_columns))})')
+        if self.mode == 'merge':
+            query += ' ' + _on_conflict(insert_columns, self.key)
+        for rows in _record_batches(data[insert_columns], self.batch_size):
+            self.cursor.executemany(query, rows)
+            self.rows_loaded += len(rows)
 
-                # Determinar las columnas a insertar (excluyendo las especificadas)
-                insert_columns = [col for col in columns if col not in exclude_columns]
+    # Streaming mode: one connection and one transaction for all the batches
+    def start_stream(self):
+        self.rows_loaded = 0
+        self._table_ready = False
+        self.connect()
+        self.cursor.execute("BEGIN")
 
-                # Preparar los datos para insertar
-                for index, row in data.iterrows():
-                    values = tuple(row[col] for col in insert_columns)
-                    query = f"INSERT INTO {self.table_name} ({', '.join(insert_columns)}) VALUES ({', '.join(['?']*len(insert_columns))})"
-                    self.cursor.execute(query, values)
+    def append(self, data):
+        data = _plain_numbers(to_pandas(data))
+        try:
+            if not self._table_ready:
+                self.create_table(data)
+                self._table_ready = True
+            self.insert_data(data)
+        except Exception as e:
+            print(f"Error al insertar datos en SQLite: {e}")
+            self.connection.rollback()
+            self.close()
+            raise
 
-                # Confirmar los cambios
-                self.connection.commit()
-                print("Datos insertados correctamente en SQLite.")
-            except Exception as e:
-                print(f"Error al insertar datos en SQLite: {e}")
+    def finish_stream(self):
+        if self.connection is None:
+            return
+        try:
+            self.cursor.execute("COMMIT")
+            # Building the indexes once is much cheaper than maintaining them per insert
+            if self._table_ready:
+                self.create_indexes()
+            print(f"Datos cargados en la base de datos SQLite {self.db_path}, tabla: {self.table_name} ({self.rows_loaded} filas)")
+        finally:
+            self.close()
 
-    def load(self, data):
+    def abort_stream(self):
+        # A failed run: the batches already inserted are rolled back with the transaction
+        if self.connection is None:
+            return
         try:
-            self.connect()
-            self.create_table(data)
-            self.insert_data(data, 'ID')
-            print(f"Datos cargados en la base de datos SQLite {self.db_path}, tabla: {self.table_name}")
-        except Exception as e:
-            print(f"Error al cargar datos en SQLite: {e}")
+            self.connection.rollback()
         finally:
             self.close()
 
+    def load(self, data):
+        self.start_stream()
+        self.append(data)
+        self.finish_stream()
+
+def _document_batches(data, chunk_size):
+    # Documents are built one chunk at a time instead of to_dict('records') on the whole frame
+    for start in range(0, len(data), chunk_size):
+        chunk = data.iloc[start:start + chunk_size]
+        chunk = chunk.astype(object).where(chunk.notna(), None)
+        columns = list(chunk.columns)
+        yield [dict(zip(columns, row)) for row in chunk.itertuples(index=False, name=None)]
+
+
 class MongoDBLoader(Loader):
-    def __init__(self, uri, db_name, collection_name):
-        self.client = DatabaseConnection('mongodb', uri=uri)
+    """
+    Chunked insert_many(ordered=False) on `writers` threads sharing the (thread-safe)
+    MongoClient. Unordered inserts let the server keep going past a failed document
+    and do not serialize the chunks; at most 2 x writers chunks are in flight.
+    """
+    def __init__(self, uri, db_name, collection_name, chunk_size=10_000, writers=4, mode='append', key=None):
+        # merge: bulk_write of UpdateOne(upsert=True) per document, matched on the key fields
+        self.key = _load_mode(mode, key)
+        self.mode = mode
+        # MongoClient is itself a thread-safe pool; the registry shares one per URI
+        self.client = DatabaseConnection.get_pool('mongodb', uri).acquire()
         self.db = self.client[db_name]
         self.collection = self.db[collection_name]
+        self.chunk_size = chunk_size
+        self.writers = writers
+        self.rows_loaded = 0
+        self.batch_stats = []
+        self._pool = None
+        self._pending = []
+
+    def insert_chunk(self, documents):
+        started = time.perf_counter()
+        if self.mode == 'merge':
+            from pymongo import UpdateOne
+            operations = [UpdateOne({field: document[field] for field in self.key}, {'$set': document}, upsert=True)
+                          for document in documents]
+            result = self.collection.bulk_write(operations, ordered=False)
+            return result.matched_count + result.upserted_count, time.perf_counter() - started
+        result = self.collection.insert_many(documents, ordered=False)
+        return len(result.inserted_ids), time.perf_counter() - started
+
+    def _collect(self, future):
+        rows, seconds = future.result()
+        self.rows_loaded += rows
+        self.batch_stats.append((rows, seconds))
+
+    # Streaming mode: chunks of every batch go to the same writer pool
+    def start_stream(self):
+        self.rows_loaded = 0
+        self.batch_stats = []
+        self._pending = []
+        if self.mode == 'merge':
+            # Upserts look every key up; the unique index makes that an index seek
+            self.collection.create_index([(field, 1) for field in self.key], unique=True)
+        self._pool = ThreadPoolExecutor(max_workers=self.writers, thread_name_prefix="mongo-writer")
+
+    def append(self, data):
+        for documents in _document_batches(_plain_numbers(to_pandas(data)), self.chunk_size):
+            # Backpressure: wait for the oldest chunk before queueing more
+            while len(self._pending) >= 2 * self.writers:
+                self._collect(self._pending.pop(0))
+            self._pending.append(self._pool.submit(self.insert_chunk, documents))
+
+    def finish_stream(self):
+        if self._pool is None:
+            return
+        try:
+            while self._pending:
+                self._collect(self._pending.pop(0))
+        except Exception as e:
+            print(f"Error al cargar datos en MongoDB: {e}")
+            raise
+        finally:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+            self._pending = []
+        print(f"Datos cargados en MongoDB, colección: {self.collection.name} ({self.rows_loaded} documentos)")
+
+    def abort_stream(self):
+        # No transaction to roll back: chunks not yet sent are dropped
+        if self._pool is None:
+            return
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        self._pool = None
+        self._pending = []
 
     def load(self, data):
-        self.collection.insert_many(data.to_dict('records'))
-        print(f"Datos cargados en MongoDB, colección: {self.collection.name}")
+        self.start_stream()
+        try:
+            self.append(data)
+        finally:
+            self.finish_stream()
 
 
 
 class MySQLLoader(Loader):
-    def __init__(self, host, user, password, database, table_name):
-        self.connection = DatabaseConnection('mysql', host=host, user=user, password=password, database=database)
+    """
+    Batched MySQL/MariaDB loader. method='insert' binds each batch with executemany,
+    which mysql-connector rewrites into one multi-row INSERT ... VALUES statement;
+    method='load_data' writes each batch to a temporary CSV and bulk-loads it with
+    LOAD DATA LOCAL INFILE (the server must allow local_infile).
+    commit_every=N commits every N batches, None commits once at the end.
+    mode='merge' adds ON DUPLICATE KEY UPDATE (REPLACE for LOAD DATA) on a unique key.
+    """
+    def __init__(self, host, user, password, database, table_name, types=None, port=3306, batch_size=10_000,
+                 commit_every=None, method='insert', mode='append', key=None):
+        if method not in ('insert', 'load_data'):
+            raise ValueError("method must be 'insert' or 'load_data'")
+        self.key = _load_mode(mode, key)
+        self.mode = mode
+        connection_params = dict(host=host, user=user, password=password, database=database, port=port)
+        if method == 'load_data':
+            connection_params['allow_local_infile'] = True
+        self.pool = DatabaseConnection.get_pool('mysql', **connection_params)
+        self.connection = None
         self.table_name = table_name
+        self.types = types
+        self.batch_size = batch_size
+        self.commit_every = commit_every
+        self.method = method
+        self.rows_loaded = 0
+        # (rows, seconds) per batch, reported by the processor as per-batch throughput
+        self.batch_stats = []
+        self._table_ready = False
+        self._uncommitted = 0
 
-    def load(self, data):
-        conn = self.connection
-        cursor = conn.cursor()
-
+    def create_table(self, data):
+        cursor = self.connection.cursor()
         # Create table if it doesn't exist
-        columns = ', '.join([f'{col} TEXT' for col in data.columns])
-        cursor.execute(f"CREATE TABLE IF NOT EXISTS {self.table_name} ({columns})")
-        print('insertion')
-        # Insert data
-        for index, row in data.iterrows():
-            values = ', '.join([f"'{str(value)}'" for value in row])
-            print(values)
-            cursor.execute(f"INSERT INTO {self.table_name} VALUES ({values})")
-
-        conn.commit()
+        column_types = sql_column_types(data, self.types, 'mysql')
+        definitions = [f'{_quote(col, "`")} {sql_type}' for col, sql_type in column_types.items()]
+        if self.mode == 'merge':
+            # TEXT cannot be part of a unique key without a prefix length
+            definitions = [f'{_quote(col, "`")} VARCHAR(255)' if col in self.key and sql_type == 'TEXT' else definition
+                           for definition, (col, sql_type) in zip(definitions, column_types.items())]
+            definitions.append(f"UNIQUE KEY {_quote('ux_' + '_'.join(self.key), '`')} "
+                               f"({', '.join(_quote(col, '`') for col in self.key)})")
+        columns = ', '.join(definitions)
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS {_quote(self.table_name, '`')} ({columns})")
         cursor.close()
-        print(f"Datos cargados en la base de datos MySQL, tabla: {self.table_name}")
 
+    def insert_batch(self, columns, rows):
+        cursor = self.connection.cursor()
+        query = (f"INSERT INTO {_quote(self.table_name, '`')} ({', '.join(_quote(col, '`') for col in columns)}) "
+                 f"VALUES ({', '.join(['%s'] * len(columns))})")
+        if self.mode == 'merge':
+            # executemany still sends one multi-row statement, the clause is kept at its end
+            updates = [col for col in columns if col not in self.key] or self.key
+            query += " ON DUPLICATE KEY UPDATE " + ", ".join(f"{_quote(col, '`')} = VALUES({_quote(col, '`')})"
+                                                             for col in updates)
+        cursor.executemany(query, rows)
+        cursor.close()
 
+    def load_data_batch(self, columns, rows):
+        # \N is LOAD DATA's NULL; backslashes in text are escaped because ESCAPED BY is '\'
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', newline='', delete=False) as f:
+            writer = csv.writer(f, lineterminator='\n')
+            for row in rows:
+                writer.writerow(['\\N' if value is None
+                                 else value.replace('\\', '\\\\') if isinstance(value, str)
+                                 else int(value) if isinstance(value, bool)
+                                 else value for value in row])
+            temp_path = f.name
+        try:
+            cursor = self.connection.cursor()
+            replace = "REPLACE " if self.mode == 'merge' else ""
+            cursor.execute(f"LOAD DATA LOCAL INFILE '{temp_path}' {replace}INTO TABLE {_quote(self.table_name, '`')} "
+                           f"FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' LINES TERMINATED BY '\\n' "
+                           f"({', '.join(_quote(col, '`') for col in columns)})")
+            cursor.close()
+        finally:
+            os.remove(temp_path)
 
-class PostgreSQLLoader(Loader):
-    def __init__(self, host, user, password, database, table_name):
-        self.connection = DatabaseConnection('postgresql', host=host, user=user, password=password, database=database)
-        self.table_name = table_name
+    # Streaming mode: batches are appended and committed every `commit_every` batches
+    def start_stream(self):
+        self.rows_loaded = 0
+        self.batch_stats = []
+        self._table_ready = False
+        self._uncommitted = 0
+        self.connection = self.pool.acquire()
+
+    def append(self, data):
+        data = _plain_numbers(to_pandas(data))
+        write_batch = self.load_data_batch if self.method == 'load_data' else self.insert_batch
+        try:
+            if not self._table_ready:
+                self.create_table(data)
+                self._table_ready = True
+            columns = list(data.columns)
+            for rows in _record_batches(data, self.batch_size):
+                started = time.perf_counter()
+                write_batch(columns, rows)
+                self._uncommitted += 1
+                if self.commit_every and self._uncommitted >= self.commit_every:
+                    self.connection.commit()
+                    self._uncommitted = 0
+                seconds = time.perf_counter() - started
+                self.rows_loaded += len(rows)
+                self.batch_stats.append((len(rows), seconds))
+                print(f"MySQL lote {len(self.batch_stats)}: {len(rows)} filas, "
+                      f"{len(rows) / seconds if seconds else 0:,.0f} filas/s")
+        except Exception as e:
+            print(f"Error al cargar datos en MySQL: {e}")
+            self.connection.rollback()
+            raise
+
+    def abort_stream(self):
+        # A failed run: the uncommitted batches are rolled back and the connection goes back to the pool
+        if self.connection is None:
+            return
+        try:
+            self.connection.rollback()
+        finally:
+            self.pool.release(self.connection)
+            self.connection = None
+        self._uncommitted = 0
+
+    def finish_stream(self):
+        if self.connection is None:
+            return
+        try:
+            self.connection.commit()
+        finally:
+            self.pool.release(self.connection)
+            self.connection = None
+        self._uncommitted = 0
+        print(f"Datos cargados en la base de datos MySQL, tabla: {self.table_name} ({self.rows_loaded} filas)")
 
     def load(self, data):
-        conn = self.connection
-        cursor = conn.cursor()
+        self.start_stream()
+        try:
+            self.append(data)
+        except BaseException:
+            # Nothing more is committed and the connection goes back to the pool
+            self.abort_stream()
+            raise
+        self.finish_stream()
 
+
+
+class PostgreSQLLoader(Loader):
+    # COPY ... FROM STDIN: each batch goes over the wire as one CSV stream instead of one
+    # INSERT per row. Works for any engine's frame (converted through Arrow).
+    # mode='merge' COPYs into a temporary staging table and upserts it with ON CONFLICT.
+    def __init__(self, host, user, password, database, table_name, types=None, port=5432, mode='append', key=None):
+        self.key = _load_mode(mode, key)
+        self.mode = mode
+        self.pool = DatabaseConnection.get_pool('postgresql', host=host, user=user, password=password,
+                                                dbname=database, port=port)
+        self.connection = None
+        self.table_name = table_name
+        self.types = types
+        self.rows_loaded = 0
+        self._columns = None
+
+    def create_table(self, table):
+        cursor = self.connection.cursor()
         # Create table if it doesn't exist
-        columns = ', '.join([f'{col} TEXT' for col in data.columns])
-        cursor.execute(f"CREATE TABLE IF NOT EXISTS {self.table_name} ({columns})")
+        column_types = sql_column_types(table, self.types, 'postgresql')
+        columns = ', '.join([f'{_quote(col)} {sql_type}' for col, sql_type in column_types.items()])
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS {_quote(self.table_name)} ({columns})")
+        if self.mode == 'merge':
+            cursor.execute(_unique_index(self.table_name, self.key))
+            cursor.execute(f"CREATE TEMP TABLE IF NOT EXISTS {_quote(self._staging_table())} "
+                           f"(LIKE {_quote(self.table_name)} INCLUDING DEFAULTS)")
+        cursor.close()
 
-        # Insert data
-        for index, row in data.iterrows():
-            values = ', '.join([f"'{str(value)}'" for value in row])
-            cursor.execute(f"INSERT INTO {self.table_name} VALUES ({values})")
+    def _staging_table(self):
+        return f"{self.table_name}_staging"
 
-        conn.commit()
+    def copy_batch(self, table):
+        import pyarrow.csv as pa_csv
+        buffer = io.BytesIO()
+        # Nulls are written as empty unquoted fields, which COPY's CSV format reads as NULL
+        pa_csv.write_csv(table, buffer, write_options=pa_csv.WriteOptions(include_header=False))
+        buffer.seek(0)
+        cursor = self.connection.cursor()
+        columns = ', '.join(_quote(col) for col in table.column_names)
+        target = self._staging_table() if self.mode == 'merge' else self.table_name
+        cursor.copy_expert(f"COPY {_quote(target)} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+        if self.mode == 'merge':
+            # A key may appear only once per upsert statement: the last staged row wins
+            key = ', '.join(_quote(col) for col in self.key)
+            cursor.execute(f"INSERT INTO {_quote(self.table_name)} ({columns}) "
+                           f"SELECT DISTINCT ON ({key}) {columns} FROM {_quote(target)} ORDER BY {key}, ctid DESC "
+                           f"{_on_conflict(table.column_names, self.key)}")
+            cursor.execute(f"TRUNCATE {_quote(target)}")
         cursor.close()
-        print(f"Datos cargados en la base de datos PostgreSQL, tabla: {self.table_name}")
+        self.rows_loaded += table.num_rows
+
+    # Streaming mode: every batch is one COPY inside a single transaction
+    def start_stream(self):
+        self.rows_loaded = 0
+        self._columns = None
+        self.connection = self.pool.acquire()
+
+    def append(self, data):
+        table = to_arrow_table(data)
+        try:
+            if self._columns is None:
+                self.create_table(table)
+                self._columns = table.column_names
+            self.copy_batch(table)
+        except Exception as e:
+            print(f"Error al cargar datos en PostgreSQL: {e}")
+            self.connection.rollback()
+            raise
+
+    def abort_stream(self):
+        # A failed run: the uncommitted batches are rolled back and the connection goes back to the pool
+        if self.connection is None:
+            return
+        try:
+            self.connection.rollback()
+        finally:
+            self.pool.release(self.connection)
+            self.connection = None
+
+    def finish_stream(self):
+        if self.connection is None:
+            return
+        try:
+            self.connection.commit()
+        finally:
+            self.pool.release(self.connection)
+            self.connection = None
+        print(f"Datos cargados en la base de datos PostgreSQL, tabla: {self.table_name} ({self.rows_loaded} filas)")
+
+    def load(self, data):
+        self.start_stream()
+        try:
+            self.append(data)
+        except BaseException:
+            # Nothing is committed and the connection goes back to the pool
+            self.abort_stream()
+            raise
+        self.finish_stream()
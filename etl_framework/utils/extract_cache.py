@@ -0,0 +1,227 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+
+from etl_framework.abstract_etl_methods import Extractor
+from etl_framework.utils.ndjson import NDJSON_SOURCES
+
+# Sources worth caching: text formats whose parsing dominates the extraction
+CACHEABLE_SOURCES = ('csv', 'json') + NDJSON_SOURCES
+
+DEFAULT_OPTIONS = {
+    'directory': '.etl_cache',
+    # Total size of the cached files; the least recently used ones are evicted above it
+    'max_bytes': 2 * 1024 ** 3,
+}
+
+# Bytes hashed at the start, middle and end of the source (a full hash would cost a full read)
+_SAMPLE_BYTES = 1024 * 1024
+
+
+def cache_options(setting):
+    """
+    Normalizes the `cache=` setting of ETLProcessor.process: False/None disables the
+    cache, True uses the defaults and a dict overrides some of them.
+    """
+    if not setting:
+        return None
+    options = dict(DEFAULT_OPTIONS)
+    if isinstance(setting, dict):
+        unknown = set(setting) - set(DEFAULT_OPTIONS)
+        if unknown:
+            raise ValueError(f"Unknown cache options: {sorted(unknown)}")
+        options.update(setting)
+    return options
+
+
+def content_hash(file_path):
+    # Size + start/middle/end samples: catches rewrites that keep the mtime without reading the whole file
+    size = os.path.getsize(file_path)
+    digest = hashlib.blake2b(str(size).encode(), digest_size=16)
+    with open(file_path, 'rb') as f:
+        for offset in sorted({0, max(0, size // 2 - _SAMPLE_BYTES // 2), max(0, size - _SAMPLE_BYTES)}):
+            f.seek(offset)
+            digest.update(f.read(_SAMPLE_BYTES))
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """
+    Parsed sources as Arrow IPC files in `directory`, keyed by the source file (path,
+    size, mtime, content hash) and the read options (separator, columns, types). The
+    files are memory-mapped on a hit, so any engine opens them without parsing or copying.
+    """
+    def __init__(self, directory=DEFAULT_OPTIONS['directory'], max_bytes=DEFAULT_OPTIONS['max_bytes']):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, source_type, extractor_params, types):
+        file_path = os.path.abspath(extractor_params['file_path'])
+        stat = os.stat(file_path)
+        # `watermark` is applied after the read, so it does not change what gets cached
+        options = {name: value for name, value in extractor_params.items() if name not in ('file_path', 'watermark')}
+        description = json.dumps({'source_type': source_type, 'path': file_path, 'size': stat.st_size,
+                                  'mtime': stat.st_mtime_ns, 'hash': content_hash(file_path),
+                                  'options': options, 'types': types}, sort_keys=True, default=str)
+        return hashlib.blake2b(description.encode(), digest_size=16).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.arrow")
+
+    def lookup(self, key):
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None
+        # The mtime of a cached file is its last use, which drives the LRU eviction
+        os.utime(path)
+        return path
+
+    def writer(self, key, schema):
+        return _CacheWriter(self, key, schema)
+
+    def evict(self, keep=None):
+        # Least recently used first, until the cache fits in max_bytes
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.directory):
+                if name.endswith('.arrow'):
+                    path = os.path.join(self.directory, name)
+                    stat = os.stat(path)
+                    entries.append((stat.st_mtime, stat.st_size, path))
+            entries.sort()
+            total = sum(size for _, size, _ in entries)
+            evicted = 0
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                if path == keep and size <= self.max_bytes:
+                    continue
+                os.remove(path)
+                total -= size
+                evicted += 1
+            return evicted
+
+
+class _CacheWriter:
+    # Writes to a temporary file swapped in on close, so a reader never maps a half-written file
+    def __init__(self, cache, key, schema):
+        import pyarrow as pa
+        self.cache = cache
+        self.target = cache.path(key)
+        self.temp_path = f"{self.target}.{uuid.uuid4().hex}.tmp"
+        self.schema = schema
+        self._writer = pa.ipc.new_file(self.temp_path, schema)
+        self.evicted = 0
+        self.bytes_written = 0
+
+    def write(self, table, batch_size=100_000):
+        if table.schema != self.schema:
+            table = table.cast(self.schema)
+        self._writer.write_table(table, max_chunksize=batch_size)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close(commit=exc_type is None)
+
+    def close(self, commit=True):
+        self._writer.close()
+        if not commit:
+            os.remove(self.temp_path)
+            return
+        self.bytes_written = os.path.getsize(self.temp_path)
+        os.replace(self.temp_path, self.target)
+        self.evicted = self.cache.evict(keep=self.target)
+
+
+def read_cached(path):
+    # Zero-copy: the table's buffers point into the memory-mapped file
+    import pyarrow as pa
+    with pa.memory_map(path, 'r') as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+class CachedExtractor(Extractor):
+    """
+    Serves the extractor's output from the cache when it is there (`from_arrow` turns the
+    mapped table into the engine's frame); otherwise reads through the extractor and
+    writes what it returns to the cache. Hits, misses and evictions go to the monitor.
+    """
+    def __init__(self, extractor, cache, key, from_arrow, monitor):
+        self.extractor = extractor
+        self.cache = cache
+        self.key = key
+        self.from_arrow = from_arrow
+        self.monitor = monitor
+
+    def _hit(self):
+        path = self.cache.lookup(self.key)
+        self.monitor.add_metric("cache", "hits" if path else "misses", 1)
+        return path
+
+    def _record_write(self, writer, seconds):
+        # Seconds as a metric, not a span: the write happens inside the extraction span
+        self.monitor.add_metric("cache", "write_seconds", seconds)
+        self.monitor.add_metric("cache", "bytes_written", writer.bytes_written)
+        self.monitor.add_metric("cache", "evictions", writer.evicted)
+
+    def extract(self):
+        from etl_framework.utils.frames import is_lazy, to_arrow_table
+        path = self._hit()
+        if path:
+            return self.from_arrow(read_cached(path))
+        data = self.extractor.extract()
+        started = time.perf_counter()
+        table = to_arrow_table(data)
+        with self.cache.writer(self.key, table.schema) as writer:
+            writer.write(table)
+        self._record_write(writer, time.perf_counter() - started)
+        # A lazy frame was just executed to fill the cache: continue from that result, not from the source
+        return self.from_arrow(table) if is_lazy(data) else data
+
+    def extract_batches(self, batch_size):
+        import pyarrow as pa
+        path = self._hit()
+        if path:
+            for record_batch in read_cached(path).to_batches(max_chunksize=batch_size):
+                yield self.from_arrow(pa.Table.from_batches([record_batch]), batch=True)
+            return
+        yield from self._write_through(batch_size)
+
+    def _write_through(self, batch_size):
+        from etl_framework.utils.frames import is_lazy, to_arrow_table
+        writer = None
+        complete = False
+        seconds = 0
+        try:
+            for batch in self.extractor.extract_batches(batch_size):
+                if writer is not False:
+                    started = time.perf_counter()
+                    table = to_arrow_table(batch)
+                    if is_lazy(batch):
+                        # Hand on the executed batch instead of running it again
+                        batch = self.from_arrow(table, batch=True)
+                    if writer is None:
+                        writer = self.cache.writer(self.key, table.schema)
+                    try:
+                        writer.write(table)
+                    except Exception as e:
+                        # A batch typed differently from the first one (e.g. an all-null column): stop caching
+                        print(f"Extraction cache skipped for this source: {e}")
+                        writer.close(commit=False)
+                        writer = False
+                    seconds += time.perf_counter() - started
+                yield batch
+            complete = True
+        finally:
+            if writer:
+                # Only a fully read source is cached (an abandoned stream leaves nothing behind)
+                writer.close(commit=complete)
+                if complete:
+                    self._record_write(writer, seconds)
@@ -0,0 +1,71 @@
+def to_arrow_table(data):
+    """
+    Any engine's frame as a pyarrow Table: pandas, Polars (eager or lazy),
+    DuckDB relations and Dask frames. Database loaders use it so every engine
+    can write to the same sinks.
+    """
+    import pyarrow as pa
+    if isinstance(data, pa.Table):
+        return data
+    if hasattr(data, 'fetch_arrow_table'):
+        # DuckDB relation
+        return data.fetch_arrow_table()
+    if hasattr(data, 'sink_parquet') and hasattr(data, 'collect'):
+        # Polars LazyFrame
+        data = data.collect()
+    if hasattr(data, 'to_arrow'):
+        # Polars DataFrame
+        return data.to_arrow()
+    if hasattr(data, 'npartitions'):
+        # Dask DataFrame
+        data = data.compute()
+    return pa.Table.from_pandas(data, preserve_index=False)
+
+
+def is_lazy(data):
+    # DuckDB relations, Polars LazyFrames and Dask frames re-read their source every time they run
+    return (hasattr(data, 'fetch_arrow_table') or (hasattr(data, 'sink_parquet') and hasattr(data, 'collect'))
+            or hasattr(data, 'npartitions'))
+
+
+def to_pandas(data):
+    import pandas as pd
+    if isinstance(data, pd.DataFrame):
+        return data
+    if hasattr(data, 'npartitions'):
+        return data.compute()
+    return to_arrow_table(data).to_pandas()
+
+
+def column_max(data, column):
+    # Largest value of `column` (None when empty/all null) for any engine's frame
+    import pandas as pd
+    if hasattr(data, 'aggregate') and hasattr(data, 'fetchone'):
+        # DuckDB relation: one aggregate query over the (lazy) relation
+        value = data.aggregate(f'max("{column}")').fetchone()[0]
+    elif hasattr(data, 'collect_schema'):
+        # Polars DataFrame / LazyFrame
+        import polars as pl
+        result = data.select(pl.col(column).max())
+        value = (result.collect() if hasattr(result, 'sink_parquet') else result).item()
+    elif hasattr(data, 'npartitions'):
+        value = data[column].max().compute()
+    else:
+        value = data[column].max()
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    return value
+
+
+def filter_newer(data, column, value):
+    """
+    Rows with column > value, for any engine's frame. On a DuckDB relation or a Polars
+    LazyFrame the filter is pushed by the optimizer into the scan of the source.
+    """
+    if hasattr(data, 'aggregate') and hasattr(data, 'fetchone'):
+        from etl_framework.utils.watermark import sql_literal
+        return data.filter(f'"{column}" > {sql_literal(value)}')
+    if hasattr(data, 'collect_schema'):
+        import polars as pl
+        return data.filter(pl.col(column) > value)
+    return data[data[column] > value]
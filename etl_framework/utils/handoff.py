@@ -0,0 +1,40 @@
+import time
+
+from etl_framework.utils.frames import is_lazy, to_arrow_table
+
+# Stages that can run on another engine than the processor's own (which transforms)
+HANDOFF_STAGES = ('extract', 'load')
+
+
+class ArrowHandoff:
+    """
+    Hands a frame from one engine to another through a pyarrow Table: relation.fetch_arrow_table(),
+    DataFrame.to_arrow() or Table.from_pandas on the way out, the target factory's from_arrow()
+    on the way in (pl.from_arrow, con.from_arrow and ArrowDtype-backed pandas keep the buffers).
+
+    Used as a step of the transformation chain, so it gets its own monitor span in every
+    mode. A lazy frame (DuckDB relation, Polars LazyFrame, Dask) runs its deferred work
+    when it is exported; that share is kept apart as `lazy_execution_seconds`.
+    """
+    streamable = True
+
+    def __init__(self, factory, phase, monitor):
+        self.factory = factory
+        self.phase = phase
+        self.monitor = monitor
+
+    def _convert(self, data, batch):
+        if is_lazy(data):
+            started = time.perf_counter()
+            table = to_arrow_table(data)
+            self.monitor.add_metric(self.phase, "lazy_execution_seconds", time.perf_counter() - started)
+        else:
+            table = to_arrow_table(data)
+        self.monitor.add_metric(self.phase, "arrow_bytes", table.nbytes)
+        return self.factory.from_arrow(table, batch=batch)
+
+    def transform(self, data):
+        return self._convert(data, batch=False)
+
+    def transform_batch(self, batch):
+        return self._convert(batch, batch=True)
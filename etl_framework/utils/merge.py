@@ -0,0 +1,101 @@
+import os
+import uuid
+
+import pandas as pd
+
+
+def check_merge_mode(mode, key, output_path, partition_by=None):
+    """
+    The `mode` option of the file loaders: 'overwrite' (default) or 'merge', an upsert on
+    `key` into a Parquet file or directory of parts. Returns the key as a list.
+    """
+    if mode not in ('overwrite', 'merge'):
+        raise ValueError("mode must be 'overwrite' or 'merge'")
+    if mode == 'merge':
+        if not key:
+            raise ValueError("merge mode needs a key (metadata primary_key or loader key=)")
+        if os.path.splitext(output_path)[1] not in ('.parquet', ''):
+            raise ValueError("merge mode for files supports Parquet targets only")
+        if partition_by or _partitioned(output_path):
+            raise ValueError("merge mode does not write partitioned datasets")
+    return [key] if isinstance(key, str) else key
+
+
+def _partitioned(output_path):
+    # A hive-partitioned target (category=A/part-00000.parquet): its parts are in subdirectories
+    # and new keys would need the partition_by spec to be placed, so it cannot be merged
+    return os.path.isdir(output_path) and any(entry.is_dir() for entry in os.scandir(output_path))
+
+
+def merge_file(output_path, data, key):
+    # Any engine's frame (through Arrow) merged into the Parquet target
+    from etl_framework.utils.frames import to_pandas
+    stats = merge_parquet(output_path, to_pandas(data), key)
+    print(f"Merge en {output_path}: {stats['updated']} actualizadas, {stats['inserted']} nuevas, "
+          f"{stats['parts_rewritten']} ficheros reescritos")
+    return stats
+
+
+def _key_index(frame, key):
+    return pd.MultiIndex.from_frame(frame[key])
+
+
+def _write_staged(frame, path):
+    # Written next to the target and swapped in with os.replace, so readers never see a half file
+    staging_path = f"{path}.{uuid.uuid4().hex}.staging"
+    try:
+        frame.to_parquet(staging_path, index=False)
+        os.replace(staging_path, path)
+    finally:
+        if os.path.exists(staging_path):
+            os.remove(staging_path)
+
+
+def merge_parquet(output_path, data, key):
+    """
+    Upserts the pandas frame `data` into a Parquet target keyed on the `key` columns.
+
+    A directory target (flat part files, e.g. sharded 'parts' output) is merged part by part:
+    only the key columns of each part are read to find the rows being replaced, only the
+    parts holding such rows are rewritten, and rows with new keys go to a new part file.
+    A single-file target is one part, so it is rewritten as a whole. Within `data`, the
+    last row of a repeated key wins. Hive-partitioned directories are rejected. Returns {'updated', 'inserted', 'parts_rewritten'}.
+    """
+    import pyarrow.parquet as pq
+    data = data.drop_duplicates(subset=key, keep='last')
+    pending = _key_index(data, key)
+    stats = {'updated': 0, 'inserted': 0, 'parts_rewritten': 0}
+
+    directory = os.path.isdir(output_path) or not output_path.endswith('.parquet')
+    if _partitioned(output_path):
+        raise ValueError("merge mode does not write partitioned datasets")
+    if directory:
+        os.makedirs(output_path, exist_ok=True)
+        parts = sorted(os.path.join(output_path, name) for name in os.listdir(output_path)
+                       if name.endswith('.parquet'))
+    else:
+        parts = [output_path] if os.path.exists(output_path) else []
+
+    for part in parts:
+        existing_keys = _key_index(pq.read_table(part, columns=key).to_pandas(), key)
+        replaced = existing_keys.isin(pending)
+        if not directory or replaced.any():
+            updates = data[_key_index(data, key).isin(existing_keys[replaced])]
+            inserts = data.iloc[0:0]
+            if not directory:
+                # One file: the new keys are written into it as well
+                inserts = data[~_key_index(data, key).isin(existing_keys)]
+            existing = pd.read_parquet(part)
+            merged = pd.concat([existing[~replaced], updates, inserts], ignore_index=True)
+            _write_staged(merged, part)
+            stats['parts_rewritten'] += 1
+            stats['updated'] += len(updates)
+            stats['inserted'] += len(inserts)
+            pending = pending[~pending.isin(existing_keys)]
+
+    if len(pending) and (directory or not parts):
+        inserts = data[_key_index(data, key).isin(pending)]
+        target = os.path.join(output_path, f"part-{uuid.uuid4().hex}.parquet") if directory else output_path
+        _write_staged(inserts, target)
+        stats['inserted'] += len(inserts)
+    return stats
@@ -2,20 +2,24 @@ import time
 import functools
 import psutil
 import os
+import threading
 from typing import Dict, Any, Optional
 
 class PerformanceMonitor:
     def __init__(self):
         self.metrics = {}
+        # Pipelined runs update the same operations from several threads
+        self._lock = threading.RLock()
 
     def reset_metrics(self):
         self.metrics = {}
 
-    def measure_time(self, operation_name: str):
+    def measure_time(self, operation_name: str, accumulate: bool = False):
         class TimerContext:
             def __init__(self, monitor, name):
                 self.monitor = monitor
                 self.name = name
+                self.accumulate = accumulate
                 self.start_time = 0
                 self.start_memory = 0
 
@@ -33,6 +37,14 @@ class PerformanceMonitor:
                 duration = end_time - self.start_time
                 memory_diff = end_memory - self.start_memory
                 
+                if self.accumulate:
+                    # Repeated spans (e.g. one per streamed batch) add up into a single operation
+                    self.monitor.add_metric(self.name, "duration_seconds", duration)
+                    self.monitor.add_metric(self.name, "memory_diff_bytes", memory_diff)
+                    self.monitor.max_metric(self.name, "peak_memory_bytes", end_memory)
+                    self.monitor.add_metric(self.name, "calls", 1)
+                    return
+
                 self.monitor.record_metric(self.name, "duration_seconds", duration)
                 self.monitor.record_metric(self.name, "memory_diff_bytes", memory_diff)
                 self.monitor.record_metric(self.name, "peak_memory_bytes", end_memory)
@@ -40,9 +52,20 @@ class PerformanceMonitor:
         return TimerContext(self, operation_name)
 
     def record_metric(self, operation_name: str, metric_type: str, value: Any):
-        if operation_name not in self.metrics:
-            self.metrics[operation_name] = {}
-        self.metrics[operation_name][metric_type] = value
+        with self._lock:
+            if operation_name not in self.metrics:
+                self.metrics[operation_name] = {}
+            self.metrics[operation_name][metric_type] = value
+
+    def add_metric(self, operation_name: str, metric_type: str, value: Any):
+        with self._lock:
+            current = self.metrics.get(operation_name, {}).get(metric_type, 0)
+            self.record_metric(operation_name, metric_type, current + value)
+
+    def max_metric(self, operation_name: str, metric_type: str, value: Any):
+        with self._lock:
+            current = self.metrics.get(operation_name, {}).get(metric_type)
+            self.record_metric(operation_name, metric_type, value if current is None else max(current, value))
 
     def get_report(self) -> Dict[str, Any]:
         return self.metrics
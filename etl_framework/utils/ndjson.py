@@ -0,0 +1,27 @@
+import io
+import os
+
+# JSON Lines / NDJSON: one record per line. Unlike a JSON array it is read in chunks or
+# line-aligned byte ranges and written by appending, so neither side holds the whole document.
+NDJSON_SOURCES = ('ndjson', 'jsonl')
+NDJSON_EXTENSIONS = ('.ndjson', '.jsonl')
+# Bytes per Dask partition (the dd.read_csv default)
+DEFAULT_BLOCKSIZE = 64 * 1024 ** 2
+
+
+def is_ndjson_path(path):
+    return os.path.splitext(path)[1].lower() in NDJSON_EXTENSIONS
+
+
+def read_byte_range(file_path, byte_range):
+    # The lines of one shard; the range comes from plan_line_shards, so it starts and ends at a line start
+    start, end = byte_range
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        return io.BytesIO(f.read(end - start))
+
+
+def duckdb_ndjson_lines(relation):
+    # One JSON object per row, rendered by DuckDB (the same text COPY ... (FORMAT JSON) writes)
+    rows = relation.query("etl_ndjson_rows", "SELECT to_json(etl_ndjson_rows) FROM etl_ndjson_rows").fetchall()
+    return "".join(f"{row[0]}\n" for row in rows)
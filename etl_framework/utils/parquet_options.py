@@ -0,0 +1,116 @@
+# Parquet write settings shared by every engine's file loader. Unset settings keep each
+# library's default (snappy for pyarrow/pandas/Dask/DuckDB, zstd for Polars).
+PARQUET_OPTIONS = ('compression', 'compression_level', 'row_group_size', 'use_dictionary', 'write_statistics')
+PARQUET_COMPRESSIONS = ('snappy', 'zstd', 'lz4', 'gzip', 'brotli', 'none')
+# Codecs that take a compression_level
+LEVEL_COMPRESSIONS = ('zstd', 'gzip', 'brotli')
+
+
+def parquet_options(loader_params):
+    """
+    The Parquet settings among the loader params:
+        compression: snappy | zstd | lz4 | gzip | brotli | none
+        compression_level: zstd / gzip / brotli only
+        row_group_size: rows per row group
+        use_dictionary, write_statistics: dictionary encoding and min/max statistics
+    """
+    options = {name: loader_params[name] for name in PARQUET_OPTIONS if loader_params.get(name) is not None}
+    if 'compression' in options:
+        options['compression'] = str(options['compression']).lower()
+        if options['compression'] in ('uncompressed', 'null'):
+            options['compression'] = 'none'
+        if options['compression'] not in PARQUET_COMPRESSIONS:
+            raise ValueError(f"Parquet compression must be one of {PARQUET_COMPRESSIONS}, got {options['compression']!r}")
+    if 'compression_level' in options and options.get('compression') not in LEVEL_COMPRESSIONS:
+        raise ValueError(f"compression_level needs one of the compressions {LEVEL_COMPRESSIONS}")
+    return options
+
+
+def arrow_writer_options(options):
+    # pyarrow.parquet.write_table / ParquetWriter keywords (also what pandas and Dask pass on)
+    return {name: value for name, value in options.items() if name != 'row_group_size'}
+
+
+def polars_parquet_options(options):
+    # write_parquet / sink_parquet keywords; None when a setting has no Polars equivalent (dictionary encoding)
+    if 'use_dictionary' in options:
+        return None
+    polars_options = {}
+    if 'compression' in options:
+        polars_options['compression'] = 'uncompressed' if options['compression'] == 'none' else options['compression']
+    if 'compression_level' in options:
+        polars_options['compression_level'] = options['compression_level']
+    if 'row_group_size' in options:
+        polars_options['row_group_size'] = options['row_group_size']
+    if 'write_statistics' in options:
+        polars_options['statistics'] = options['write_statistics']
+    return polars_options
+
+
+def duckdb_parquet_options(options):
+    # COPY ... (FORMAT PARQUET, ...) options; None when statistics are turned off (COPY always writes them)
+    if options.get('write_statistics') is False:
+        return None
+    copy_options = ["FORMAT PARQUET"]
+    if 'compression' in options:
+        copy_options.append(f"COMPRESSION {'uncompressed' if options['compression'] == 'none' else options['compression']}")
+    if 'compression_level' in options:
+        copy_options.append(f"COMPRESSION_LEVEL {int(options['compression_level'])}")
+    if 'row_group_size' in options:
+        copy_options.append(f"ROW_GROUP_SIZE {int(options['row_group_size'])}")
+    if options.get('use_dictionary') is False:
+        copy_options.append("DICTIONARY_SIZE_LIMIT 0")
+    return ", ".join(copy_options)
+
+
+class ParquetFileWriter:
+    """
+    Appends tables to one Parquet file with the given settings (streaming mode and
+    batch-by-batch loads). Later tables are cast to the first schema. With a row_group_size,
+    rows are buffered until a full row group is there, so small batches do not each become
+    a row group of their own.
+    """
+    def __init__(self, output_path, options=None):
+        self.output_path = output_path
+        self.options = options or {}
+        self.row_group_size = self.options.get('row_group_size')
+        self._writer = None
+        self._pending = []
+        self._pending_rows = 0
+
+    def write(self, table):
+        import pyarrow.parquet as pq
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.output_path, table.schema, **arrow_writer_options(self.options))
+        table = table.cast(self._writer.schema)
+        if not self.row_group_size:
+            self._writer.write_table(table)
+            return
+        self._pending.append(table)
+        self._pending_rows += table.num_rows
+        if self._pending_rows >= self.row_group_size:
+            self._flush(final=False)
+
+    def _flush(self, final):
+        import pyarrow as pa
+        pending = pa.concat_tables(self._pending)
+        complete = pending.num_rows if final else pending.num_rows - pending.num_rows % self.row_group_size
+        if complete:
+            self._writer.write_table(pending.slice(0, complete), row_group_size=self.row_group_size)
+        self._pending = [pending.slice(complete)] if complete < pending.num_rows else []
+        self._pending_rows = pending.num_rows - complete
+
+    def close(self):
+        if self._writer is not None:
+            if self._pending:
+                self._flush(final=True)
+            self._writer.close()
+            self._writer = None
+
+
+def write_parquet_table(output_path, table, options=None):
+    writer = ParquetFileWriter(output_path, options)
+    try:
+        writer.write(table)
+    finally:
+        writer.close()
@@ -0,0 +1,272 @@
+import datetime
+import os
+import shutil
+from urllib.parse import quote
+
+import pandas as pd
+
+from etl_framework.utils.parquet_options import arrow_writer_options
+from etl_framework.utils.watermark import sql_literal
+
+# Date buckets of a partition key ('last_login:month'): strftime format of the derived column.
+# DuckDB's strftime takes the same formats, so every engine writes the same directory names.
+DATE_BUCKETS = {'year': '%Y', 'month': '%Y-%m', 'day': '%Y-%m-%d', 'hour': '%Y-%m-%dT%H'}
+FILTER_OPERATORS = ('=', '==', '!=', '<', '<=', '>', '>=', 'in', 'not in')
+# DuckDB's default; also the rows buffered per partition before a row group is written
+DEFAULT_ROW_GROUP_SIZE = 122_880
+# Directory value that pyarrow, Polars and DuckDB read back as null
+_NULL_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+
+
+def partition_keys(partition_by):
+    """
+    The `partition_by` loader option as [(column, bucket, key)]: 'category' partitions on
+    the column itself, 'last_login:month' on a derived 'last_login_month' column ('2025-01').
+    """
+    if isinstance(partition_by, str):
+        partition_by = [partition_by]
+    keys = []
+    for entry in partition_by:
+        column, _, bucket = entry.partition(':')
+        if bucket and bucket not in DATE_BUCKETS:
+            raise ValueError(f"Unknown date bucket '{bucket}' for {column}, use one of {list(DATE_BUCKETS)}")
+        keys.append((column, bucket or None, f"{column}_{bucket}" if bucket else column))
+    if not keys:
+        raise ValueError("partition_by needs at least one column")
+    return keys
+
+
+def add_partition_columns(table, keys):
+    # Derived bucket columns are appended; dictionary keys (pandas categories) are decoded for grouping
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    for column, bucket, key in keys:
+        if column not in table.column_names:
+            raise ValueError(f"Partition column '{column}' is not in the data")
+        values = table[column]
+        if bucket is not None:
+            if not pa.types.is_temporal(values.type):
+                values = pc.cast(values, pa.timestamp('us'))
+            table = table.append_column(key, pc.strftime(values, format=DATE_BUCKETS[bucket]))
+        elif pa.types.is_dictionary(values.type):
+            table = table.set_column(table.column_names.index(key), key, pc.cast(values, values.type.value_type))
+    return table
+
+
+def duckdb_partition_select(keys):
+    # The same derived columns as add_partition_columns, as DuckDB select expressions
+    derived = [f"strftime(CAST(\"{column}\" AS TIMESTAMP), '{DATE_BUCKETS[bucket]}') AS \"{key}\""
+               for column, bucket, key in keys if bucket is not None]
+    return ", ".join(['*'] + derived)
+
+
+def reset_dataset(output_path):
+    # A dataset load replaces the whole directory, as a file load replaces the file
+    if os.path.isdir(output_path):
+        shutil.rmtree(output_path)
+    elif os.path.exists(output_path):
+        os.remove(output_path)
+    os.makedirs(output_path)
+
+
+def _segment(name, value):
+    if value is None:
+        return f"{name}={_NULL_PARTITION}"
+    return f"{name}={quote(str(value), safe='')}"
+
+
+class PartitionedParquetWriter:
+    """
+    Writes tables into a hive-partitioned Parquet dataset:
+        output_path/category=A/last_login_month=2025-01/part-00000.parquet
+    The partition columns live in the directory names only. Rows are buffered per partition
+    and written as row groups of `row_group_size` rows (from the Parquet `options`, see
+    utils/parquet_options.py), so small streamed batches still give full row groups; once a
+    part file reaches `max_file_bytes` the partition continues in a new one. The output
+    directory is replaced when the writer is created.
+    """
+    def __init__(self, output_path, partition_by, options=None, max_file_bytes=None):
+        self.output_path = output_path
+        self.keys = partition_keys(partition_by)
+        self.options = options or {}
+        self.row_group_size = self.options.get('row_group_size') or DEFAULT_ROW_GROUP_SIZE
+        self.max_file_bytes = max_file_bytes
+        self.files_written = 0
+        self._names = [key for _, _, key in self.keys]
+        self._schema = None
+        # partition directory -> buffered tables / open (ParquetWriter, path)
+        self._buffers = {}
+        self._files = {}
+        reset_dataset(output_path)
+
+    def write(self, table):
+        table = add_partition_columns(table, self.keys)
+        data_columns = [name for name in table.column_names if name not in self._names]
+        if self._schema is None:
+            self._schema = table.select(data_columns).schema
+        for directory, part in self._split(table):
+            self._buffers.setdefault(directory, []).append(part.select(data_columns).cast(self._schema))
+            if sum(buffered.num_rows for buffered in self._buffers[directory]) >= self.row_group_size:
+                self._flush(directory, final=False)
+
+    def _split(self, table):
+        # One filtered table per distinct combination of partition values
+        import pyarrow.compute as pc
+        for values in table.group_by(self._names, use_threads=False).aggregate([]).to_pylist():
+            mask = None
+            for name in self._names:
+                value = values[name]
+                condition = pc.is_null(table[name]) if value is None else pc.equal(table[name], value)
+                mask = condition if mask is None else pc.and_(mask, condition)
+            directory = os.path.join(self.output_path, *(_segment(name, values[name]) for name in self._names))
+            yield directory, table.filter(mask)
+
+    def _flush(self, directory, final):
+        # Whole row groups go out; a remainder waits for more rows unless this is the last flush
+        import pyarrow as pa
+        table = pa.concat_tables(self._buffers.pop(directory))
+        complete = table.num_rows if final else table.num_rows - table.num_rows % self.row_group_size
+        for offset in range(0, complete, self.row_group_size):
+            self._write_group(directory, table.slice(offset, min(self.row_group_size, complete - offset)))
+        if complete < table.num_rows:
+            self._buffers[directory] = [table.slice(complete)]
+
+    def _write_group(self, directory, table):
+        import pyarrow.parquet as pq
+        writer, path = self._files.get(directory, (None, None))
+        if writer is not None and self.max_file_bytes and os.path.getsize(path) >= self.max_file_bytes:
+            writer.close()
+            writer = None
+        if writer is None:
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"part-{self.files_written:05d}.parquet")
+            writer = pq.ParquetWriter(path, self._schema, **arrow_writer_options(self.options))
+            self._files[directory] = (writer, path)
+            self.files_written += 1
+        writer.write_table(table, row_group_size=self.row_group_size)
+
+    def close(self):
+        for directory in list(self._buffers):
+            self._flush(directory, final=True)
+        for writer, _ in self._files.values():
+            writer.close()
+        self._files = {}
+
+
+def write_partitioned(output_path, tables, partition_by, options=None, max_file_bytes=None):
+    writer = PartitionedParquetWriter(output_path, partition_by, options, max_file_bytes)
+    try:
+        for table in tables:
+            writer.write(table)
+    finally:
+        writer.close()
+    return writer.files_written
+
+
+def check_filters(filters):
+    """
+    The `filters` extractor option: [(column, operator, value), ...], all of which must
+    hold (the conjunctive form pyarrow and Dask take). YAML lists become tuples.
+    """
+    if filters is None:
+        return None
+    checked = []
+    for condition in filters:
+        column, operator, value = condition
+        if operator not in FILTER_OPERATORS:
+            raise ValueError(f"Unknown filter operator '{operator}', use one of {FILTER_OPERATORS}")
+        if operator in ('in', 'not in'):
+            value = list(value)
+        checked.append((column, operator, value))
+    return checked
+
+
+def typed_filters(filters, schema):
+    # Text values compared with a date/time column (e.g. from YAML) become timestamps
+    import pyarrow as pa
+    if not filters:
+        return filters
+    typed = []
+    for column, operator, value in filters:
+        position = schema.get_field_index(column)
+        if position >= 0 and pa.types.is_temporal(schema.field(position).type):
+            convert = lambda item: pd.Timestamp(item).to_pydatetime() if isinstance(item, str) else item
+            value = [convert(item) for item in value] if isinstance(value, list) else convert(value)
+        typed.append((column, operator, value))
+    return typed
+
+
+def dataset(path):
+    # A single file or a hive-partitioned directory; partition values are typed from the names
+    import pyarrow.dataset as ds
+    return ds.dataset(path, format='parquet', partitioning='hive')
+
+
+def arrow_filter(filters, schema):
+    import pyarrow.parquet as pq
+    return None if not filters else pq.filters_to_expression(typed_filters(filters, schema))
+
+
+def read_dataset(path, columns=None, filters=None):
+    """
+    Reads a Parquet file or dataset directory: partitions whose directory values fail the
+    filters are never opened, and row groups whose statistics rule them out are skipped.
+    """
+    from etl_framework.utils.projection import present_columns
+    source = dataset(path)
+    columns = None if columns is None else present_columns(source.schema.names, columns)
+    return source.to_table(columns=columns, filter=arrow_filter(filters, source.schema))
+
+
+def dataset_batches(path, batch_size, columns=None, filters=None):
+    from etl_framework.utils.projection import present_columns
+    source = dataset(path)
+    columns = None if columns is None else present_columns(source.schema.names, columns)
+    yield from source.to_batches(columns=columns, filter=arrow_filter(filters, source.schema), batch_size=batch_size)
+
+
+def polars_filter(frame, filters):
+    # Predicates on a scan_parquet LazyFrame: Polars prunes hive partitions and row groups with them
+    import polars as pl
+    if not filters:
+        return frame
+    schema = frame.collect_schema()
+    for column, operator, value in filters:
+        if isinstance(schema.get(column), pl.Datetime) and isinstance(value, (str, datetime.date)):
+            value = [pd.Timestamp(item).to_pydatetime() for item in value] if isinstance(value, list) \
+                else pd.Timestamp(value).to_pydatetime()
+        expression = pl.col(column)
+        if operator in ('=', '=='):
+            predicate = expression == value
+        elif operator == '!=':
+            predicate = expression != value
+        elif operator == '<':
+            predicate = expression < value
+        elif operator == '<=':
+            predicate = expression <= value
+        elif operator == '>':
+            predicate = expression > value
+        elif operator == '>=':
+            predicate = expression >= value
+        elif operator == 'in':
+            predicate = expression.is_in(value)
+        else:
+            predicate = ~expression.is_in(value)
+        frame = frame.filter(predicate)
+    return frame
+
+
+def sql_filter(filters):
+    # WHERE text for DuckDB, which casts the literals to the column types
+    conditions = []
+    for column, operator, value in filters:
+        if operator in ('in', 'not in'):
+            conditions.append(f"\"{column}\" {operator.upper()} ({', '.join(sql_literal(v) for v in value)})")
+        else:
+            conditions.append(f"\"{column}\" {'=' if operator == '==' else operator} {sql_literal(value)}")
+    return " AND ".join(conditions)
+
+
+def parquet_source(path):
+    # DuckDB reads a dataset directory through a recursive glob
+    return os.path.join(path, '**', '*.parquet') if os.path.isdir(path) else path
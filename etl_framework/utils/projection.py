@@ -0,0 +1,50 @@
+def required_columns(metadata, transformers):
+    """
+    Columns a job needs from the source: the attributes declared in the dataset
+    metadata plus every column read by the configured transformers.
+    Returns None (read everything) when the metadata declares no attributes or a
+    transformer does not declare its input_columns (remove_duplicates compares whole
+    rows, opaque rules may read any column).
+    """
+    attributes = list(metadata.get_attributes() or []) if metadata is not None else []
+    if not attributes:
+        return None
+
+    columns = list(attributes)
+    for transformer in transformers:
+        input_columns = getattr(transformer, 'input_columns', None)
+        if input_columns is None:
+            return None
+        for column in input_columns:
+            if column not in columns:
+                columns.append(column)
+    return columns
+
+
+def present_columns(available, columns):
+    # Keep the source's column order and drop requested columns the source does not have
+    wanted = set(columns)
+    return [column for column in available if column in wanted]
+
+
+def parquet_columns(file_path, columns):
+    # The Parquet footer holds the schema, so this does not read any data pages
+    import os
+    import pyarrow.parquet as pq
+    if os.path.isdir(file_path):
+        # Partitioned dataset: the file schema plus the hive partition columns
+        import pyarrow.dataset as ds
+        return present_columns(ds.dataset(file_path, format='parquet', partitioning='hive').schema.names, columns)
+    return present_columns(pq.read_schema(file_path).names, columns)
+
+
+def ipc_columns(file_path, columns):
+    # The Arrow IPC footer holds the schema; opening the memory map reads no column data
+    import pyarrow as pa
+    with pa.memory_map(file_path, 'r') as source:
+        return present_columns(pa.ipc.open_file(source).schema.names, columns)
+
+
+def csv_header(file_path, separator):
+    with open(file_path, 'r', encoding='utf8') as f:
+        return [name.strip('"') for name in f.readline().rstrip('\r\n').split(separator)]
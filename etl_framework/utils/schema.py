@@ -0,0 +1,126 @@
+import datetime
+
+# Logical types accepted in DatasetMetadata.types (YAML strings or Python types)
+_ALIASES = {
+    'int': 'int', 'integer': 'int', 'int64': 'int', 'bigint': 'int', int: 'int',
+    'float': 'float', 'double': 'float', 'float64': 'float', float: 'float',
+    'str': 'str', 'string': 'str', 'text': 'str', 'varchar': 'str', str: 'str',
+    'bool': 'bool', 'boolean': 'bool', bool: 'bool',
+    'datetime': 'datetime', 'timestamp': 'datetime', 'date': 'datetime', datetime.datetime: 'datetime',
+    'category': 'category', 'categorical': 'category',
+}
+
+
+def metadata_types(metadata):
+    """
+    Normalized {column: 'int' | 'float' | 'str' | 'bool' | 'datetime' | 'category'} from the dataset metadata.
+    Unknown type names are left out so the engine falls back to inference for them.
+    """
+    get_types = getattr(metadata, 'get_types', None)
+    if get_types is None:
+        return {}
+    normalized = {}
+    for column, logical_type in (get_types() or {}).items():
+        key = logical_type.lower() if isinstance(logical_type, str) else logical_type
+        if key in _ALIASES:
+            normalized[column] = _ALIASES[key]
+    return normalized
+
+
+def primary_key(metadata):
+    # Key columns as a list (None when the metadata declares none)
+    get_primary_key = getattr(metadata, 'get_primary_key', None)
+    key = get_primary_key() if get_primary_key else None
+    if not key:
+        return None
+    return [key] if isinstance(key, str) else list(key)
+
+
+def restrict(types, columns):
+    # Readers reject dtypes/parse_dates for columns they are not going to read
+    if types is None or columns is None:
+        return types
+    available = set(columns)
+    return {column: t for column, t in types.items() if column in available}
+
+
+def pandas_read_options(types, arrow=False):
+    # Nullable extension dtypes so an int column with gaps stays int
+    mapping = {'int': 'Int64', 'float': 'float64', 'str': 'string', 'bool': 'boolean', 'category': 'category'}
+    if arrow:
+        # dtype_backend='pyarrow' frames: keep every declared column Arrow-backed too
+        import pyarrow as pa
+        import pandas as pd
+        mapping = {'int': pd.ArrowDtype(pa.int64()), 'float': pd.ArrowDtype(pa.float64()),
+                   'str': pd.ArrowDtype(pa.string()), 'bool': pd.ArrowDtype(pa.bool_()), 'category': 'category'}
+    dtype = {column: mapping[t] for column, t in types.items() if t in mapping}
+    parse_dates = [column for column, t in types.items() if t == 'datetime']
+    return dtype, parse_dates
+
+
+def polars_schema(types):
+    import polars as pl
+    mapping = {'int': pl.Int64, 'float': pl.Float64, 'str': pl.Utf8, 'bool': pl.Boolean, 'datetime': pl.Datetime,
+               'category': pl.Categorical}
+    return {column: mapping[t] for column, t in types.items()}
+
+
+def duckdb_types(types):
+    # DuckDB strings are already dictionary-compressed in memory, so category stays VARCHAR
+    mapping = {'int': 'BIGINT', 'float': 'DOUBLE', 'str': 'VARCHAR', 'bool': 'BOOLEAN', 'datetime': 'TIMESTAMP',
+               'category': 'VARCHAR'}
+    return {column: mapping[t] for column, t in types.items()}
+
+
+_SQL_TYPES = {
+    'sqlite': {'int': 'INTEGER', 'float': 'REAL', 'str': 'TEXT', 'bool': 'INTEGER', 'datetime': 'TEXT',
+               'category': 'TEXT'},
+    'postgresql': {'int': 'BIGINT', 'float': 'DOUBLE PRECISION', 'str': 'TEXT', 'bool': 'BOOLEAN',
+                   'datetime': 'TIMESTAMP', 'category': 'TEXT'},
+    'mysql': {'int': 'BIGINT', 'float': 'DOUBLE', 'str': 'TEXT', 'bool': 'BOOLEAN', 'datetime': 'DATETIME(6)',
+              'category': 'VARCHAR(255)'},
+}
+
+
+def frame_types(data):
+    # Logical types of a pandas frame's (or Arrow table's) columns, for columns the metadata does not declare
+    import pandas as pd
+    import pyarrow as pa
+    if isinstance(data, pa.Table):
+        return {field.name: _arrow_type(field.type) for field in data.schema}
+    inferred = {}
+    for column, dtype in data.dtypes.items():
+        if pd.api.types.is_bool_dtype(dtype):
+            inferred[column] = 'bool'
+        elif pd.api.types.is_integer_dtype(dtype):
+            inferred[column] = 'int'
+        elif pd.api.types.is_float_dtype(dtype):
+            inferred[column] = 'float'
+        elif pd.api.types.is_datetime64_any_dtype(dtype):
+            inferred[column] = 'datetime'
+        else:
+            inferred[column] = 'str'
+    return inferred
+
+
+def _arrow_type(arrow_type):
+    import pyarrow as pa
+    if pa.types.is_boolean(arrow_type):
+        return 'bool'
+    if pa.types.is_integer(arrow_type):
+        return 'int'
+    if pa.types.is_floating(arrow_type) or pa.types.is_decimal(arrow_type):
+        return 'float'
+    if pa.types.is_timestamp(arrow_type) or pa.types.is_date(arrow_type):
+        return 'datetime'
+    return 'str'
+
+
+def sql_column_types(data, types, dialect):
+    """
+    {column: SQL type} for the columns of `data`: declared metadata types first,
+    the frame's own dtypes for the rest.
+    """
+    mapping = _SQL_TYPES[dialect]
+    declared = types or {}
+    return {column: mapping[declared.get(column, inferred)] for column, inferred in frame_types(data).items()}
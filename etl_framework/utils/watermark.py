@@ -0,0 +1,162 @@
+import datetime
+import json
+import numbers
+import os
+import threading
+
+import pandas as pd
+
+from etl_framework.abstract_etl_methods import Extractor
+
+# Timestamps are kept in the text form the SQLite loader writes, so they also compare as text
+_DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+
+
+class WatermarkStore:
+    """
+    Last processed watermark per job, in a small JSON file:
+        {"<job>": {"column": "last_login", "type": "datetime", "value": "2025-01-31 10:00:00.000000"}}
+    Writes go to a temporary file swapped in with os.replace, so a crash never leaves it half written.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, 'r', encoding='utf8') as f:
+            return json.load(f)
+
+    def get(self, job, column):
+        with self._lock:
+            entry = self._read().get(job)
+        if not entry or entry.get('column') != column:
+            # A job whose watermark column changed starts over with a full extraction
+            return None
+        return decode_value(entry['type'], entry['value'])
+
+    def set(self, job, column, value):
+        with self._lock:
+            state = self._read()
+            value_type, encoded = encode_value(value)
+            state[job] = {'column': column, 'type': value_type, 'value': encoded}
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w', encoding='utf8') as f:
+                json.dump(state, f, indent=4)
+            os.replace(temp_path, self.path)
+
+
+def encode_value(value):
+    if isinstance(value, (pd.Timestamp, datetime.datetime, datetime.date)):
+        return 'datetime', pd.Timestamp(value).strftime(_DATETIME_FORMAT)
+    if isinstance(value, bool):
+        raise ValueError("A boolean column cannot be a watermark")
+    # numbers.* also match NumPy scalars
+    if isinstance(value, numbers.Integral):
+        return 'int', int(value)
+    if isinstance(value, numbers.Real):
+        return 'float', float(value)
+    return 'str', str(value)
+
+
+def decode_value(value_type, value):
+    if value_type == 'datetime':
+        return pd.Timestamp(value).to_pydatetime()
+    if value_type == 'int':
+        return int(value)
+    if value_type == 'float':
+        return float(value)
+    return value
+
+
+def sql_literal(value):
+    # Datetimes go as ISO text: PostgreSQL/MySQL/DuckDB cast it to the column type, SQLite compares text
+    if isinstance(value, (pd.Timestamp, datetime.datetime, datetime.date)):
+        value = pd.Timestamp(value).strftime(_DATETIME_FORMAT)
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    return repr(value)
+
+
+def incremental_query(query, column, value):
+    # The predicate wraps the job's query, so the database filters (and can use an index on column)
+    return f"SELECT * FROM ({query}) AS incremental_source WHERE {column} > {sql_literal(value)}"
+
+
+def newer_row_groups(file_path, column, value):
+    """
+    Row groups of a Parquet file that may hold rows with column > value, from the
+    footer statistics (groups without statistics are kept).
+    """
+    import pyarrow.parquet as pq
+    metadata = pq.ParquetFile(file_path).metadata
+    position = metadata.schema.to_arrow_schema().get_field_index(column)
+    if position < 0:
+        raise ValueError(f"Watermark column '{column}' is not in {file_path}")
+    groups = []
+    for index in range(metadata.num_row_groups):
+        statistics = metadata.row_group(index).column(position).statistics
+        if statistics is None or not statistics.has_min_max or _greater(statistics.max, value):
+            groups.append(index)
+    return groups
+
+
+def _greater(maximum, value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return pd.Timestamp(maximum) > pd.Timestamp(value)
+    return maximum > value
+
+
+def incremental_options(setting):
+    """
+    `incremental=` of ETLProcessor.process: None/False (full run) or a dict
+    {'column': ..., 'job': ..., 'state_path': ...}; job defaults to the column name.
+    """
+    if not setting:
+        return None
+    if 'column' not in setting:
+        raise ValueError("incremental needs the watermark 'column'")
+    return {'column': setting['column'], 'job': setting.get('job', setting['column']),
+            'state_path': setting.get('state_path', 'etl_state.json')}
+
+
+def incremental_params(source_type, extractor_params, column, value):
+    # Database sources get the predicate in their query; file sources get it as `watermark`
+    # (Parquet readers skip row groups with it, everything is filtered after the read)
+    if source_type == 'database':
+        if extractor_params.get('db_type') == 'mongodb':
+            query = extractor_params.get('query') or {}
+            return dict(extractor_params, query={'$and': [query, {column: {'$gt': value}}]})
+        return dict(extractor_params, query=incremental_query(extractor_params['query'], column, value))
+    return dict(extractor_params, watermark=(column, value))
+
+
+class WatermarkTracker(Extractor):
+    """
+    Wraps the job's extractor: drops rows at or below the previous watermark and keeps
+    the maximum of the watermark column over everything it hands out.
+    """
+    def __init__(self, extractor, column, previous=None):
+        self.extractor = extractor
+        self.column = column
+        self.previous = previous
+        self.maximum = None
+
+    def _track(self, data):
+        from etl_framework.utils.frames import column_max, filter_newer
+        if self.previous is not None:
+            data = filter_newer(data, self.column, self.previous)
+        value = column_max(data, self.column)
+        if value is not None and (self.maximum is None or value > self.maximum):
+            self.maximum = value
+        return data
+
+    def extract(self):
+        return self._track(self.extractor.extract())
+
+    def extract_batches(self, batch_size):
+        for batch in self.extractor.extract_batches(batch_size):
+            yield self._track(batch)
@@ -1,6 +1,8 @@
 import os
 import sys
 
+import pandas as pd
+
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
@@ -0,0 +1,36 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etl_framework.etl_factory_provider import ETLFactoryProvider
+from etl_framework.etl_processor import ETLProcessor
+from etl_framework.utils.compaction import smallest_integer_dtype
+from etl_framework.utils.configuration.dataset_metadata import DatasetMetadata
+
+
+@pytest.mark.parametrize('library', ['pandas', 'dask'])
+def test_compact_keeps_room_for_arithmetic(tmp_path, library):
+    # price fits in int8, but generate_new_attributes doubles it after the compact pass
+    source = tmp_path / 'input.csv'
+    pd.DataFrame({'id': [1, 2, 3], 'price': [100, 120, 90]}).to_csv(source, sep=';', index=False)
+    output = tmp_path / 'output.parquet'
+    metadata = DatasetMetadata(['id', 'price'], {'id': 'int', 'price': 'int'}, {})
+
+    ETLProcessor(ETLFactoryProvider.get_factory(library, metadata), library).process(
+        'csv', {'file_path': str(source), 'separator': ';'}, 'file', {'output_path': str(output)},
+        {'general': [], 'attributes': {'price': ['generate_new_attributes']}}, compact=True)
+
+    result = pd.read_parquet(output).sort_values('id')
+    assert result['new_attribute'].tolist() == [200, 240, 180]
+
+
+def test_integer_downcast_width():
+    assert smallest_integer_dtype(90, 120) == 'int32'
+    assert smallest_integer_dtype(90, 120, nullable=True) == 'Int32'
+    assert smallest_integer_dtype(90, 120, min_width=8) == 'int8'
+    assert smallest_integer_dtype(0, 2 ** 40) == 'int64'
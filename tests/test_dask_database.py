@@ -0,0 +1,33 @@
+import os
+import sqlite3
+import sys
+
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etl_framework.etl_factory_provider import ETLFactoryProvider
+from etl_framework.etl_processor import ETLProcessor
+from etl_framework.utils.configuration.dataset_metadata import DatasetMetadata
+
+
+def test_streamed_query_keeps_moving_average_window(tmp_path):
+    # npartitions splits the whole-query frame; a streamed batch must stay one partition
+    # or the carried window is applied again to each of its partitions
+    source = str(tmp_path / 'input.db')
+    prices = [float(i * 7 % 23) for i in range(60)]
+    with sqlite3.connect(source) as connection:
+        connection.execute('CREATE TABLE input (id INTEGER, price REAL)')
+        connection.executemany('INSERT INTO input VALUES (?, ?)', list(enumerate(prices)))
+    output = tmp_path / 'output.parquet'
+    metadata = DatasetMetadata(['id', 'price'], {'id': 'int', 'price': 'float'}, {})
+
+    ETLProcessor(ETLFactoryProvider.get_factory('dask', metadata), 'dask').process(
+        'database', {'db_type': 'sqlite', 'db_path': source, 'query': 'SELECT * FROM input ORDER BY id',
+                     'npartitions': 4},
+        'file', {'output_path': str(output)}, {'general': ['moving_average']}, streaming=True, batch_size=25)
+
+    result = pd.read_parquet(output).sort_values('id')
+    expected = pd.Series(prices).rolling(window=10).mean()
+    pd.testing.assert_series_equal(result['moving_average'].reset_index(drop=True), expected, check_names=False)
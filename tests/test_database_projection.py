@@ -0,0 +1,50 @@
+import os
+import sqlite3
+import sys
+
+import pandas as pd
+import pytest
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etl_framework.etl_factory_provider import ETLFactoryProvider
+from etl_framework.etl_processor import ETLProcessor
+from etl_framework.utils.configuration.dataset_metadata import DatasetMetadata
+from etl_framework.utils.database.database_extractor_factory import DatabaseExtractorFactory
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = str(tmp_path / 'input.db')
+    with sqlite3.connect(path) as connection:
+        connection.execute('CREATE TABLE input (id INTEGER, price INTEGER, notes TEXT)')
+        connection.executemany('INSERT INTO input VALUES (?, ?, ?)', [(1, 100, 'a'), (2, 120, 'b'), (3, 90, None)])
+    return path
+
+
+def test_query_selects_only_projected_columns(source):
+    factory = DatabaseExtractorFactory()
+    extractor = factory.get_extractor(db_type='sqlite', db_path=source, query='SELECT * FROM input',
+                                      columns=['price', 'id', 'missing'])
+    assert extractor.query == 'SELECT "id", "price" FROM (SELECT * FROM input) AS projection_query'
+    assert extractor.extract().columns.tolist() == ['id', 'price']
+
+    partitioned = factory.get_extractor(db_type='sqlite', db_path=source, query='SELECT * FROM input',
+                                        columns=['price'], partition_column='id', partitions=2)
+    assert partitioned.extract().columns.tolist() == ['price']
+
+
+@pytest.mark.parametrize('library', ['pandas', 'polars', 'duckdb', 'dask'])
+def test_project_columns_on_database_source(tmp_path, source, library):
+    output = tmp_path / 'output.parquet'
+    metadata = DatasetMetadata(['id', 'price'], {'id': 'int', 'price': 'int'}, {})
+
+    ETLProcessor(ETLFactoryProvider.get_factory(library, metadata), library).process(
+        'database', {'db_type': 'sqlite', 'db_path': source, 'query': 'SELECT * FROM input'},
+        'file', {'output_path': str(output)},
+        {'general': [], 'attributes': {'price': ['generate_new_attributes']}}, project_columns=True)
+
+    result = pd.read_parquet(output).sort_values('id')
+    assert 'notes' not in result.columns
+    assert result['new_attribute'].tolist() == [200, 240, 180]
@@ -0,0 +1,48 @@
+import os
+import sqlite3
+import sys
+
+import duckdb
+import pandas as pd
+import pytest
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etl_framework.etl_factory_provider import ETLFactoryProvider
+from etl_framework.etl_processor import ETLProcessor
+from etl_framework.library_duckdb.extract_functions import DuckDBSQLiteExtractor
+from etl_framework.utils.configuration.dataset_metadata import DatasetMetadata
+
+
+def _sqlite_extension_available():
+    try:
+        con = duckdb.connect()
+        con.execute("INSTALL sqlite")
+        con.execute("LOAD sqlite")
+        return True
+    except duckdb.Error:
+        return False
+
+
+@pytest.mark.skipif(not _sqlite_extension_available(), reason='DuckDB sqlite extension cannot be installed')
+@pytest.mark.parametrize('options', [{}, {'streaming': True, 'batch_size': 2}])
+def test_unqualified_query_on_attached_sqlite(tmp_path, options):
+    source = str(tmp_path / 'input.db')
+    with sqlite3.connect(source) as connection:
+        connection.execute('CREATE TABLE input (id INTEGER, price INTEGER)')
+        connection.executemany('INSERT INTO input VALUES (?, ?)', [(1, 100), (2, 120), (3, 90)])
+    output = tmp_path / 'output.parquet'
+    metadata = DatasetMetadata(['id', 'price'], {'id': 'int', 'price': 'int'}, {})
+    factory = ETLFactoryProvider.get_factory('duckdb', metadata)
+    assert isinstance(factory.get_extractor('database', db_type='sqlite', db_path=source, query='SELECT 1'),
+                      DuckDBSQLiteExtractor)
+
+    # The relation runs after extract() returns (transform and COPY), still finding `input`
+    ETLProcessor(factory, 'duckdb').process(
+        'database', {'db_type': 'sqlite', 'db_path': source, 'query': 'SELECT * FROM input'},
+        'file', {'output_path': str(output)},
+        {'general': [], 'attributes': {'price': ['generate_new_attributes']}}, **options)
+
+    result = pd.read_parquet(output).sort_values('id')
+    assert result['new_attribute'].tolist() == [200, 240, 180]
@@ -0,0 +1,43 @@
+import os
+import sys
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etl_framework.etl_factory_provider import ETLFactoryProvider
+from etl_framework.utils.configuration.dataset_metadata import DatasetMetadata
+from etl_framework.utils.merge import merge_parquet
+from etl_framework.utils.partitioning import write_partitioned
+
+
+def test_merge_rewrites_only_parts_with_updated_keys(tmp_path):
+    target = str(tmp_path / 'target')
+    os.makedirs(target)
+    pd.DataFrame({'id': [1, 2], 'price': [10, 20]}).to_parquet(os.path.join(target, 'part-00000.parquet'))
+    pd.DataFrame({'id': [3, 4], 'price': [30, 40]}).to_parquet(os.path.join(target, 'part-00001.parquet'))
+
+    stats = merge_parquet(target, pd.DataFrame({'id': [2, 5], 'price': [21, 50]}), ['id'])
+
+    assert stats == {'updated': 1, 'inserted': 1, 'parts_rewritten': 1}
+    result = pd.read_parquet(target).sort_values('id')
+    assert result['id'].tolist() == [1, 2, 3, 4, 5]
+    assert result['price'].tolist() == [10, 21, 30, 40, 50]
+
+
+@pytest.mark.parametrize('library', ['pandas', 'polars', 'duckdb', 'dask'])
+def test_merge_into_partitioned_target_raises(tmp_path, library):
+    # Rows would land in a new top-level part and duplicate the keys of the partitions
+    target = str(tmp_path / 'target')
+    write_partitioned(target, [pa.table({'id': [1, 2], 'category': ['A', 'B']})], 'category')
+    metadata = DatasetMetadata(['id', 'category'], {'id': 'int', 'category': 'string'}, {})
+    factory = ETLFactoryProvider.get_factory(library, metadata)
+
+    with pytest.raises(ValueError, match='partitioned'):
+        factory.get_loader('file', output_path=target, mode='merge', key='id')
+    with pytest.raises(ValueError, match='partitioned'):
+        merge_parquet(target, pd.DataFrame({'id': [2], 'category': ['B']}), ['id'])
+    assert sorted(pd.read_parquet(target)['id'].tolist()) == [1, 2]
@@ -0,0 +1,26 @@
+import os
+import sqlite3
+import sys
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etl_framework.utils.database.database_connection import DatabaseConnection
+from etl_framework.utils.database.database_extractor_factory import DatabaseExtractorFactory
+
+
+def test_partitioned_read_leaves_shared_pool_limit(tmp_path):
+    source = str(tmp_path / 'input.db')
+    with sqlite3.connect(source) as connection:
+        connection.execute('CREATE TABLE input (id INTEGER, price REAL)')
+        connection.executemany('INSERT INTO input VALUES (?, ?)', [(i, i * 1.5) for i in range(100)])
+    shared = DatabaseConnection.get_pool('sqlite', source)
+
+    extractor = DatabaseExtractorFactory().get_extractor(db_type='sqlite', db_path=source, query='SELECT * FROM input',
+                                                         partition_column='id', partitions=8)
+    whole = extractor.extract()
+    batches = list(extractor.extract_batches(30))
+
+    assert sorted(whole['id'].tolist()) == list(range(100))
+    assert sorted(id_ for batch in batches for id_ in batch['id'].tolist()) == list(range(100))
+    assert shared.max_size == 4